@@ -0,0 +1,53 @@
+"""Batch export throughput in bots/second at 1, 4 and N (= CPU count) workers.
+
+Each batch is BOTS chains() graphs of NODES_PER_BOT nodes, sent through
+webapp.batch.iter_zip so the number includes zipping the output. The
+1-worker run exports in-process; the others use a fresh process pool, which
+is started and warmed up before timing.
+
+    python -m benchmarks.batch_throughput
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmarks.synthetic import chains
+from webapp.batch import iter_zip
+
+BOTS = 500
+NODES_PER_BOT = 200
+
+
+def make_specs():
+    specs = []
+    for i in range(BOTS):
+        nodes, connections = chains(NODES_PER_BOT)
+        specs.append({"name": f"bot_{i}", "nodes": list(nodes.values()), "connections": connections})
+    return specs
+
+
+def run(specs, workers):
+    if workers == 1:
+        start = time.perf_counter()
+        size = sum(map(len, iter_zip(specs, workers=1)))
+        return time.perf_counter() - start, size
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Start every worker before the clock does
+        list(pool.map(abs, range(workers)))
+        start = time.perf_counter()
+        size = sum(map(len, iter_zip(specs, workers=workers, executor=pool)))
+        return time.perf_counter() - start, size
+
+
+def main():
+    specs = make_specs()
+    n_cpus = os.cpu_count() or 1
+    print(f"{BOTS} bots x {NODES_PER_BOT} nodes, {n_cpus} CPUs")
+    print(f"{'workers':>8} {'seconds':>8} {'bots/s':>8} {'zip KB':>8}")
+    for workers in sorted({1, 4, n_cpus}):
+        elapsed, size = run(specs, workers)
+        print(f"{workers:>8} {elapsed:>8.2f} {BOTS / elapsed:>8.0f} {size / 1024:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
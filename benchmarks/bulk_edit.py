@@ -0,0 +1,66 @@
+"""Batch move / duplicate / delete on the desktop editor, headless.
+
+Loads chains of 1k to 100k nodes into BotBuilderApp (stub canvas and event
+loop, as in benchmarks.desktop_startup), selects K nodes spread across the
+graph and times move_nodes, copy_nodes + paste_nodes and delete_nodes.
+Their cost should follow K and the selected nodes' degree, not the graph
+size. For reference, "rebuild" removes the same nodes by scanning every
+edge and then calls redraw_wires() once, which is what deleting used to
+cost per node.
+
+    python -m benchmarks.bulk_edit
+"""
+import importlib.util
+import os
+import time
+
+from benchmarks.desktop_startup import ROOT, headless_app, payload
+from webapp import project
+from webapp.nodes import DEFAULT_PROPS
+
+SIZES = [1_000, 20_000, 100_000]
+SELECTED = [10, 100, 1_000]
+
+
+def timed_ms(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return (time.perf_counter() - start) * 1000, result
+
+
+def rebuild_delete(app, node_ids):
+    gone = set(node_ids)
+    for conn in [conn for conn in app.edges if conn[0] in gone or conn[1] in gone]:
+        app.store.remove_edge(app.edges.pop(conn))
+    for nid in node_ids:
+        app.nodes.pop(nid).undraw()
+        app.drawn_nodes.discard(nid)
+        app._unindex_node(nid)
+        app.store.remove_node(nid)
+    app.redraw_wires()
+
+
+def main():
+    spec = importlib.util.spec_from_file_location("botapp", os.path.join(ROOT, "test.py"))
+    botapp = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(botapp)
+
+    print(f"{'nodes':>8} {'selected':>8} {'move ms':>8} {'duplicate ms':>13} {'delete ms':>10} {'rebuild ms':>11}")
+    for n in SIZES:
+        data = payload(n)
+        for k in SELECTED:
+            app, _loop = headless_app(botapp)
+            app.load_store(project.from_payload(data, DEFAULT_PROPS), progressive=False)
+            ids = list(app.nodes)[::n // k][:k]
+            move, _ = timed_ms(app.move_nodes, ids, 10.0, 10.0)
+            duplicate, copies = timed_ms(lambda: app.paste_nodes(app.copy_nodes(ids), 0.0, 500.0))
+            delete, _ = timed_ms(app.delete_nodes, ids + copies)
+
+            app, _loop = headless_app(botapp)
+            app.load_store(project.from_payload(data, DEFAULT_PROPS), progressive=False)
+            rebuild, _ = timed_ms(rebuild_delete, app, list(app.nodes)[::n // k][:k])
+            print(f"{n:>8} {k:>8} {move:>8.2f} {duplicate:>13.2f} {delete:>10.2f} {rebuild:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""Desktop time-to-first-interactive, with and without a large project.
+
+With a display, each case launches ``python test.py --measure-startup
+[PROJECT]`` and reports the app's own timings from launch: the first idle
+frame after the window maps ("interactive") and the moment the whole
+project is loaded. Without one (no $DISPLAY on Linux), that part is
+skipped.
+
+The headless part drives BotBuilderApp.load_store on a stub canvas and a
+stub event loop, comparing the old all-at-once load with the progressive
+one: time until the first slice is on screen, and the longest stretch the
+event loop is blocked.
+
+    python -m benchmarks.desktop_startup
+"""
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic import chains
+from webapp import project
+from webapp.nodes import DEFAULT_PROPS
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SIZES = [1_000, 20_000, 100_000]
+COLUMNS = 200
+
+
+def payload(n):
+    nodes, connections = chains(n)
+    for i, node in enumerate(nodes.values()):
+        node["x"], node["y"] = float(i % COLUMNS) * 160, float(i // COLUMNS) * 80
+    return {"nodes": list(nodes.values()), "connections": connections}
+
+
+def has_display():
+    return sys.platform in ("win32", "darwin") or bool(os.environ.get("DISPLAY"))
+
+
+def measure_gui(path=None):
+    cmd = [sys.executable, os.path.join(ROOT, "test.py"), "--measure-startup"] + ([path] if path else [])
+    start = time.perf_counter()
+    out = subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True, check=True, timeout=300)
+    wall = time.perf_counter() - start
+    return json.loads(out.stdout.strip().splitlines()[-1]), wall
+
+
+class StubCanvas:
+    """Accepts any canvas call; create_* calls return fresh item ids."""
+
+    def __init__(self):
+        self.items = 0
+
+    def __getattr__(self, name):
+        def call(*args, **kwargs):
+            self.items += 1
+            return self.items
+        return call
+
+
+class StubLoop:
+    """Stub root window: an after()/after_idle() queue; run() drains it, timing each callback."""
+
+    def __init__(self):
+        self.queue = []
+        self.longest = 0.0
+
+    def after(self, ms, fn, *args):
+        self.queue.append(fn)
+        return len(self.queue)
+
+    after_idle = after
+
+    def after_cancel(self, job):
+        self.queue[job - 1] = None
+
+    def title(self, *args):
+        pass
+
+    geometry = bind = title
+
+    def run(self):
+        i = 0
+        while i < len(self.queue):
+            fn = self.queue[i]
+            i += 1
+            if fn is not None:
+                start = time.perf_counter()
+                fn()
+                self.longest = max(self.longest, time.perf_counter() - start)
+
+
+def headless_app(botapp):
+    loop = StubLoop()
+    cls = botapp.BotBuilderApp
+    init_ui = cls._init_ui
+    cls._init_ui = lambda self: setattr(self, "canvas", StubCanvas())
+    try:
+        app = cls(loop)
+    finally:
+        cls._init_ui = init_ui
+    app.show_properties = lambda node_id: None  # the sidebar needs a real Tk root
+    app.viewport.resize(1000, 700)
+    return app, loop
+
+
+def measure_headless(botapp, data, progressive):
+    app, loop = headless_app(botapp)
+    store = project.from_payload(data, DEFAULT_PROPS)
+    start = time.perf_counter()
+    app.load_store(store, progressive=progressive)
+    first = time.perf_counter() - start
+    loop.longest = max(loop.longest, first)
+    loop.run()
+    total = time.perf_counter() - start
+    assert len(app.nodes) == len(data["nodes"]) and len(app.wire_index) == len(data["connections"])
+    return first, loop.longest, total
+
+
+def main():
+    spec = importlib.util.spec_from_file_location("botapp", os.path.join(ROOT, "test.py"))
+    botapp = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(botapp)
+
+    print("headless load_store (stub canvas)")
+    print(f"{'nodes':>8} {'mode':<12} {'first ms':>9} {'blocked ms':>11} {'total ms':>9}")
+    for n in SIZES:
+        data = payload(n)
+        for label, progressive in (("all at once", False), ("progressive", True)):
+            first, blocked, total = measure_headless(botapp, data, progressive)
+            print(f"{n:>8} {label:<12} {first * 1000:>9.1f} {blocked * 1000:>11.1f} {total * 1000:>9.1f}")
+
+    if not has_display():
+        print("no display; skipping time-to-first-interactive")
+        return
+    print("test.py --measure-startup (seconds since launch)")
+    print(f"{'project':>10} {'interactive':>12} {'loaded':>8} {'process':>8}")
+    times, wall = measure_gui()
+    print(f"{'none':>10} {times['interactive_s']:>12.3f} {times['loaded_s']:>8.3f} {wall:>8.3f}")
+    with tempfile.TemporaryDirectory() as directory:
+        for n in SIZES:
+            path = os.path.join(directory, f"project_{n}{project.BINARY_SUFFIX}")
+            project.save(path, project.from_payload(payload(n), DEFAULT_PROPS))
+            times, wall = measure_gui(path)
+            print(f"{n:>10} {times['interactive_s']:>12.3f} {times['loaded_s']:>8.3f} {wall:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
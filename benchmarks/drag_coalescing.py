@@ -0,0 +1,90 @@
+"""Measure how much drag work RenderScheduler saves.
+
+Replays a 2 second drag with motion events at EVENT_HZ against a virtual
+clock, once applying every event directly (what on_drag used to do) and
+once through desktop.scheduler.RenderScheduler. Each applied update does a
+fixed amount of work standing in for moving a node with WIRES wires. The
+frame loop itself is simulated, so this needs no display.
+
+    python -m benchmarks.drag_coalescing
+"""
+import heapq
+import time
+
+from desktop.scheduler import RenderScheduler
+
+EVENT_HZ = [125, 500, 1000]
+DURATION_S = 2.0
+WIRES = 200
+
+
+class VirtualWidget:
+    """after()/after_idle() on a simulated clock."""
+
+    def __init__(self):
+        self.now = 0.0
+        self._queue = []
+        self._seq = 0
+        self._cancelled = set()
+
+    def clock(self):
+        return self.now
+
+    def after(self, ms, fn):
+        self._seq += 1
+        heapq.heappush(self._queue, (self.now + ms / 1000.0, self._seq, fn))
+        return self._seq
+
+    def after_idle(self, fn):
+        return self.after(0, fn)
+
+    def after_cancel(self, job):
+        self._cancelled.add(job)
+
+    def run_until(self, t):
+        while self._queue and self._queue[0][0] <= t:
+            when, seq, fn = heapq.heappop(self._queue)
+            if seq in self._cancelled:
+                continue
+            self.now = when
+            fn()
+        self.now = t
+
+
+def move_node(_key, dx, dy):
+    # Stand-in for Node.move + update_wires: one coords update per wire
+    acc = 0.0
+    for i in range(WIRES):
+        acc += dx * i + dy
+    return acc
+
+
+def run(hz, coalesce):
+    widget = VirtualWidget()
+    scheduler = RenderScheduler(widget, clock=widget.clock)
+    step = 1.0 / hz
+    applied = 0
+    cpu = time.process_time()
+    for i in range(int(DURATION_S * hz)):
+        widget.run_until(i * step)
+        if coalesce:
+            scheduler.add_delta("node_0", 1.0, 0.5, move_node)
+        else:
+            move_node("node_0", 1.0, 0.5)
+            applied += 1
+    widget.run_until(DURATION_S)
+    scheduler.flush()
+    cpu = time.process_time() - cpu
+    return (scheduler.stats["flushed"] if coalesce else applied), cpu, scheduler.stats
+
+
+def main():
+    print(f"{'events/s':>9} {'direct updates':>15} {'frame updates':>14} {'coalesced':>10} {'cpu direct ms':>14} {'cpu frames ms':>14}")
+    for hz in EVENT_HZ:
+        direct, cpu_direct, _ = run(hz, coalesce=False)
+        framed, cpu_framed, stats = run(hz, coalesce=True)
+        print(f"{hz:>9} {direct:>15} {framed:>14} {stats['coalesced']:>10} {cpu_direct * 1000:>14.1f} {cpu_framed * 1000:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Compare peak memory of buffered and streamed export.
+
+Each (mode, size) runs in a fresh subprocess so peak RSS is not shared
+between runs. The reported figure is the growth of peak RSS while exporting,
+measured after the input payload has been built. The "index" mode builds
+only what every export builds before generating code: the GraphStore and
+its forward adjacency Graph. Streamed export should stay close to it,
+because the only output it holds is one root block at a time.
+
+    python -m benchmarks.export_memory
+"""
+import json
+import os
+import resource
+import subprocess
+import sys
+from io import BytesIO
+
+SIZES = [10_000, 100_000, 400_000]
+MODES = ["index", "buffered", "streamed"]
+
+
+def peak_rss_kib():
+    # ru_maxrss is KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def run_one(mode, size):
+    from benchmarks.synthetic import chains
+    from webapp.graph import Graph
+    from webapp.nodes import DEFAULT_PROPS, export_code, iter_export_code
+    from webapp.store import GraphStore
+
+    nodes, connections = chains(size)
+    before = peak_rss_kib()
+    written = 0
+    if mode == "index":
+        Graph.from_store(GraphStore.from_payload(nodes, connections, DEFAULT_PROPS), incoming=False)
+    elif mode == "buffered":
+        # What /export does: whole string, then a BytesIO copy of it
+        code = export_code(nodes, connections)
+        buf = BytesIO()
+        buf.write(code.encode("utf-8"))
+        written = buf.getbuffer().nbytes
+    else:
+        with open(os.devnull, "wb") as sink:
+            for chunk in iter_export_code(nodes, connections):
+                data = chunk.encode("utf-8")
+                sink.write(data)
+                written += len(data)
+    growth = peak_rss_kib() - before
+    print(json.dumps({"mode": mode, "nodes": size, "output_kib": written // 1024, "peak_growth_kib": growth}))
+
+
+def main():
+    print(f"{'mode':<10} {'nodes':>8} {'output KiB':>11} {'peak RSS growth KiB':>20}")
+    for size in SIZES:
+        for mode in MODES:
+            out = subprocess.run(
+                [sys.executable, "-m", "benchmarks.export_memory", mode, str(size)],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            r = json.loads(out)
+            print(f"{r['mode']:<10} {r['nodes']:>8} {r['output_kib']:>11} {r['peak_growth_kib']:>20}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3:
+        run_one(sys.argv[1], int(sys.argv[2]))
+    else:
+        main()
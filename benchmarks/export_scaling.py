@@ -0,0 +1,46 @@
+"""Check that export_code scales linearly with graph size.
+
+Run from the repository root:
+
+    python -m benchmarks.export_scaling
+"""
+import gc
+import time
+
+from benchmarks.synthetic import chains
+from webapp.nodes import export_code
+
+SIZES = [100, 1_000, 10_000, 100_000]
+# Allowed growth of per-node cost between the smallest and largest size
+# (allocator and cache effects account for a small constant factor).
+# A quadratic walk blows far past this at 100k nodes.
+MAX_PER_NODE_RATIO = 4.0
+
+
+def best_time(fn, repeat=5):
+    best = None
+    gc.collect()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    per_node = []
+    for size in SIZES:
+        nodes, connections = chains(size)
+        elapsed = best_time(lambda: export_code(nodes, connections))
+        per_node.append(elapsed / size)
+        print(f"{size:>8} nodes  {elapsed * 1000:9.2f} ms  {elapsed / size * 1e6:7.3f} us/node")
+
+    ratio = per_node[-1] / per_node[0]
+    print(f"per-node cost ratio {SIZES[-1]}/{SIZES[0]}: {ratio:.2f}")
+    if ratio > MAX_PER_NODE_RATIO:
+        raise SystemExit(f"export_code is not linear: ratio {ratio:.2f} > {MAX_PER_NODE_RATIO}")
+
+
+if __name__ == "__main__":
+    main()
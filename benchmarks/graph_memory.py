@@ -0,0 +1,99 @@
+"""Bytes per node and per edge: GraphStore against the previous representations.
+
+Measured with tracemalloc at 100k nodes and ~100k edges:
+
+- payload dicts: nodes as {"id", "type", "x", "y", "props"} dicts plus a
+  list of [start, end] lists, the shape /export receives;
+- desktop objects: one object per node with the attributes Node had
+  before GraphStore (position, type, definition, props dict, shape and
+  port lists) plus a list of (start, end) tuples;
+- GraphStore, with per-node props (web) and with shared defaults (desktop).
+
+Node ids are counted in every representation.
+
+    python -m benchmarks.graph_memory
+"""
+import tracemalloc
+
+from benchmarks.synthetic import chains
+from webapp.nodes import NODE_TYPES
+from webapp.store import GraphStore
+
+N_NODES = 100_000
+
+
+class LegacyNode:
+    # Attribute set of test.py's Node before it became a GraphStore view
+    def __init__(self, node_type, x, y, node_id, props):
+        self.canvas = None
+        self.node_type = node_type
+        self.id = node_id
+        self.x = x
+        self.y = y
+        self.w = 140
+        self.h = 60
+        self.definition = NODE_TYPES[node_type]
+        self.properties = props
+        self.shapes = [1, 2, 3, 4, 5]
+        self.input_ports = [(4, float(x), y + 30.0)]
+        self.output_ports = [(5, x + 140.0, y + 30.0)]
+
+
+def measure(build):
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    obj = build()
+    used = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    return obj, used
+
+
+def fresh_props(node):
+    # Copy strings too so nothing is shared with the template graph
+    return {k: "".join(v) for k, v in node["props"].items()}
+
+
+def main():
+    template_nodes, template_conns = chains(N_NODES)
+    n_edges = len(template_conns)
+    rows = []
+
+    def payload_nodes():
+        return {
+            nid: {"id": "".join(nid), "type": n["type"], "x": float(i), "y": float(i), "props": fresh_props(n)}
+            for i, (nid, n) in enumerate(template_nodes.items())
+        }
+
+    _, nodes_bytes = measure(payload_nodes)
+    _, edges_bytes = measure(lambda: [[a, b] for a, b in template_conns])
+    rows.append(("payload dicts", nodes_bytes, edges_bytes))
+
+    _, nodes_bytes = measure(lambda: {
+        nid: LegacyNode(n["type"], float(i), float(i), "".join(nid), fresh_props(n))
+        for i, (nid, n) in enumerate(template_nodes.items())
+    })
+    _, edges_bytes = measure(lambda: [(a, b) for a, b in template_conns])
+    rows.append(("desktop objects", nodes_bytes, edges_bytes))
+
+    for label, with_props in (("GraphStore (props)", True), ("GraphStore (defaults)", False)):
+        def build_store():
+            store = GraphStore()
+            for i, (nid, n) in enumerate(template_nodes.items()):
+                store.add_node("".join(nid), n["type"], float(i), float(i), fresh_props(n) if with_props else None)
+            return store
+        store, nodes_bytes = measure(build_store)
+
+        def add_edges():
+            for a, b in template_conns:
+                store.add_edge(a, b)
+        _, edges_bytes = measure(add_edges)
+        rows.append((label, nodes_bytes, edges_bytes))
+
+    print(f"{N_NODES} nodes, {n_edges} edges")
+    print(f"{'representation':<22} {'bytes/node':>11} {'bytes/edge':>11}")
+    for label, nodes_bytes, edges_bytes in rows:
+        print(f"{label:<22} {nodes_bytes / N_NODES:>11.1f} {edges_bytes / n_edges:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
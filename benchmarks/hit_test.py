@@ -0,0 +1,73 @@
+"""Headless hit-test benchmark for the desktop editor's spatial index.
+
+Lays out synthetic graphs the way BotBuilderApp does (node bodies plus
+in/out port boxes) and measures point lookups per second through
+desktop.spatial.SpatialIndex against a linear scan of every box, which is
+what find_closest plus a tag scan amounts to.
+
+    python -m benchmarks.hit_test
+"""
+import random
+import time
+
+from desktop.spatial import SpatialIndex
+
+# Mirrors NODE_WIDTH/NODE_HEIGHT/PORT_RADIUS + PORT_HIT_SLOP in test.py
+NODE_W, NODE_H, PORT_R = 140, 60, 10
+SIZES = [1_000, 5_000, 20_000]
+LOOKUPS = 20_000
+
+
+def layout(n_nodes, seed=0):
+    rng = random.Random(seed)
+    # Roughly 4 node areas of space per node, like a busy but usable canvas
+    side = int((n_nodes * NODE_W * NODE_H * 4) ** 0.5)
+    boxes = {}
+    for i in range(n_nodes):
+        x, y = rng.uniform(0, side), rng.uniform(0, side)
+        nid = f"node_{i}"
+        boxes[nid] = (x, y, x + NODE_W, y + NODE_H)
+        py = y + NODE_H / 2
+        boxes[("in", nid)] = (x - PORT_R, py - PORT_R, x + PORT_R, py + PORT_R)
+        boxes[("out", nid)] = (x + NODE_W - PORT_R, py - PORT_R, x + NODE_W + PORT_R, py + PORT_R)
+    return side, boxes
+
+
+def linear_hits(boxes, x, y):
+    return [k for k, (x0, y0, x1, y1) in boxes.items() if x0 <= x <= x1 and y0 <= y <= y1]
+
+
+def rate(fn, points):
+    start = time.perf_counter()
+    for x, y in points:
+        fn(x, y)
+    return len(points) / (time.perf_counter() - start)
+
+
+def main():
+    rng = random.Random(1)
+    print(f"{'nodes':>7} {'index lookups/s':>16} {'linear lookups/s':>17} {'move updates/s':>15}")
+    for size in SIZES:
+        side, boxes = layout(size)
+        index = SpatialIndex()
+        for key, box in boxes.items():
+            index.insert(key, box)
+        points = [(rng.uniform(0, side), rng.uniform(0, side)) for _ in range(LOOKUPS)]
+        for x, y in points[:200]:
+            assert sorted(map(str, index.query_point(x, y))) == sorted(map(str, linear_hits(boxes, x, y)))
+
+        indexed = rate(index.query_point, points)
+        linear = rate(lambda x, y: linear_hits(boxes, x, y), points[: max(50, LOOKUPS * 100 // size)])
+        # A drag step: node body and both ports move by a few pixels
+        keys = [f"node_{rng.randrange(size)}" for _ in range(LOOKUPS)]
+        start = time.perf_counter()
+        for nid in keys:
+            index.move(nid, 3, 2)
+            index.move(("in", nid), 3, 2)
+            index.move(("out", nid), 3, 2)
+        moves = len(keys) / (time.perf_counter() - start)
+        print(f"{size:>7} {indexed:>16,.0f} {linear:>17,.0f} {moves:>15,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Cost of export metrics: export_code and a Flask /export round trip with
+recording on and off (webapp.metrics.ENABLED).
+
+The Flask run clears the export cache before each request, so every call
+goes through key, build and generate. Needs flask for the second table.
+
+    python -m benchmarks.metrics_overhead
+"""
+import json
+import time
+
+from benchmarks.synthetic import chains
+from webapp import metrics
+from webapp.nodes import export_code
+
+SIZES = [100, 1_000, 10_000]
+REPEATS = 20
+
+
+def best_of(fn, repeats=REPEATS):
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def compare(label, make_fn):
+    print(label)
+    print(f"{'nodes':>8} {'off ms':>9} {'on ms':>9} {'overhead':>9}")
+    for n in SIZES:
+        fn = make_fn(*chains(n))
+        times = {}
+        for enabled in (False, True, False, True):
+            metrics.ENABLED = enabled
+            fn()
+            times[enabled] = min(times.get(enabled, float("inf")), best_of(fn))
+        off, on = times[False], times[True]
+        print(f"{n:>8} {off * 1000:>9.3f} {on * 1000:>9.3f} {(on / off - 1) * 100:>8.1f}%")
+
+
+def flask_export(nodes, connections):
+    from webapp.app import app, export_cache
+
+    client = app.test_client()
+    body = json.dumps({"nodes": list(nodes.values()), "connections": connections})
+
+    def run():
+        export_cache.clear()
+        client.post("/export", data=body, content_type="application/json")
+    return run
+
+
+def main():
+    compare("export_code", lambda nodes, connections: lambda: export_code(nodes, connections))
+    try:
+        import flask  # noqa: F401
+    except ImportError:
+        print("flask not installed; skipping /export")
+        return
+    compare("POST /export (test client)", flask_export)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Node type registry cost with 1,000 registered types.
+
+Writes 1,000 synthetic action/event types as ten JSON node packs in a
+temporary directory and points BOTBUILDER_NODE_PACKS at it. Then it measures:
+
+- startup: importing webapp.nodes in a fresh interpreter, with and without
+  the packs configured (packs are not read at import);
+- first use: reading the packs (len(NODE_TYPES)) and the first lookup of a
+  type, then its templates and default props;
+- per-lookup cost of cached NODE_TYPES / TEMPLATES / DEFAULT_PROPS hits;
+- what building every type eagerly at import would cost instead;
+- export_code on a graph using 100 of the custom types.
+
+    python -m benchmarks.node_registry
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import timeit
+
+TYPES = 1_000
+PACKS = 10
+LOOKUPS = 200_000
+
+STARTUP = """
+import time
+start = time.perf_counter()
+import webapp.nodes
+print(time.perf_counter() - start)
+"""
+
+
+def write_packs(directory):
+    per_pack = TYPES // PACKS
+    for p in range(PACKS):
+        pack = {}
+        for i in range(p * per_pack, (p + 1) * per_pack):
+            if i % 10 == 0:
+                pack[f"Custom Command {i}"] = {
+                    "type": "event",
+                    "code_start": f"@bot.command(name='{{trigger}}_{i}')\nasync def {{func_name}}(ctx):",
+                    "props": [["Trigger", "trigger", f"custom{i}"]],
+                }
+            else:
+                pack[f"Custom Action {i}"] = {
+                    "type": "action",
+                    "code": f"    await ctx.send('{i}: {{text}} {{suffix}}')",
+                    "inputs": ["Flow"],
+                    "outputs": ["Flow"],
+                    "props": [["Text", "text", f"text {i}"], ["Suffix", "suffix", "!"]],
+                }
+        with open(os.path.join(directory, f"pack_{p}.json"), "w") as f:
+            json.dump(pack, f)
+
+
+def startup_ms(env, runs=5):
+    best = None
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", STARTUP], env=env, capture_output=True, text=True, check=True)
+        elapsed = float(out.stdout) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def timed_ms(fn):
+    start = timeit.default_timer()
+    result = fn()
+    return (timeit.default_timer() - start) * 1000, result
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        write_packs(directory)
+        env = {k: v for k, v in os.environ.items() if k != "BOTBUILDER_NODE_PACKS"}
+        print(f"import webapp.nodes, built-in types only: {startup_ms(env):7.2f} ms")
+        env["BOTBUILDER_NODE_PACKS"] = directory
+        print(f"import webapp.nodes, {TYPES} pack types:    {startup_ms(env):7.2f} ms")
+
+        os.environ["BOTBUILDER_NODE_PACKS"] = directory
+        from webapp.codegen import compile_node_types
+        from webapp.nodes import DEFAULT_PROPS, NODE_TYPES, TEMPLATES, export_code
+
+        name = "Custom Action 501"
+        ms, count = timed_ms(lambda: len(NODE_TYPES))
+        print(f"read packs ({count} types):               {ms:7.2f} ms")
+        ms, _ = timed_ms(lambda: NODE_TYPES[name])
+        print(f"first NODE_TYPES[name]:                 {ms * 1000:7.1f} us")
+        ms, _ = timed_ms(lambda: TEMPLATES[name])
+        print(f"first TEMPLATES[name]:                  {ms * 1000:7.1f} us")
+        ms, _ = timed_ms(lambda: DEFAULT_PROPS[name])
+        print(f"first DEFAULT_PROPS[name]:              {ms * 1000:7.1f} us")
+        for label, stmt in (("NODE_TYPES[name]", "NODE_TYPES[name]"), ("TEMPLATES[name]", "TEMPLATES[name]"),
+                            ("DEFAULT_PROPS[name]", "DEFAULT_PROPS[name]"), ("plain dict[name]", "plain[name]")):
+            seconds = min(timeit.repeat(stmt, number=LOOKUPS, repeat=3, globals={
+                "NODE_TYPES": NODE_TYPES, "TEMPLATES": TEMPLATES, "DEFAULT_PROPS": DEFAULT_PROPS,
+                "plain": {name: 1}, "name": name}))
+            print(f"cached {label + ':':<32} {seconds / LOOKUPS * 1e9:7.1f} ns")
+
+        definitions = dict(NODE_TYPES.items())
+        ms, _ = timed_ms(lambda: (compile_node_types(definitions),
+                                  {n: {p[1]: p[2] for p in d["props"]} for n, d in definitions.items()}))
+        print(f"eager build of all {TYPES} types (old import): {ms:7.2f} ms")
+
+        nodes = {}
+        connections = []
+        for i in range(100):
+            nid = f"n{i}"
+            if i % 10 == 0:
+                nodes[nid] = {"id": nid, "type": f"Custom Command {i * 10}", "props": {"trigger": f"c{i}"}}
+            else:
+                nodes[nid] = {"id": nid, "type": f"Custom Action {i * 10 + 1}",
+                              "props": {"text": f"t{i}", "suffix": "?"}}
+                connections.append((f"n{i - 1}", nid))
+        ms, code = timed_ms(lambda: export_code(nodes, connections))
+        print(f"export_code, 100 custom types (first):  {ms:7.2f} ms ({code.count('ctx.send')} sends)")
+        ms, _ = timed_ms(lambda: export_code(nodes, connections))
+        print(f"export_code, 100 custom types (cached): {ms:7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""Delivered messages/second for exported bots: direct sends vs queued mode.
+
+The generated code runs against a fake discord module and fake ctx objects.
+Each fake channel enforces Discord's per-channel limit (RATE messages per
+PER seconds) on a compressed timescale: a call over the limit is answered
+with a simulated 429 and retried after the reset plus a penalty, the way
+discord.py's HTTP client retries. Every API call also costs LATENCY.
+
+K invocations of a command whose flow sends M messages run concurrently
+on one channel. Direct mode (the default export) awaits each ctx.send;
+queued mode (export_code(..., queued=True)) hands them to the outbox,
+paced to the same compressed limit.
+
+    python -m benchmarks.outbound_queue
+"""
+import asyncio
+import sys
+import time
+import types
+
+from webapp.nodes import export_code
+
+RATE = 5
+PER = 0.25  # seconds; stands in for Discord's 5 s window
+PENALTY = 0.05
+LATENCY = 0.005
+INVOCATIONS = 50
+SENDS_PER_FLOW = 6
+TEXT_CHARS = 100
+
+
+class FakeChannel:
+    def __init__(self, channel_id):
+        self.id = channel_id
+        self.window = None
+        self.used = 0
+        self.api_calls = 0
+        self.rate_limited = 0
+        self.delivered = 0
+
+    async def post(self, text):
+        while True:
+            self.api_calls += 1
+            await asyncio.sleep(LATENCY)
+            now = time.perf_counter()
+            if self.window is None or now - self.window >= PER:
+                self.window, self.used = now, 0
+            if self.used < RATE:
+                self.used += 1
+                self.delivered += text.count("\n") + 1
+                return
+            self.rate_limited += 1
+            await asyncio.sleep(self.window + PER - now + PENALTY)
+
+
+class FakeContext:
+    def __init__(self, channel):
+        self.channel = channel
+
+    async def send(self, text):
+        await self.channel.post(text)
+
+    async def reply(self, text):
+        await self.channel.post(text)
+
+
+class FakeBot:
+    def __init__(self, **kwargs):
+        self.commands = {}
+
+    def command(self, name):
+        def register(func):
+            self.commands[name] = func
+            return func
+        return register
+
+    def event(self, func):
+        return func
+
+    def run(self, token):
+        pass
+
+
+def install_fake_discord():
+    discord = types.ModuleType("discord")
+    discord.Intents = types.SimpleNamespace(default=types.SimpleNamespace)
+    ext = types.ModuleType("discord.ext")
+    commands = types.ModuleType("discord.ext.commands")
+    commands.Bot = FakeBot
+    discord.ext = ext
+    ext.commands = commands
+    sys.modules.update({"discord": discord, "discord.ext": ext, "discord.ext.commands": commands})
+
+
+def flow():
+    nodes = {"cmd": {"id": "cmd", "type": "Command", "props": {"trigger": "spam"}}}
+    connections = []
+    prev = "cmd"
+    for i in range(SENDS_PER_FLOW):
+        nid = f"send_{i}"
+        nodes[nid] = {"id": nid, "type": "Send Message", "props": {"text": f"message {i} ".ljust(TEXT_CHARS, "x")}}
+        connections.append((prev, nid))
+        prev = nid
+    return nodes, connections
+
+
+async def run(code):
+    namespace = {}
+    exec(compile(code, "<exported bot>", "exec"), namespace)
+    outbox = namespace.get("outbox")
+    if outbox is not None:
+        outbox.per = PER
+    command = namespace["bot"].commands["spam"]
+    channel = FakeChannel(1)
+    start = time.perf_counter()
+    await asyncio.gather(*(command(FakeContext(channel)) for _ in range(INVOCATIONS)))
+    if outbox is not None:
+        await outbox.flush()
+    return channel, time.perf_counter() - start
+
+
+def main():
+    install_fake_discord()
+    nodes, connections = flow()
+    print(f"{INVOCATIONS} invocations x {SENDS_PER_FLOW} sends, limit {RATE}/{PER}s per channel")
+    print(f"{'mode':<8} {'seconds':>8} {'msgs/s':>8} {'api calls':>10} {'429s':>6}")
+    for label, queued in (("direct", False), ("queued", True)):
+        channel, elapsed = asyncio.run(run(export_code(nodes, connections, queued=queued)))
+        assert channel.delivered == INVOCATIONS * SENDS_PER_FLOW
+        print(f"{label:<8} {elapsed:>8.2f} {channel.delivered / elapsed:>8.0f} "
+              f"{channel.api_calls:>10} {channel.rate_limited:>6}")
+
+
+if __name__ == "__main__":
+    main()
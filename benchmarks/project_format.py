@@ -0,0 +1,53 @@
+"""File size and load time: binary .botproj against plain JSON projects.
+
+For each size, the same chains() graph is saved both ways, then loaded:
+
+- json: json.loads + GraphStore (what a JSON project costs to open);
+- binary: ProjectFile(...).load(), decompressing every block;
+- one flow: ProjectFile(...).load_flow() for a single root, the lazy path
+  the editor uses to open one flow of a large project.
+
+    python -m benchmarks.project_format
+"""
+import time
+
+from benchmarks.synthetic import chains
+from webapp import project
+from webapp.store import GraphStore
+
+SIZES = [1_000, 10_000, 100_000]
+REPEATS = 5
+
+
+def best_of(fn, repeats=REPEATS):
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    print(f"{'nodes':>8} {'json KB':>9} {'binary KB':>10} {'json ms':>8} {'binary ms':>10} {'one flow ms':>12}")
+    for n in SIZES:
+        nodes, connections = chains(n)
+        for i, node in enumerate(nodes.values()):
+            node["x"], node["y"] = float(i % 100) * 160, float(i // 100) * 80
+        store = GraphStore.from_payload(nodes, connections)
+        text = project.dumps_json(store).encode("utf-8")
+        data = project.dumps_binary(store)
+        root_id = next(iter(nodes))
+
+        json_s = best_of(lambda: project.loads_json(text))
+        binary_s = best_of(lambda: project.ProjectFile(data).load())
+        flow_s = best_of(lambda: project.ProjectFile(data).load_flow(root_id))
+        print(
+            f"{n:>8} {len(text) / 1024:>9.0f} {len(data) / 1024:>10.0f} "
+            f"{json_s * 1000:>8.1f} {binary_s * 1000:>10.1f} {flow_s * 1000:>12.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
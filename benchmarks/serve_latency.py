@@ -0,0 +1,109 @@
+"""p50/p99 /export latency at 100 concurrent clients: Flask vs the ASGI mode.
+
+Each server runs in its own process on a local port:
+
+- flask: webapp.app on Werkzeug's threaded server (a thread per request);
+- asgi: webapp.asgi on uvicorn, queue cap raised above the client count;
+- asgi (capped): webapp.asgi with its default queue cap, so excess requests
+  are shed with 503 (counted separately, not in the latencies).
+
+Clients are asyncio tasks sending raw HTTP/1.1 requests, so the client side
+stays cheap. Needs flask and uvicorn installed.
+
+    python -m benchmarks.serve_latency
+"""
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+from benchmarks.synthetic import chains
+
+CLIENTS = 100
+REQUESTS_PER_CLIENT = 10
+NODES_PER_GRAPH = 500
+
+SERVERS = {
+    "flask": ([sys.executable, "-c",
+               "import sys; from webapp.app import app; app.run(port=int(sys.argv[1]), threaded=True)"], {}),
+    "asgi": ([sys.executable, "-m", "uvicorn", "webapp.asgi:app", "--log-level", "warning", "--port"],
+             {"EXPORT_MAX_PENDING": str(CLIENTS * 2)}),
+    "asgi (capped)": ([sys.executable, "-m", "uvicorn", "webapp.asgi:app", "--log-level", "warning", "--port"], {}),
+}
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_for(port, timeout=20):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"server on port {port} did not start")
+
+
+async def post(port, body):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(
+        b"POST /export HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+        b"Connection: close\r\nContent-Length: " + str(len(body)).encode() + b"\r\n\r\n" + body
+    )
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    return int(response.split(b" ", 2)[1])
+
+
+async def client(port, body, latencies, statuses):
+    for _ in range(REQUESTS_PER_CLIENT):
+        start = time.perf_counter()
+        status = await post(port, body)
+        statuses[status] = statuses.get(status, 0) + 1
+        if status == 200:
+            latencies.append(time.perf_counter() - start)
+
+
+async def load(port, body):
+    latencies, statuses = [], {}
+    start = time.perf_counter()
+    await asyncio.gather(*(client(port, body, latencies, statuses) for _ in range(CLIENTS)))
+    return latencies, statuses, time.perf_counter() - start
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def main():
+    nodes, connections = chains(NODES_PER_GRAPH)
+    body = json.dumps({"nodes": list(nodes.values()), "connections": connections}).encode("utf-8")
+    print(f"{CLIENTS} clients x {REQUESTS_PER_CLIENT} requests, {NODES_PER_GRAPH}-node graph")
+    print(f"{'server':<14} {'p50 ms':>8} {'p99 ms':>8} {'ok/s':>7} {'503s':>6}")
+    for label, (cmd, env) in SERVERS.items():
+        port = free_port()
+        proc = subprocess.Popen(cmd + [str(port)], env={**os.environ, **env},
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            wait_for(port)
+            asyncio.run(load(port, body))  # warm up workers and caches
+            latencies, statuses, elapsed = asyncio.run(load(port, body))
+        finally:
+            proc.terminate()
+            proc.wait()
+        print(f"{label:<14} {percentile(latencies, 0.5) * 1000:>8.1f} {percentile(latencies, 0.99) * 1000:>8.1f} "
+              f"{len(latencies) / elapsed:>7.0f} {statuses.get(503, 0):>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Requests/second for the index page and node definitions.
+
+Drives webapp.app through the Flask test client (no network), comparing:
+
+- uncached /: json.dumps + render_template on every request, as before;
+- cached /: the pre-rendered page;
+- cached / (304): the same with a matching If-None-Match;
+- /node-types.json, plain and conditional.
+
+    python -m benchmarks.serve_load
+"""
+import json
+import time
+
+from flask import render_template
+
+import webapp.nodes as nodes_mod
+from webapp.app import app
+
+REQUESTS = 5000
+
+
+@app.route('/_bench/uncached')
+def uncached_index():
+    # The index view before the page was cached
+    return render_template('index.html', node_types=json.dumps(dict(nodes_mod.NODE_TYPES)))
+
+
+def rate(client, path, headers=None, expect=200):
+    resp = client.get(path, headers=headers)
+    assert resp.status_code == expect, (path, resp.status_code)
+    start = time.perf_counter()
+    for _ in range(REQUESTS):
+        client.get(path, headers=headers)
+    return REQUESTS / (time.perf_counter() - start)
+
+
+def main():
+    client = app.test_client()
+    index_etag = client.get('/').headers['ETag']
+    types_etag = client.get('/node-types.json').headers['ETag']
+    cases = [
+        ("uncached /", '/_bench/uncached', None, 200),
+        ("cached /", '/', None, 200),
+        ("cached / (304)", '/', {'If-None-Match': index_etag}, 304),
+        ("/node-types.json", '/node-types.json', None, 200),
+        ("/node-types.json (304)", '/node-types.json', {'If-None-Match': types_etag}, 304),
+    ]
+    print(f"{REQUESTS} requests each")
+    print(f"{'case':<24} {'req/s':>8}")
+    for label, path, headers, expect in cases:
+        print(f"{label:<24} {rate(client, path, headers, expect):>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
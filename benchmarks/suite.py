@@ -0,0 +1,208 @@
+"""Export benchmark suite with JSON output, for comparing commits.
+
+Times three export paths on every synthetic graph shape (see
+benchmarks.synthetic.SHAPES) and size:
+
+- export_code: webapp.nodes.export_code on the payload dicts;
+- flask: a POST /export round trip through Flask's test client, with the
+  export cache cleared first so every call generates code (needs flask);
+- desktop: BotBuilderApp.export_bot's traversal and rendering, run
+  headless on a store and canvas-less Node views (needs tkinter importable;
+  no window is opened and nothing is written).
+
+Results go to stdout or --output as JSON. --profile DIR writes a cProfile
+dump per case, --tracemalloc adds each case's peak traced allocation, and
+--compare OLD.json reports cases that got slower than --tolerance allows
+(exit status 1 if any did).
+
+    python -m benchmarks.suite --output before.json
+    python -m benchmarks.suite --compare before.json
+"""
+import argparse
+import cProfile
+import gc
+import importlib.util
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+import types
+
+from benchmarks.synthetic import SHAPES
+from webapp.nodes import export_code
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SIZES = [1_000, 10_000]
+REPEATS = 5
+TOLERANCE = 1.25
+
+
+def setup_export_code(nodes, connections):
+    return lambda: export_code(nodes, connections)
+
+
+def setup_flask(nodes, connections):
+    from webapp.app import app, export_cache
+
+    client = app.test_client()
+    body = json.dumps({"nodes": list(nodes.values()), "connections": connections})
+
+    def run():
+        export_cache.clear()
+        response = client.post("/export", data=body, content_type="application/json")
+        assert response.status_code == 200, response.get_data(as_text=True)
+        return response.get_data()
+    return run
+
+
+def load_desktop():
+    # test.py is the desktop app; load it by path, "test" would be the stdlib package
+    spec = importlib.util.spec_from_file_location("botapp", os.path.join(ROOT, "test.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    # No save dialog: export_bot stops after building the code
+    module.filedialog = types.SimpleNamespace(asksaveasfilename=lambda **kwargs: "")
+    return module
+
+
+def setup_desktop(nodes, connections):
+    botapp = load_desktop()
+    store = botapp.GraphStore.from_payload(nodes, connections, botapp.DEFAULT_PROPS)
+    app = types.SimpleNamespace(store=store, nodes={}, finish_loading=lambda: None,
+                                props_panel=types.SimpleNamespace(flush=lambda: None))
+    for idx in store.nodes():
+        node = botapp.Node(None, store, idx, None)
+        app.nodes[node.id] = node
+    return lambda: botapp.BotBuilderApp.export_bot(app)
+
+
+TARGETS = {
+    "export_code": setup_export_code,
+    "flask": setup_flask,
+    "desktop": setup_desktop,
+}
+
+
+def timings(fn, repeats):
+    gc.collect()
+    result = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        result.append(time.perf_counter() - start)
+    return result
+
+
+def peak_traced(fn):
+    """Peak bytes traced by tracemalloc while fn runs."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                             capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip()
+
+
+def run_case(target, shape, size, args):
+    case = {"target": target, "shape": shape, "nodes": size}
+    nodes, connections = SHAPES[shape](size)
+    try:
+        fn = TARGETS[target](nodes, connections)
+    except ImportError as e:
+        case["skipped"] = str(e)
+        return case
+    fn()  # warm up imports and caches
+    times = timings(fn, args.repeats)
+    case["best_s"] = min(times)
+    case["median_s"] = statistics.median(times)
+    case["us_per_node"] = min(times) / len(nodes) * 1e6
+    if args.tracemalloc:
+        case["peak_bytes"] = peak_traced(fn)
+    if args.profile:
+        os.makedirs(args.profile, exist_ok=True)
+        profiler = cProfile.Profile()
+        profiler.runcall(fn)
+        path = os.path.join(args.profile, f"{target}-{shape}-{size}.prof")
+        profiler.dump_stats(path)
+        case["profile"] = path
+    return case
+
+
+def compare(results, old_path, tolerance):
+    """Print cases slower than tolerance times their old best; return them."""
+    with open(old_path) as f:
+        old = {(c["target"], c["shape"], c["nodes"]): c for c in json.load(f)["results"]}
+    slower = []
+    for case in results:
+        before = old.get((case["target"], case["shape"], case["nodes"]))
+        if not before or "best_s" not in before or "best_s" not in case:
+            continue
+        ratio = case["best_s"] / before["best_s"]
+        flag = ""
+        if ratio > tolerance:
+            slower.append(case)
+            flag = "  SLOWER"
+        print(f"{case['target']:<12} {case['shape']:<11} {case['nodes']:>8} "
+              f"{before['best_s'] * 1000:>9.2f} -> {case['best_s'] * 1000:>9.2f} ms  x{ratio:.2f}{flag}",
+              file=sys.stderr)
+    return slower
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite", description=__doc__.splitlines()[0])
+    parser.add_argument("--targets", nargs="+", choices=list(TARGETS), default=list(TARGETS))
+    parser.add_argument("--shapes", nargs="+", choices=list(SHAPES), default=list(SHAPES))
+    parser.add_argument("--sizes", nargs="+", type=int, default=SIZES)
+    parser.add_argument("--repeats", type=int, default=REPEATS)
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--profile", metavar="DIR", help="write a cProfile dump per case into DIR")
+    parser.add_argument("--tracemalloc", action="store_true", help="record peak traced memory per case")
+    parser.add_argument("--compare", metavar="OLD", help="compare against an earlier JSON report")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE,
+                        help="slowdown ratio --compare accepts (default %(default)s)")
+    args = parser.parse_args(argv)
+
+    results = []
+    for target in args.targets:
+        for shape in args.shapes:
+            for size in args.sizes:
+                case = run_case(target, shape, size, args)
+                results.append(case)
+                if "skipped" in case:
+                    print(f"{target:<12} {shape:<11} {size:>8}  skipped: {case['skipped']}", file=sys.stderr)
+                else:
+                    print(f"{target:<12} {shape:<11} {size:>8}  {case['best_s'] * 1000:9.2f} ms", file=sys.stderr)
+
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeats": args.repeats,
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if args.compare and compare(results, args.compare, args.tolerance):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Synthetic bot graphs in the payload shape accepted by ``/export``."""
+
+ACTION_TYPES = ["Send Message", "Reply to User", "Print Console"]
+
+
+def chains(n_nodes, chain_len=10):
+    """Build independent Command -> action -> action ... flows.
+
+    Returns (nodes, connections) where nodes maps id to node dict, the
+    same structure ``webapp.nodes.export_code`` takes.
+    """
+    nodes = {}
+    connections = []
+    prev_id = None
+    for i in range(n_nodes):
+        nid = f"node_{i}"
+        if i % chain_len == 0:
+            nodes[nid] = {"id": nid, "type": "Command", "props": {"trigger": f"cmd{i}"}}
+        else:
+            ntype = ACTION_TYPES[i % len(ACTION_TYPES)]
+            nodes[nid] = {"id": nid, "type": ntype, "props": {"text": f"message {i}"}}
+            connections.append((prev_id, nid))
+        prev_id = nid
+    return nodes, connections
+
+
+def _action(nodes, i, nid=None):
+    nid = nid or f"node_{i}"
+    nodes[nid] = {"id": nid, "type": ACTION_TYPES[i % len(ACTION_TYPES)], "props": {"text": f"message {i}"}}
+    return nid
+
+
+def fan_out(n_nodes, width=10):
+    """Build Command flows where the root wires to width actions at once.
+
+    Each flow is a root fanning out to width branches that join again in
+    one final action, so it has both fan-out and fan-in.
+    """
+    nodes = {}
+    connections = []
+    group = width + 2
+    for start in range(0, n_nodes - group + 1, group):
+        root = f"node_{start}"
+        nodes[root] = {"id": root, "type": "Command", "props": {"trigger": f"cmd{start}"}}
+        join = _action(nodes, start + group - 1)
+        for i in range(start + 1, start + group - 1):
+            branch = _action(nodes, i)
+            connections.append((root, branch))
+            connections.append((branch, join))
+    return nodes, connections
+
+
+def many_roots(n_nodes):
+    """Build n_nodes // 2 Command roots with one action each."""
+    return chains(n_nodes - n_nodes % 2, chain_len=2)
+
+
+def deep(n_nodes):
+    """Build a single Command flow that is one chain of n_nodes - 1 actions."""
+    return chains(n_nodes, chain_len=n_nodes)
+
+
+# Graph shapes by name, each called as shape(n_nodes)
+SHAPES = {
+    "chains": chains,
+    "fan_out": fan_out,
+    "many_roots": many_roots,
+    "deep": deep,
+}
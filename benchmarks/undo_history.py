@@ -0,0 +1,101 @@
+"""Undo/redo cost on a 10k-node graph, delta log vs full snapshots.
+
+Drives BotBuilderApp headless (stub canvas and event loop, as in
+benchmarks.desktop_startup) through a few edits. It records each edit in
+the app's History the way the UI does, then times undo and redo and
+reports the bytes the entry holds. For comparison, "snapshot" is a
+whole-graph copy per entry (snapshot_nodes of every node), restored by
+deleting and re-adding everything.
+
+    python -m benchmarks.undo_history
+"""
+import importlib.util
+import os
+import time
+
+from benchmarks.desktop_startup import ROOT, headless_app, payload
+from desktop.history import AddNodes, DeleteNodes, MoveNodes, deep_size
+from webapp import project
+from webapp.nodes import DEFAULT_PROPS
+
+NODES = 10_000
+DRAG_FRAMES = 60
+TYPING = 20
+
+
+def timed_ms(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return (time.perf_counter() - start) * 1000
+
+
+def drag(app, ids):
+    app.select(ids)
+    app.history.seal()
+    for _ in range(DRAG_FRAMES):
+        app._move_selection("selection", 2.0, 1.0)
+    app.history.seal()
+
+
+def delete(app, ids):
+    snapshot = app.snapshot_nodes(ids)
+    app.delete_nodes(ids)
+    app.history.record(DeleteNodes(snapshot))
+
+
+def duplicate(app, ids):
+    new_ids = app.paste_nodes(app.copy_nodes(ids), 40.0, 40.0)
+    app.history.record(AddNodes(app.snapshot_nodes(new_ids, new=True)))
+
+
+def typing(app, node_id):
+    app.history.seal()
+    text = ""
+    for _ in range(TYPING):
+        text += "x"
+        app.set_props([(node_id, "text", text)])
+
+
+def main():
+    spec = importlib.util.spec_from_file_location("botapp", os.path.join(ROOT, "test.py"))
+    botapp = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(botapp)
+    store = project.from_payload(payload(NODES), DEFAULT_PROPS)
+    app, _loop = headless_app(botapp)
+    app.load_store(store, progressive=False)
+    ids = list(app.nodes)
+    action = next(nid for nid in ids if "text" in app.store.props_of(app.store.index[nid]))
+
+    edits = [
+        (f"drag 1 node, {DRAG_FRAMES} frames", lambda: drag(app, ids[:1])),
+        (f"drag 1000 nodes, {DRAG_FRAMES} frames", lambda: drag(app, ids[1000:2000])),
+        (f"type {TYPING} chars", lambda: typing(app, action)),
+        ("delete 100 nodes", lambda: delete(app, ids[3000:3100])),
+        ("duplicate 100 nodes", lambda: duplicate(app, ids[5000:5100])),
+    ]
+    print(f"{NODES} nodes")
+    print(f"{'edit':<28} {'entries':>7} {'bytes':>9} {'undo ms':>8} {'redo ms':>8}")
+    for label, edit in edits:
+        before = len(app.history.undo_stack)
+        edit()
+        entries = len(app.history.undo_stack) - before
+        size = app.history.undo_stack[-1].size
+        undo = timed_ms(app.history.undo, app)
+        redo = timed_ms(app.history.redo, app)
+        print(f"{label:<28} {entries:>7} {size:>9} {undo:>8.2f} {redo:>8.2f}")
+
+    start = time.perf_counter()
+    snapshot = app.snapshot_nodes(list(app.nodes))
+    take = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    app.delete_nodes(list(app.nodes))
+    app.restore_nodes(*snapshot)
+    restore = (time.perf_counter() - start) * 1000
+    print(f"{'snapshot (any edit)':<28} {1:>7} {deep_size(snapshot):>9} {restore:>8.2f} {restore:>8.2f}"
+          f"  (taking it: {take:.2f} ms)")
+    print(f"history: {len(app.history.undo_stack)} entries, {app.history.size} bytes "
+          f"(cap {app.history.limit_bytes}); one MoveNodes of 1 node: {MoveNodes(ids[:1], 1, 1).size} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""Cost of PayloadValidator.validate per 10k nodes, next to parsing and export.
+
+Times json.loads of the request body, validation of the parsed payload and
+export_code on the validated graph, for chains() payloads with positions.
+
+    python -m benchmarks.validation_cost
+"""
+import json
+import time
+
+from benchmarks.synthetic import chains
+from webapp.nodes import export_code
+from webapp.validate import VALIDATOR
+
+SIZES = [10_000, 50_000, 100_000]
+REPEATS = 5
+
+
+def best_of(fn, repeats=REPEATS):
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    print(f"{'nodes':>8} {'parse ms':>9} {'validate ms':>12} {'export ms':>10} {'validate ms/10k':>16}")
+    for n in SIZES:
+        nodes, connections = chains(n)
+        for i, node in enumerate(nodes.values()):
+            node["x"], node["y"] = float(i % 100) * 160, float(i // 100) * 80
+        body = json.dumps({"nodes": list(nodes.values()), "connections": connections})
+        parse_s, payload = best_of(lambda: json.loads(body))
+        validate_s, (valid_nodes, valid_conns) = best_of(lambda: VALIDATOR.validate(payload))
+        export_s, _ = best_of(lambda: export_code(valid_nodes, valid_conns), repeats=3)
+        print(f"{n:>8} {parse_s * 1000:>9.1f} {validate_s * 1000:>12.1f} {export_s * 1000:>10.1f} "
+              f"{validate_s * 1000 / (n / 10_000):>16.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+from collections import namedtuple
+
+# Quiet period after the last keystroke before an edit is applied
+DEBOUNCE_MS = 250
+
+# One applied prop edit; old is what props_of() returned before it
+PropChange = namedtuple("PropChange", "node_id key old new")
+
+
+class ChangeStream:
+    """Fan-out of applied edits to whoever needs to react to them.
+
+    publish(changes) hands a list of PropChange to every subscriber, in
+    subscription order, and marks their nodes dirty. Consumers that poll
+    rather than subscribe (an exporter deciding what to regenerate, say)
+    call take_dirty() to get and reset the dirty node ids.
+    """
+
+    def __init__(self):
+        self._subscribers = []
+        self.dirty = set()
+
+    def subscribe(self, callback):
+        """Call callback(changes) on every publish; returns an unsubscribe function."""
+        self._subscribers.append(callback)
+        return lambda: self._subscribers.remove(callback)
+
+    def publish(self, changes):
+        if not changes:
+            return
+        self.dirty.update(change.node_id for change in changes)
+        for callback in list(self._subscribers):
+            callback(changes)
+
+    def take_dirty(self):
+        dirty, self.dirty = self.dirty, set()
+        return dirty
+
+
+class Debouncer:
+    """Hold the latest value per key until input has been quiet for delay_ms.
+
+    post() restarts the timer; when it fires, apply(pending) gets the
+    {key: value} dict of everything posted since the last run. flush()
+    applies it right away (before a save, export or selection change);
+    cancel() drops it.
+    """
+
+    def __init__(self, widget, apply, delay_ms=DEBOUNCE_MS):
+        self.widget = widget
+        self.apply = apply
+        self.delay_ms = delay_ms
+        self._pending = {}
+        self._job = None
+
+    @property
+    def pending(self):
+        return bool(self._pending)
+
+    def post(self, key, value):
+        self._pending[key] = value
+        if self._job is not None:
+            self.widget.after_cancel(self._job)
+        self._job = self.widget.after(self.delay_ms, self.flush)
+
+    def flush(self):
+        if self._job is not None:
+            self.widget.after_cancel(self._job)
+            self._job = None
+        if self._pending:
+            pending, self._pending = self._pending, {}
+            self.apply(pending)
+
+    def cancel(self):
+        if self._job is not None:
+            self.widget.after_cancel(self._job)
+            self._job = None
+        self._pending = {}
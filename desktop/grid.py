@@ -0,0 +1,19 @@
+def grid_line_rects(width, height, spacing):
+    """Return the 1-pixel grid lines covering a width x height image.
+
+    Lines start at pixel 0 and repeat every spacing pixels (spacing may be
+    fractional); each is an (x0, y0, x1, y1) rectangle as taken by Tk's
+    PhotoImage.put(color, to=...).
+    """
+    rects = []
+    x = 0.0
+    while x < width:
+        px = int(x)
+        rects.append((px, 0, px + 1, height))
+        x += spacing
+    y = 0.0
+    while y < height:
+        py = int(y)
+        rects.append((0, py, width, py + 1))
+        y += spacing
+    return rects
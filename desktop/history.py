@@ -0,0 +1,204 @@
+import sys
+import time
+from collections import deque
+
+# Memory the undo/redo stacks may hold before the oldest entries are dropped
+HISTORY_BYTES = 16 * 1024 * 1024
+# Property edits to the same fields this close together undo as one
+MERGE_S = 1.0
+
+
+def deep_size(obj):
+    """Approximate bytes held by obj and the containers/strings inside it."""
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            size += deep_size(key) + deep_size(value)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        for item in obj:
+            size += deep_size(item)
+    return size
+
+
+class MoveNodes:
+    """node_ids moved by (dx, dy); consecutive moves of the same nodes merge."""
+
+    def __init__(self, node_ids, dx, dy):
+        self.node_ids = frozenset(node_ids)
+        self.dx = dx
+        self.dy = dy
+        self.size = deep_size(self.node_ids) + 64
+
+    def merge(self, other, elapsed):
+        if not isinstance(other, MoveNodes) or other.node_ids != self.node_ids:
+            return False
+        self.dx += other.dx
+        self.dy += other.dy
+        return True
+
+    def undo(self, editor):
+        editor.move_nodes(self.node_ids, -self.dx, -self.dy)
+
+    def redo(self, editor):
+        editor.move_nodes(self.node_ids, self.dx, self.dy)
+
+
+class SetProps:
+    """Prop edits as PropChange(node_id, key, old, new) tuples.
+
+    Edits to the same (node, key) fields within MERGE_S of each other
+    merge, keeping the first old and the last new value.
+    """
+
+    def __init__(self, changes):
+        self.changes = tuple(changes)
+        self.size = deep_size(self.changes)
+
+    def _fields(self):
+        return [(change.node_id, change.key) for change in self.changes]
+
+    def merge(self, other, elapsed):
+        if not isinstance(other, SetProps) or elapsed > MERGE_S or other._fields() != self._fields():
+            return False
+        self.changes = tuple(mine._replace(new=theirs.new) for mine, theirs in zip(self.changes, other.changes))
+        self.size = deep_size(self.changes)
+        return True
+
+    def undo(self, editor):
+        editor.set_props([(c.node_id, c.key, c.old) for c in reversed(self.changes)])
+
+    def redo(self, editor):
+        editor.set_props([(c.node_id, c.key, c.new) for c in self.changes])
+
+
+class AddNodes:
+    """Nodes (and their wires) that were added, as an editor snapshot_nodes() snapshot."""
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        self.size = deep_size(snapshot)
+
+    def merge(self, other, elapsed):
+        return False
+
+    def undo(self, editor):
+        editor.delete_nodes([node[0] for node in self.snapshot[0]])
+
+    def redo(self, editor):
+        editor.restore_nodes(*self.snapshot)
+
+
+class DeleteNodes(AddNodes):
+    """Nodes (and their wires) that were deleted; the inverse of AddNodes."""
+
+    def undo(self, editor):
+        AddNodes.redo(self, editor)
+
+    def redo(self, editor):
+        AddNodes.undo(self, editor)
+
+
+class AddWires:
+    """Wires (start_id, end_id) that were connected."""
+
+    def __init__(self, conns):
+        self.conns = tuple(conns)
+        self.size = deep_size(self.conns)
+
+    def merge(self, other, elapsed):
+        return False
+
+    def undo(self, editor):
+        editor.remove_wires(self.conns)
+
+    def redo(self, editor):
+        editor.add_wires(self.conns)
+
+
+class History:
+    """Undo/redo log of the editor's commands, capped by the memory they hold.
+
+    A command stores only what changed and knows how to apply itself both
+    ways (undo(editor) / redo(editor)), so either costs the size of the
+    change, not of the graph. record() merges a command into the previous
+    one when that one accepts it (merge(other, elapsed)) and no seal() came
+    in between: a drag is many moves but one entry. Recording clears the
+    redo stack. While an entry is being undone or redone, applying is True
+    and record() ignores whatever the editor reports.
+    """
+
+    def __init__(self, limit_bytes=HISTORY_BYTES, clock=time.monotonic):
+        self.limit_bytes = limit_bytes
+        self.clock = clock
+        self.undo_stack = deque()
+        self.redo_stack = []
+        self.size = 0 # bytes held by both stacks, per the commands' size
+        self.applying = False
+        self._sealed = True
+        self._last = 0.0
+
+    @property
+    def can_undo(self):
+        return bool(self.undo_stack)
+
+    @property
+    def can_redo(self):
+        return bool(self.redo_stack)
+
+    def record(self, command):
+        if self.applying:
+            return
+        now = self.clock()
+        for done in self.redo_stack:
+            self.size -= done.size
+        self.redo_stack = []
+        top = self.undo_stack[-1] if self.undo_stack and not self._sealed else None
+        if top is not None:
+            before = top.size
+            if top.merge(command, now - self._last):
+                self.size += top.size - before
+                self._last = now
+                return
+        self.undo_stack.append(command)
+        self.size += command.size
+        self._sealed = False
+        self._last = now
+        # Keep at least the newest entry, however large
+        while self.size > self.limit_bytes and len(self.undo_stack) > 1:
+            self.size -= self.undo_stack.popleft().size
+
+    def seal(self):
+        """End merging: the next command starts a new entry."""
+        self._sealed = True
+
+    def undo(self, editor):
+        """Undo the newest entry; returns False if there is none."""
+        if not self.undo_stack:
+            return False
+        command = self.undo_stack.pop()
+        self._apply(command.undo, editor)
+        self.redo_stack.append(command)
+        return True
+
+    def redo(self, editor):
+        """Redo the newest undone entry; returns False if there is none."""
+        if not self.redo_stack:
+            return False
+        command = self.redo_stack.pop()
+        self._apply(command.redo, editor)
+        self.undo_stack.append(command)
+        return True
+
+    def _apply(self, step, editor):
+        self._sealed = True
+        self.applying = True
+        try:
+            step(editor)
+        finally:
+            self.applying = False
+
+    def clear(self):
+        self.undo_stack.clear()
+        self.redo_stack = []
+        self.size = 0
+        self._sealed = True
@@ -0,0 +1,74 @@
+import time
+
+# Work done per slice before control goes back to the event loop
+SLICE_MS = 8
+
+
+class ChunkedJob:
+    """Run step(item) over items a time slice at a time, between UI events.
+
+    Each slice runs for up to slice_ms, then the next one is scheduled with
+    the widget's after(), so input and redraws are handled in between.
+    after_slice() runs after every slice (e.g. to draw what just loaded)
+    and done() once all items are through. finish() runs the rest at once;
+    cancel() drops it.
+    """
+
+    def __init__(self, widget, items, step, after_slice=None, done=None, slice_ms=SLICE_MS,
+                 clock=time.perf_counter):
+        self.widget = widget
+        self.items = items
+        self.step = step
+        self.after_slice = after_slice
+        self.done = done
+        self.slice_s = slice_ms / 1000.0
+        self.clock = clock
+        self.position = 0
+        self.slices = 0
+        self._job = None
+
+    @property
+    def running(self):
+        return self.position < len(self.items)
+
+    def start(self):
+        """Run the first slice now and schedule the rest."""
+        self._run_slice()
+        return self
+
+    def _run_slice(self):
+        self._job = None
+        deadline = self.clock() + self.slice_s
+        items, step = self.items, self.step
+        end = len(items)
+        i = self.position
+        while i < end:
+            step(items[i])
+            i += 1
+            # Checking the clock every item would cost more than small steps
+            if not i % 64 and self.clock() >= deadline:
+                break
+        self.position = i
+        self.slices += 1
+        if self.after_slice is not None:
+            self.after_slice()
+        if self.running:
+            self._job = self.widget.after(1, self._run_slice)
+        elif self.done is not None:
+            self.done()
+
+    def finish(self):
+        """Run everything left now."""
+        if self._job is not None:
+            self.widget.after_cancel(self._job)
+            self._job = None
+        if self.running:
+            self.slice_s = float("inf")
+            self._run_slice()
+
+    def cancel(self):
+        """Stop without running the rest or done()."""
+        if self._job is not None:
+            self.widget.after_cancel(self._job)
+            self._job = None
+        self.position = len(self.items)
@@ -0,0 +1,86 @@
+import time
+
+FRAME_MS = 16 # ~60 frames per second
+
+
+class RenderScheduler:
+    """Coalesce high-rate UI updates into at most one flush per frame.
+
+    Updates are posted under a key. add_delta() sums (dx, dy) into the
+    pending update for its key; set_latest() keeps only the newest value.
+    Pending updates run once per frame through the widget's after()/
+    after_idle(), or immediately via flush().
+
+    Counters in stats:
+      posted    - updates posted
+      coalesced - deltas merged into an update already pending
+      dropped   - latest-wins values replaced before they were drawn
+      flushed   - update callbacks actually run
+      frames    - frame flushes
+    """
+
+    def __init__(self, widget, frame_ms=FRAME_MS, clock=time.perf_counter):
+        self.widget = widget
+        self.frame_s = frame_ms / 1000.0
+        self.clock = clock
+        self._pending = {} # key -> [apply, args]
+        self._job = None
+        self._last_frame = None
+        self.stats = {"posted": 0, "coalesced": 0, "dropped": 0, "flushed": 0, "frames": 0}
+
+    def add_delta(self, key, dx, dy, apply):
+        """Queue apply(key, dx, dy), summing deltas posted before the next frame."""
+        self.stats["posted"] += 1
+        entry = self._pending.get(key)
+        if entry is not None:
+            pdx, pdy = entry[1]
+            entry[1] = (pdx + dx, pdy + dy)
+            self.stats["coalesced"] += 1
+        else:
+            self._pending[key] = [apply, (dx, dy)]
+        self._schedule()
+
+    def set_latest(self, key, value, apply):
+        """Queue apply(key, value); a newer value for key replaces this one."""
+        self.stats["posted"] += 1
+        if key in self._pending:
+            self.stats["dropped"] += 1
+        self._pending[key] = [apply, (value,)]
+        self._schedule()
+
+    def _schedule(self):
+        if self._job is not None:
+            return
+        now = self.clock()
+        wait = 0 if self._last_frame is None else self.frame_s - (now - self._last_frame)
+        if wait <= 0:
+            self._job = self.widget.after_idle(self._run_frame)
+        else:
+            self._job = self.widget.after(max(1, int(wait * 1000)), self._run_frame)
+
+    def _run_frame(self):
+        self._job = None
+        self._last_frame = self.clock()
+        self.stats["frames"] += 1
+        self._apply_pending()
+
+    def _apply_pending(self):
+        pending, self._pending = self._pending, {}
+        for key, (apply, args) in pending.items():
+            apply(key, *args)
+            self.stats["flushed"] += 1
+
+    def flush(self):
+        """Run pending updates now, e.g. before a mouse release is handled."""
+        if self._job is not None:
+            self.widget.after_cancel(self._job)
+            self._job = None
+        self._apply_pending()
+
+    def cancel(self):
+        """Discard pending updates without running them."""
+        if self._job is not None:
+            self.widget.after_cancel(self._job)
+            self._job = None
+        self.stats["dropped"] += len(self._pending)
+        self._pending = {}
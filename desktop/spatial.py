@@ -0,0 +1,98 @@
+class SpatialIndex:
+    """Uniform grid over axis-aligned boxes, keyed by any hashable.
+
+    Each box is registered in every grid cell it overlaps, so point and
+    rectangle queries only look at the boxes in the cells they touch.
+    Moving a box only rewrites cell membership when it crosses a cell edge.
+    """
+
+    def __init__(self, cell_size=256):
+        self.cell_size = cell_size
+        self._cells = {}  # (cx, cy) -> set of keys
+        self._boxes = {}  # key -> (x0, y0, x1, y1)
+
+    def __len__(self):
+        return len(self._boxes)
+
+    def __contains__(self, key):
+        return key in self._boxes
+
+    def box(self, key):
+        return self._boxes[key]
+
+    def _cell_range(self, box):
+        size = self.cell_size
+        x0, y0, x1, y1 = box
+        return int(x0 // size), int(y0 // size), int(x1 // size), int(y1 // size)
+
+    def _add_cells(self, key, cells):
+        cx0, cy0, cx1, cy1 = cells
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                self._cells.setdefault((cx, cy), set()).add(key)
+
+    def _remove_cells(self, key, cells):
+        cx0, cy0, cx1, cy1 = cells
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                bucket = self._cells[(cx, cy)]
+                bucket.discard(key)
+                if not bucket:
+                    del self._cells[(cx, cy)]
+
+    def insert(self, key, box):
+        """Add key with box (x0, y0, x1, y1), replacing any previous box."""
+        old = self._boxes.get(key)
+        self._boxes[key] = box
+        new_cells = self._cell_range(box)
+        if old is not None:
+            old_cells = self._cell_range(old)
+            if old_cells == new_cells:
+                return
+            self._remove_cells(key, old_cells)
+        self._add_cells(key, new_cells)
+
+    def move(self, key, dx, dy):
+        x0, y0, x1, y1 = self._boxes[key]
+        self.insert(key, (x0 + dx, y0 + dy, x1 + dx, y1 + dy))
+
+    def remove(self, key):
+        box = self._boxes.pop(key, None)
+        if box is not None:
+            self._remove_cells(key, self._cell_range(box))
+
+    def query_point(self, x, y):
+        """Return the keys whose box contains (x, y)."""
+        size = self.cell_size
+        bucket = self._cells.get((int(x // size), int(y // size)), ())
+        boxes = self._boxes
+        hits = []
+        for key in bucket:
+            x0, y0, x1, y1 = boxes[key]
+            if x0 <= x <= x1 and y0 <= y <= y1:
+                hits.append(key)
+        return hits
+
+    def query_rect(self, box):
+        """Return the set of keys whose box overlaps box (x0, y0, x1, y1)."""
+        qx0, qy0, qx1, qy1 = box
+        cx0, cy0, cx1, cy1 = self._cell_range(box)
+        boxes = self._boxes
+        hits = set()
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > len(self._cells):
+            # Query covers more cells than are occupied; walk those instead
+            candidates = (k for bucket in self._cells.values() for k in bucket)
+        else:
+            candidates = (
+                k
+                for cx in range(cx0, cx1 + 1)
+                for cy in range(cy0, cy1 + 1)
+                for k in self._cells.get((cx, cy), ())
+            )
+        for key in candidates:
+            if key in hits:
+                continue
+            x0, y0, x1, y1 = boxes[key]
+            if x0 <= qx1 and qx0 <= x1 and y0 <= qy1 and qy0 <= y1:
+                hits.add(key)
+        return hits
@@ -0,0 +1,62 @@
+MIN_ZOOM = 0.05
+MAX_ZOOM = 4.0
+# Below this zoom nodes are drawn as plain rectangles without text or ports
+DETAIL_ZOOM = 0.5
+
+
+class Viewport:
+    """Maps world coordinates (where nodes live) to canvas pixels.
+
+    (x, y) is the world point at the canvas' top-left corner and zoom the
+    number of pixels per world unit.
+    """
+
+    def __init__(self, width=1, height=1):
+        self.x = 0.0
+        self.y = 0.0
+        self.zoom = 1.0
+        self.width = width
+        self.height = height
+
+    @property
+    def detailed(self):
+        return self.zoom >= DETAIL_ZOOM
+
+    def to_screen(self, x, y):
+        return ((x - self.x) * self.zoom, (y - self.y) * self.zoom)
+
+    def to_world(self, sx, sy):
+        return (sx / self.zoom + self.x, sy / self.zoom + self.y)
+
+    def world_rect(self, margin=0):
+        """Visible world box (x0, y0, x1, y1), grown by margin pixels per side."""
+        m = margin / self.zoom
+        return (
+            self.x - m,
+            self.y - m,
+            self.x + self.width / self.zoom + m,
+            self.y + self.height / self.zoom + m,
+        )
+
+    def resize(self, width, height):
+        self.width = max(1, width)
+        self.height = max(1, height)
+
+    def pan(self, dx, dy):
+        """Scroll the view by (dx, dy) pixels."""
+        self.x += dx / self.zoom
+        self.y += dy / self.zoom
+
+    def zoom_at(self, factor, sx, sy):
+        """Zoom by factor keeping the world point under pixel (sx, sy) fixed.
+
+        Returns False if the zoom was already at its limit.
+        """
+        zoom = min(MAX_ZOOM, max(MIN_ZOOM, self.zoom * factor))
+        if zoom == self.zoom:
+            return False
+        wx, wy = self.to_world(sx, sy)
+        self.zoom = zoom
+        self.x = wx - sx / zoom
+        self.y = wy - sy / zoom
+        return True
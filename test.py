@@ -1,14 +1,47 @@
+import time
+_STARTED = time.perf_counter() # for --measure-startup
+
 import tkinter as tk
-from tkinter import ttk, filedialog, messagebox
 import math
 import json
+import sys
+from collections import OrderedDict
+
+from webapp.codegen import TemplateError, check_props
+from webapp.flow import FlowError, check_acyclic, waves
+from webapp.graph import Graph
+# Node definitions are shared with the web app: the built-in types plus any
+# installed node packs (webapp/registry.py). A new node's props stay the
+# shared DEFAULT_PROPS entry until it is edited.
+from webapp.nodes import DEFAULT_PROPS, NODE_TYPES, TEMPLATES
+from webapp.store import GraphStore
+from webapp import project
+from desktop.changes import ChangeStream, Debouncer, PropChange
+from desktop.grid import grid_line_rects
+from desktop.history import AddNodes, AddWires, DeleteNodes, History, MoveNodes, SetProps
+from desktop.lazy import LazyModule
+from desktop.loader import ChunkedJob
+from desktop.spatial import SpatialIndex
+from desktop.scheduler import RenderScheduler
+from desktop.viewport import Viewport
+
+# Dialog modules are only imported when a dialog is first shown
+filedialog = LazyModule("tkinter.filedialog")
+messagebox = LazyModule("tkinter.messagebox")
 
 # --- Constants & Config ---
 GRID_SIZE = 20
 NODE_WIDTH = 140
 NODE_HEIGHT = 60
 PORT_RADIUS = 6
+PORT_HIT_SLOP = 4 # extra pixels around a port that still count as a hit
 HEADER_HEIGHT = 25
+VIEW_MARGIN = 50 # pixels beyond the visible area that are still drawn
+MIN_GRID_SPACING = 8 # skip the grid when its lines would be closer than this
+GRID_LINE_COLOR = "#23272A"
+PROGRESSIVE_LOAD_NODES = 2000 # larger projects open a slice at a time
+PROPERTY_FORMS = 32 # node types whose property forms are kept built
+PASTE_OFFSET = 2 * GRID_SIZE # world units between a copy and its original
 
 COLORS = {
     "bg": "#2C2F33",
@@ -21,156 +54,293 @@ COLORS = {
     "text": "#FFFFFF"
 }
 
-# --- Node Definitions ---
-# Defines the logic and properties for each available node type
-NODE_TYPES = {
-    "Event: On Ready": {
-        "type": "event",
-        "code_start": "@bot.event\nasync def on_ready():",
-        "inputs": [],
-        "outputs": ["Flow"],
-        "props": []
-    },
-    "Command": {
-        "type": "event",
-        "code_start": "@bot.command(name='{trigger}')\nasync def {func_name}(ctx):",
-        "inputs": [],
-        "outputs": ["Flow"],
-        "props": [("Trigger (!name)", "trigger", "hello")]
-    },
-    "Send Message": {
-        "type": "action",
-        "code": "    await ctx.send('{text}')",
-        "inputs": ["Flow"],
-        "outputs": ["Flow"],
-        "props": [("Message Text", "text", "Hello World!")]
-    },
-    "Reply to User": {
-        "type": "action",
-        "code": "    await ctx.reply('{text}')",
-        "inputs": ["Flow"],
-        "outputs": ["Flow"],
-        "props": [("Reply Text", "text", "I hear you!")]
-    },
-    "Print Console": {
-        "type": "action",
-        "code": "    print('{text}')",
-        "inputs": ["Flow"],
-        "outputs": ["Flow"],
-        "props": [("Log Text", "text", "Debug message")]
-    }
-}
-
 class Node:
-    def __init__(self, canvas, node_type, x, y, node_id):
+    """Canvas view of one node; its data lives in the app's GraphStore."""
+
+    __slots__ = ("canvas", "viewport", "store", "index", "shapes", "input_ports", "output_ports")
+    w = NODE_WIDTH
+    h = NODE_HEIGHT
+
+    def __init__(self, canvas, store, index, viewport):
         self.canvas = canvas
-        self.node_type = node_type
-        self.id = node_id
-        self.x = x
-        self.y = y
-        self.w = NODE_WIDTH
-        self.h = NODE_HEIGHT
-        
-        self.definition = NODE_TYPES[node_type]
-        self.properties = {p[1]: p[2] for p in self.definition["props"]}
-        
-        # UI Elements IDs
-        self.shapes = []
-        self.input_ports = [] # (id, x, y)
-        self.output_ports = [] # (id, x, y)
+        self.viewport = viewport
+        self.store = store
+        self.index = index # row in store
         
-        self.draw()
+        # UI Elements IDs; empty while the node is outside the viewport
+        self.shapes = ()
+        self.input_ports = () # canvas ids
+        self.output_ports = () # canvas ids
+
+    @property
+    def id(self):
+        return self.store.ids[self.index]
+
+    @property
+    def node_type(self):
+        return self.store.type_of(self.index)
+
+    @property
+    def definition(self):
+        return NODE_TYPES[self.node_type]
+
+    # World coordinates; the viewport maps them to canvas pixels
+    @property
+    def x(self):
+        return self.store.xs[self.index]
+
+    @property
+    def y(self):
+        return self.store.ys[self.index]
+
+    @property
+    def properties(self):
+        # Read-only; edit through store.set_prop so shared defaults stay intact
+        return self.store.props_of(self.index)
 
     def draw(self):
-        # Clear old shapes
-        for s in self.shapes:
-            self.canvas.delete(s)
-        self.shapes = []
-        self.input_ports = []
-        self.output_ports = []
+        self.undraw()
+        node_id = self.id
+        definition = self.definition
+        shapes = self.shapes = []
+        vp = self.viewport
+        zoom = vp.zoom
+        x0, y0 = vp.to_screen(self.x, self.y)
+        x1, y1 = x0 + self.w * zoom, y0 + self.h * zoom
+        tags = ("node", node_id, "scene")
+
+        if not vp.detailed:
+            # Zoomed out: a single rectangle, no header, text or ports
+            body = self.canvas.create_rectangle(
+                x0, y0, x1, y1, fill=COLORS["node_header"], outline=COLORS["node_outline"], width=1, tags=tags
+            )
+            shapes.append(body)
+            return
 
         # Body
         body = self.canvas.create_rectangle(
-            self.x, self.y, self.x + self.w, self.y + self.h,
-            fill=COLORS["node_bg"], outline=COLORS["node_outline"], width=2, tags=("node", self.id)
+            x0, y0, x1, y1,
+            fill=COLORS["node_bg"], outline=COLORS["node_outline"], width=2, tags=tags
         )
-        self.shapes.append(body)
+        shapes.append(body)
 
         # Header
         header = self.canvas.create_rectangle(
-            self.x, self.y, self.x + self.w, self.y + HEADER_HEIGHT,
-            fill=COLORS["node_header"], outline=COLORS["node_outline"], width=1, tags=("node", self.id)
+            x0, y0, x1, y0 + HEADER_HEIGHT * zoom,
+            fill=COLORS["node_header"], outline=COLORS["node_outline"], width=1, tags=tags
         )
-        self.shapes.append(header)
+        shapes.append(header)
 
         # Title
         text = self.canvas.create_text(
-            self.x + 5, self.y + HEADER_HEIGHT/2,
-            text=self.node_type, anchor="w", fill=COLORS["text"], font=("Arial", 9, "bold"), tags=("node", self.id)
+            x0 + 5 * zoom, y0 + HEADER_HEIGHT/2 * zoom,
+            text=self.node_type, anchor="w", fill=COLORS["text"], font=("Arial", max(1, round(9 * zoom)), "bold"), tags=tags
         )
-        self.shapes.append(text)
+        shapes.append(text)
 
+        self.input_ports = []
+        self.output_ports = []
+        r = PORT_RADIUS * zoom
+        py = (y0 + y1) / 2
         # Inputs
-        if self.definition["inputs"]:
-            py = self.y + self.h/2
+        if definition["inputs"]:
             pid = self.canvas.create_oval(
-                self.x - PORT_RADIUS, py - PORT_RADIUS,
-                self.x + PORT_RADIUS, py + PORT_RADIUS,
-                fill=COLORS.get("wire", "orange"), outline="black", tags=("port_in", self.id)
+                x0 - r, py - r, x0 + r, py + r,
+                fill=COLORS.get("wire", "orange"), outline="black", tags=("port_in", node_id, "scene")
             )
-            self.shapes.append(pid)
-            self.input_ports.append((pid, self.x, py))
+            shapes.append(pid)
+            self.input_ports.append(pid)
 
         # Outputs
-        if self.definition["outputs"]:
-            py = self.y + self.h/2
+        if definition["outputs"]:
             pid = self.canvas.create_oval(
-                self.x + self.w - PORT_RADIUS, py - PORT_RADIUS,
-                self.x + self.w + PORT_RADIUS, py + PORT_RADIUS,
-                fill=COLORS.get("wire", "orange"), outline="black", tags=("port_out", self.id)
+                x1 - r, py - r, x1 + r, py + r,
+                fill=COLORS.get("wire", "orange"), outline="black", tags=("port_out", node_id, "scene")
             )
-            self.shapes.append(pid)
-            self.output_ports.append((pid, self.x + self.w, py))
+            shapes.append(pid)
+            self.output_ports.append(pid)
+
+    def undraw(self):
+        for s in self.shapes:
+            self.canvas.delete(s)
+        self.shapes = ()
+        self.input_ports = ()
+        self.output_ports = ()
 
     def move(self, dx, dy):
-        self.x += dx
-        self.y += dy
+        """Move by (dx, dy) world units."""
+        self.store.move(self.index, dx, dy)
+        zoom = self.viewport.zoom
         for s in self.shapes:
-            self.canvas.move(s, dx, dy)
-        
-        # Update port coordinates
-        new_ins = []
-        for pid, ox, oy in self.input_ports:
-            new_ins.append((pid, ox+dx, oy+dy))
-        self.input_ports = new_ins
+            self.canvas.move(s, dx * zoom, dy * zoom)
+
+    def bounds(self):
+        return (self.x, self.y, self.x + self.w, self.y + self.h)
 
-        new_outs = []
-        for pid, ox, oy in self.output_ports:
-            new_outs.append((pid, ox+dx, oy+dy))
-        self.output_ports = new_outs
+    def port_bounds(self, port_type):
+        center = self.get_port_center(port_type)
+        if center is None:
+            return None
+        r = PORT_RADIUS + PORT_HIT_SLOP
+        return (center[0] - r, center[1] - r, center[0] + r, center[1] + r)
 
     def get_port_center(self, port_type):
-        if port_type == "in" and self.input_ports:
-            return self.input_ports[0][1:] # x, y
-        if port_type == "out" and self.output_ports:
-            return self.output_ports[0][1:]
+        # Ports sit on the left/right edge at mid height
+        if port_type == "in" and self.definition["inputs"]:
+            return (self.x, self.y + self.h/2)
+        if port_type == "out" and self.definition["outputs"]:
+            return (self.x + self.w, self.y + self.h/2)
         return None
 
+class PropertiesPanel:
+    """Sidebar form for the selected node.
+
+    One form is built per node type, on first use, and kept for the next
+    node of that type: selecting a node only refills its entries. Typing is
+    debounced; once the entries go quiet (or the selection changes, or the
+    project is saved or exported) the edits are written to the store and
+    published on changes as PropChange events.
+    """
+
+    def __init__(self, frame, root, changes):
+        self.frame = frame
+        self.changes = changes
+        self.store = None
+        self.node_id = None
+        self.forms = OrderedDict() # node type -> (frame, {prop key: StringVar}), least recent first
+        self.form = None # the type shown, or None for the placeholder
+        self._filling = False
+        self.edits = Debouncer(root, self._apply_edits)
+        self.placeholder = tk.Label(frame, text="Select a node", bg=COLORS["bg"], fg="#99AAB5")
+        self.placeholder.pack()
+
+    def show(self, store, node_id, node_type=None):
+        """Show node_id's props (of type node_type), or the placeholder for None."""
+        self.edits.flush()
+        self.store = store
+        self.node_id = node_id
+        if node_id is None:
+            self._swap(None)
+            return
+        frame, variables = self._form(node_type)
+        self._swap(node_type)
+        props = store.props_of(store.index[node_id])
+        self._filling = True
+        try:
+            for label, key, default in NODE_TYPES[node_type]["props"]:
+                value = props.get(key, default)
+                if variables[key].get() != value:
+                    variables[key].set(value)
+        finally:
+            self._filling = False
+
+    def _form(self, node_type):
+        form = self.forms.get(node_type)
+        if form is not None:
+            self.forms.move_to_end(node_type)
+            return form
+        frame = tk.Frame(self.frame, bg=COLORS["bg"])
+        tk.Label(frame, text=node_type, bg=COLORS["bg"], fg=COLORS["text"], font=("Arial", 10, "bold")).pack(pady=5)
+        variables = {}
+        for label, key, default in NODE_TYPES[node_type]["props"]:
+            tk.Label(frame, text=label, bg=COLORS["bg"], fg=COLORS["text"]).pack(anchor="w")
+            var = variables[key] = tk.StringVar(frame, value=default)
+            tk.Entry(frame, textvariable=var).pack(fill=tk.X, pady=(0, 10))
+            var.trace_add("write", lambda *args, k=key, v=var: self._on_edit(k, v))
+        form = self.forms[node_type] = (frame, variables)
+        while len(self.forms) > PROPERTY_FORMS:
+            old_type, (old_frame, _) = next(iter(self.forms.items()))
+            if old_type == self.form:
+                break
+            del self.forms[old_type]
+            old_frame.destroy()
+        return form
+
+    def _swap(self, node_type):
+        if node_type == self.form:
+            return
+        if self.form is None:
+            self.placeholder.pack_forget()
+        else:
+            self.forms[self.form][0].pack_forget()
+        if node_type is None:
+            self.placeholder.pack()
+        else:
+            self.forms[node_type][0].pack(fill=tk.BOTH, expand=True)
+        self.form = node_type
+
+    def _on_edit(self, key, var):
+        if self._filling or self.node_id is None:
+            return
+        self.edits.post((self.node_id, key), var.get())
+
+    def _apply_edits(self, pending):
+        store = self.store
+        changes = []
+        for (node_id, key), value in pending.items():
+            idx = store.index.get(node_id)
+            if idx is None: # deleted before the edit landed
+                continue
+            old = store.props_of(idx).get(key)
+            if old != value:
+                store.set_prop(idx, key, value)
+                changes.append(PropChange(node_id, key, old, value))
+        self.changes.publish(changes)
+
+    def flush(self):
+        """Write any debounced edits to the store now."""
+        self.edits.flush()
+
+
 class BotBuilderApp:
     def __init__(self, root):
         self.root = root
         self.root.title("Discord Bot Logic Builder")
         self.root.geometry("1000x700")
         
-        # Data
+        # Data: the graph itself lives in the store, Node objects are its canvas views
+        self.store = GraphStore(DEFAULT_PROPS)
         self.nodes = {} # id -> Node
-        self.connections = [] # (start_node_id, end_node_id)
+        self.edges = {} # (start_node_id, end_node_id) -> edge index in store
+        self.wire_items = {} # (start_node_id, end_node_id) -> canvas line id, drawn wires only
+        self.node_wires = {} # node_id -> set of connections touching it
         self.node_counter = 0
         
+        # Spatial indexes for hit-testing: node bodies, and ports keyed ("in"/"out", node_id)
+        self.node_index = SpatialIndex()
+        self.port_index = SpatialIndex()
+        self.wire_index = SpatialIndex() # connection -> world bounding box
+        self.z_order = {} # id -> stacking counter, higher is on top
+        self._z_counter = 0
+
+        # Only nodes and wires inside the viewport have canvas items
+        self.viewport = Viewport()
+        self.drawn_nodes = set()
+
         # State
         self.drag_data = {"item": None, "x": 0, "y": 0}
         self.wire_start = None
-        self.selected_node_id = None
+        self.temp_wire_item = None
+        self.selection = set() # selected node ids
+        self.selected_node_id = None # the selected node while exactly one is
+        self.band_start = None # world point where a rubber band drag began
+        self.band_add = False # Shift held: the band adds to the selection
+        self.band_item = None
+        self.clipboard = None # copy_nodes() snapshot
+        self._pastes = 0 # times the clipboard was pasted, for the offset
+
+        # Motion events are coalesced and drawn once per frame
+        self.scheduler = RenderScheduler(self.root)
+        # Grid image and the (width, height, zoom) it was drawn for
+        self._grid_image = None
+        self._grid_key = None
+        self.context_menu = None # built on first use
+        self.loading = None # ChunkedJob while a large project opens
+        # Applied property edits; subscribe to react to them
+        self.changes = ChangeStream()
+        # Undo/redo log; every user edit records the change it made
+        self.history = History()
+        self.changes.subscribe(lambda changes: self.history.record(SetProps(changes)))
 
         self._init_ui()
 
@@ -186,10 +356,13 @@ class BotBuilderApp:
         tk.Label(self.sidebar, text="Properties", bg=COLORS["bg"], fg=COLORS["text"], font=("Arial", 12, "bold")).pack(pady=10)
         self.props_frame = tk.Frame(self.sidebar, bg=COLORS["bg"])
         self.props_frame.pack(fill=tk.BOTH, expand=True, padx=5)
+        self.props_panel = PropertiesPanel(self.props_frame, self.root, self.changes)
 
         # Export Button
         btn_frame = tk.Frame(self.sidebar, bg=COLORS["bg"])
         btn_frame.pack(side=tk.BOTTOM, fill=tk.X, pady=10, padx=10)
+        tk.Button(btn_frame, text="Open Project", command=self.open_project, bg=COLORS["node_bg"], font=("Arial", 10)).pack(fill=tk.X, pady=(0, 5))
+        tk.Button(btn_frame, text="Save Project", command=self.save_project, bg=COLORS["node_bg"], font=("Arial", 10)).pack(fill=tk.X, pady=(0, 5))
         tk.Button(btn_frame, text="Export Bot.py", command=self.export_bot, bg="#7289DA", fg=COLORS["text"], font=("Arial", 10, "bold")).pack(fill=tk.X)
 
         # Canvas Area
@@ -198,61 +371,146 @@ class BotBuilderApp:
 
         self.canvas = tk.Canvas(self.canvas_frame, bg=COLORS["grid"], highlightthickness=0)
         self.canvas.pack(fill=tk.BOTH, expand=True)
-        
-        self._draw_grid()
+        # The grid is drawn on the first <Configure>, once the size is known
 
         # Bindings
         self.canvas.bind("<Button-1>", self.on_click)
         self.canvas.bind("<B1-Motion>", self.on_drag)
         self.canvas.bind("<ButtonRelease-1>", self.on_release)
+        # Wheel scrolls, Shift+wheel scrolls sideways, Ctrl+wheel zooms
+        self.canvas.bind("<MouseWheel>", self.on_wheel)
+        self.canvas.bind("<Button-4>", self.on_wheel)
+        self.canvas.bind("<Button-5>", self.on_wheel)
+        self.canvas.bind("<Configure>", self.on_configure)
         # Right click menu; on macOS this is sometimes Button-2
         self.canvas.bind("<Button-3>", self.show_context_menu)
         self.canvas.bind("<Button-2>", self.show_context_menu)
         # Key bindings on root so they work when the canvas isn't focused
         self.root.bind("<Delete>", self.delete_selection)
         self.root.bind("<BackSpace>", self.delete_selection)
+        self.root.bind("<Control-a>", self.select_all)
+        self.root.bind("<Control-c>", self.copy_selection)
+        self.root.bind("<Control-v>", self.paste)
+        self.root.bind("<Control-d>", self.duplicate_selection)
+        self.root.bind("<Control-z>", self.undo)
+        self.root.bind("<Control-Z>", self.redo) # Ctrl+Shift+Z
+        self.root.bind("<Control-y>", self.redo)
 
-        # Context Menu
-        self.context_menu = tk.Menu(self.root, tearoff=0)
+    def _build_context_menu(self):
+        # Reads every node type (and so every node pack); done on first right click
+        menu = tk.Menu(self.root, tearoff=0)
         for ntype in NODE_TYPES.keys():
-            self.context_menu.add_command(label=f"Add {ntype}", command=lambda t=ntype: self.add_node(t))
+            menu.add_command(label=f"Add {ntype}", command=lambda t=ntype: self.add_node(t))
+        return menu
 
-    def _draw_grid(self):
-        # Draw grid based on the current canvas size
-        self.canvas.delete('grid_line')
-        try:
-            w = int(self.canvas.winfo_width())
-            h = int(self.canvas.winfo_height())
-        except Exception:
-            w = 2000
-            h = 2000
-        if w <= 1:
-            w = 2000
-        if h <= 1:
-            h = 2000
-        for i in range(0, w, GRID_SIZE):
-            self.canvas.create_line([(i, 0), (i, h)], tag='grid_line', fill="#23272A")
-        for i in range(0, h, GRID_SIZE):
-            self.canvas.create_line([(0, i), (w, i)], tag='grid_line', fill="#23272A")
-
-        # No binding here; the configure event is bound once in _init_ui to redraw on resize
+    def _update_grid(self):
+        # The grid is one image, a cell larger than the canvas each way, so
+        # panning only shifts it; it is redrawn when the size or zoom changes
+        vp = self.viewport
+        key = (vp.width, vp.height, vp.zoom)
+        if key != self._grid_key:
+            self._grid_key = key
+            self.canvas.delete('grid')
+            self._grid_image = None
+            spacing = GRID_SIZE * vp.zoom
+            if spacing < MIN_GRID_SPACING:
+                return
+            w, h = int(vp.width + spacing) + 1, int(vp.height + spacing) + 1
+            image = tk.PhotoImage(width=w, height=h)
+            for rect in grid_line_rects(w, h, spacing):
+                image.put(GRID_LINE_COLOR, to=rect)
+            self._grid_image = image
+            self.canvas.create_image(0, 0, image=image, anchor=tk.NW, tags='grid')
+            self.canvas.tag_lower('grid')
+        self._place_grid()
+
+    def _place_grid(self):
+        # Keep the lines on world multiples of GRID_SIZE
+        if self._grid_image is not None:
+            vp = self.viewport
+            self.canvas.coords('grid', -(vp.x % GRID_SIZE) * vp.zoom, -(vp.y % GRID_SIZE) * vp.zoom)
+
+    def on_configure(self, event):
+        self.viewport.resize(event.width, event.height)
+        self._update_grid()
+        self.sync_view()
+
+    def on_wheel(self, event):
+        up = getattr(event, "delta", 0) > 0 or getattr(event, "num", None) == 4
+        if event.state & 0x0004: # Control
+            if self.viewport.zoom_at(1.1 if up else 1 / 1.1, event.x, event.y):
+                self._update_grid()
+                self.sync_view(rebuild=True)
+            return
+        step = -60 if up else 60
+        if event.state & 0x0001: # Shift
+            self.pan(step, 0)
+        else:
+            self.pan(0, step)
+
+    def pan(self, dx, dy):
+        """Scroll the view by (dx, dy) pixels."""
+        self.viewport.pan(dx, dy)
+        self.canvas.move("scene", -dx, -dy)
+        self._place_grid()
+        self.sync_view()
+
+    def sync_view(self, rebuild=False):
+        """Create canvas items for what entered the viewport and drop what left.
+
+        rebuild redraws everything visible, e.g. after a zoom.
+        """
+        rect = self.viewport.world_rect(VIEW_MARGIN)
+        want_nodes = self.node_index.query_rect(rect)
+        want_wires = self.wire_index.query_rect(rect)
+        if rebuild:
+            drop_nodes, drop_wires = set(self.drawn_nodes), set(self.wire_items)
+        else:
+            drop_nodes = self.drawn_nodes - want_nodes
+            drop_wires = set(self.wire_items).difference(want_wires)
+        for node_id in drop_nodes:
+            self.nodes[node_id].undraw()
+            self.drawn_nodes.discard(node_id)
+        for conn in drop_wires:
+            self._undraw_wire(conn)
+        # Draw in stacking order so overlapping nodes keep their order
+        for node_id in sorted(want_nodes - self.drawn_nodes, key=lambda nid: self.z_order.get(nid, 0)):
+            self._draw_node(node_id)
+        for conn in want_wires:
+            if conn not in self.wire_items:
+                self._draw_wire(conn)
+
+    def _in_view(self, box):
+        x0, y0, x1, y1 = self.viewport.world_rect(VIEW_MARGIN)
+        return box[0] <= x1 and x0 <= box[2] and box[1] <= y1 and y0 <= box[3]
+
+    def _draw_node(self, node_id):
+        self.nodes[node_id].draw()
+        self.drawn_nodes.add(node_id)
+        if node_id in self.selection:
+            self.highlight_node(node_id)
 
     def show_context_menu(self, event):
-        self.drag_data["x"] = event.x
-        self.drag_data["y"] = event.y
+        self.drag_data["x"], self.drag_data["y"] = self.viewport.to_world(event.x, event.y)
         # Ensure keyboard events and bindings work after the context menu
         try:
             self.canvas.focus_set()
         except Exception:
             pass
+        if self.context_menu is None:
+            self.context_menu = self._build_context_menu()
         self.context_menu.post(event.x_root, event.y_root)
 
     def add_node(self, node_type):
         uid = f"node_{self.node_counter}"
         self.node_counter += 1
         x, y = self.drag_data["x"], self.drag_data["y"]
-        node = Node(self.canvas, node_type, x, y, uid)
+        node = Node(self.canvas, self.store, self.store.add_node(uid, node_type, x, y), self.viewport)
         self.nodes[uid] = node
+        self._index_node(node)
+        self._bring_to_front(uid)
+        self._draw_node(uid)
+        self.history.record(AddNodes(self.snapshot_nodes([uid], new=True)))
 
         # Ensure new node is focused when created to make keyboard events work
         try:
@@ -260,6 +518,36 @@ class BotBuilderApp:
         except Exception:
             pass
 
+    def _index_node(self, node):
+        self.node_index.insert(node.id, node.bounds())
+        for port_type in ("in", "out"):
+            box = node.port_bounds(port_type)
+            if box is not None:
+                self.port_index.insert((port_type, node.id), box)
+
+    def _unindex_node(self, node_id):
+        self.node_index.remove(node_id)
+        self.port_index.remove(("in", node_id))
+        self.port_index.remove(("out", node_id))
+
+    def _bring_to_front(self, node_id):
+        self._z_counter += 1
+        self.z_order[node_id] = self._z_counter
+
+    def node_at(self, x, y):
+        """Return the id of the topmost node whose body contains (x, y), or None."""
+        hits = self.node_index.query_point(x, y)
+        if not hits:
+            return None
+        return max(hits, key=lambda nid: self.z_order.get(nid, 0))
+
+    def port_at(self, x, y, port_type):
+        """Return the id of the topmost node with a port_type port at (x, y), or None."""
+        hits = [key[1] for key in self.port_index.query_point(x, y) if key[0] == port_type]
+        if not hits:
+            return None
+        return max(hits, key=lambda nid: self.z_order.get(nid, 0))
+
     def on_click(self, event):
         # Ensure the canvas has focus to respond to keyboard events
         try:
@@ -267,153 +555,407 @@ class BotBuilderApp:
         except Exception:
             pass
 
-        # Check for port click (Wiring)
-        item = self.canvas.find_closest(event.x, event.y)[0]
-        tags = self.canvas.gettags(item)
-        
-        if "port_out" in tags:
-            node_id = next((t for t in tags if t.startswith('node_')), None)
-            if node_id is None:
-                return
-            self.wire_start = node_id
+        wx, wy = self.viewport.to_world(event.x, event.y)
+        # A new gesture: its edits don't merge into the previous undo entry
+        self.history.seal()
+
+        # Check for port click (Wiring); ports are only shown in detailed view
+        port_node_id = self.port_at(wx, wy, "out") if self.viewport.detailed else None
+        if port_node_id is not None:
+            self.wire_start = port_node_id
             return
 
-        # Check for node click (Selection/Dragging)
-        if "node" in tags:
-            node_id = next((t for t in tags if t.startswith('node_')), None)
-            # Clear previous selection highlight
-            if self.selected_node_id and self.selected_node_id != node_id:
-                try:
-                    self.unhighlight_node(self.selected_node_id)
-                except Exception:
-                    pass
-            self.selected_node_id = node_id
+        # Check for node click (Selection/Dragging); Shift toggles a node in or out
+        shift = bool(event.state & 0x0001)
+        node_id = self.node_at(wx, wy)
+        if node_id is not None:
+            if shift:
+                self.select(self.selection ^ {node_id})
+                if node_id not in self.selection:
+                    return
+            elif node_id not in self.selection:
+                self.select({node_id})
+            # Dragging any selected node moves the whole selection
             self.drag_data["item"] = node_id
             self.drag_data["x"] = event.x
             self.drag_data["y"] = event.y
-            # Bring node to front so it appears above other nodes/wires
-            try:
-                for s in self.nodes[node_id].shapes:
-                    self.canvas.tag_raise(s)
-            except Exception:
-                pass
-            self.show_properties(node_id)
+            # Bring the selection to front so it appears above other nodes/wires
+            for nid in sorted(self.selection, key=lambda nid: self.z_order.get(nid, 0)):
+                self._bring_to_front(nid)
+                try:
+                    for s in self.nodes[nid].shapes:
+                        self.canvas.tag_raise(s)
+                except Exception:
+                    pass
             return
         
-        # Clicked whitespace
-        if self.selected_node_id:
-            try:
-                self.unhighlight_node(self.selected_node_id)
-            except Exception:
-                pass
-        self.selected_node_id = None
-        self.show_properties(None)
+        # Clicked whitespace: start a rubber band
+        self.band_start = (wx, wy)
+        self.band_add = shift
+        if not shift:
+            self.select(())
 
     def on_drag(self, event):
-        # Dragging Wire
+        # Dragging Wire: only the latest pointer position matters
         if self.wire_start:
-            self.canvas.delete("temp_wire")
-            start_node = self.nodes[self.wire_start]
-            sx, sy = start_node.get_port_center("out")
-            self.canvas.create_line(sx, sy, event.x, event.y, fill=COLORS["wire_active"], width=2, tags="temp_wire")
+            self.scheduler.set_latest("temp_wire", (event.x, event.y), self._draw_temp_wire)
+            return
+
+        if self.band_start is not None:
+            self.scheduler.set_latest("band", (event.x, event.y), self._draw_band)
             return
 
-        # Dragging Node
+        # Dragging the selection: sum the motion and apply it on the next frame
         if self.drag_data["item"]:
-            dx = event.x - self.drag_data["x"]
-            dy = event.y - self.drag_data["y"]
-            self.nodes[self.drag_data["item"]].move(dx, dy)
+            zoom = self.viewport.zoom
+            dx = (event.x - self.drag_data["x"]) / zoom
+            dy = (event.y - self.drag_data["y"]) / zoom
             self.drag_data["x"] = event.x
             self.drag_data["y"] = event.y
-            self.redraw_wires()
+            self.scheduler.add_delta("selection", dx, dy, self._move_selection)
+
+    def _draw_temp_wire(self, _key, pos):
+        if self.wire_start not in self.nodes:
+            return
+        sx, sy = self.viewport.to_screen(*self.nodes[self.wire_start].get_port_center("out"))
+        if self.temp_wire_item is None:
+            self.temp_wire_item = self.canvas.create_line(
+                sx, sy, pos[0], pos[1], fill=COLORS["wire_active"], width=2, tags="temp_wire"
+            )
+        else:
+            self.canvas.coords(self.temp_wire_item, sx, sy, pos[0], pos[1])
+
+    def _draw_band(self, _key, pos):
+        sx, sy = self.viewport.to_screen(*self.band_start)
+        if self.band_item is None:
+            self.band_item = self.canvas.create_rectangle(
+                sx, sy, pos[0], pos[1], outline=COLORS["wire_active"], dash=(4, 2), tags="band"
+            )
+        else:
+            self.canvas.coords(self.band_item, sx, sy, pos[0], pos[1])
+
+    def _band_rect(self, event):
+        x0, y0 = self.band_start
+        x1, y1 = self.viewport.to_world(event.x, event.y)
+        return (min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1))
+
+    def _move_selection(self, _key, dx, dy):
+        self.move_nodes(self.selection, dx, dy)
+        self.history.record(MoveNodes(self.selection, dx, dy))
 
     def on_release(self, event):
         # Finishing Wire
         if self.wire_start:
+            self.scheduler.cancel()
             self.canvas.delete("temp_wire")
-            item = self.canvas.find_closest(event.x, event.y)[0]
-            tags = self.canvas.gettags(item)
-            if "port_in" in tags:
-                end_node_id = next((t for t in tags if t.startswith('node_')), None)
-                if end_node_id is None:
-                    self.wire_start = None
-                    return
+            self.temp_wire_item = None
+            end_node_id = self.port_at(*self.viewport.to_world(event.x, event.y), "in")
+            if end_node_id is not None:
                 # Avoid duplicates and self-connection
-                if end_node_id != self.wire_start and (self.wire_start, end_node_id) not in self.connections:
-                    self.connections.append((self.wire_start, end_node_id))
-                    self.redraw_wires()
+                conn = (self.wire_start, end_node_id)
+                if end_node_id != self.wire_start and conn not in self.edges:
+                    self.edges[conn] = self.store.add_edge(*conn)
+                    self._add_wire(conn)
+                    self.history.record(AddWires([conn]))
             self.wire_start = None
             return
         
+        if self.band_start is not None:
+            # Select every node the band touches
+            self.scheduler.cancel()
+            self.canvas.delete("band")
+            self.band_item = None
+            hits = self.node_index.query_rect(self._band_rect(event))
+            self.band_start = None
+            self.select(self.selection | hits if self.band_add else hits)
+            return
+
+        if self.drag_data["item"]:
+            # Apply the last motion, then pick up nodes the drag revealed or hid
+            self.scheduler.flush()
+            self.history.seal()
+            self.sync_view()
         self.drag_data["item"] = None
 
+    def _wire_ends(self, start_id, end_id):
+        sx, sy = self.nodes[start_id].get_port_center("out")
+        ex, ey = self.nodes[end_id].get_port_center("in")
+        return sx, sy, ex, ey
+
+    def _wire_coords(self, start_id, end_id):
+        vp = self.viewport
+        sx, sy, ex, ey = self._wire_ends(start_id, end_id)
+        sx, sy = vp.to_screen(sx, sy)
+        ex, ey = vp.to_screen(ex, ey)
+        if not vp.detailed:
+            return (sx, sy, ex, ey)
+        # Bezier-ish curve: horizontal control points, smoothed by Tk
+        dx = min(100, abs(ex - sx) / 2)
+        return (sx, sy, sx + dx, sy, ex - dx, ey, ex, ey)
+
+    def _index_wire(self, conn):
+        sx, sy, ex, ey = self._wire_ends(*conn)
+        self.wire_index.insert(conn, (min(sx, ex), min(sy, ey), max(sx, ex), max(sy, ey)))
+
+    def _add_wire(self, conn, draw=True):
+        start_id, end_id = conn
+        if start_id not in self.nodes or end_id not in self.nodes:
+            return
+        self.node_wires.setdefault(start_id, set()).add(conn)
+        self.node_wires.setdefault(end_id, set()).add(conn)
+        self._index_wire(conn)
+        if draw and self._in_view(self.wire_index.box(conn)):
+            self._draw_wire(conn)
+
+    def _draw_wire(self, conn):
+        self.wire_items[conn] = self.canvas.create_line(
+            *self._wire_coords(*conn), fill=COLORS["wire"], width=2, tags=("wire", "scene"), smooth=self.viewport.detailed
+        )
+
+    def _undraw_wire(self, conn):
+        item = self.wire_items.pop(conn, None)
+        if item is not None:
+            self.canvas.delete(item)
+
+    def _remove_wire(self, conn):
+        self._undraw_wire(conn)
+        self.wire_index.remove(conn)
+        for node_id in conn:
+            wires = self.node_wires.get(node_id)
+            if wires is not None:
+                wires.discard(conn)
+                if not wires:
+                    del self.node_wires[node_id]
+
+    def update_wires(self, node_id):
+        """Move the wires touching node_id in place."""
+        for conn in self.node_wires.get(node_id, ()):
+            self._update_wire(conn)
+
+    def _update_wire(self, conn):
+        self._index_wire(conn)
+        item = self.wire_items.get(conn)
+        if item is not None:
+            self.canvas.coords(item, *self._wire_coords(*conn))
+        elif self._in_view(self.wire_index.box(conn)):
+            # Wire was culled and the move brought it into view; wires still
+            # outside stay culled for sync_view to pick up
+            self._draw_wire(conn)
+
     def redraw_wires(self):
+        """Rebuild the wire indexes from self.edges and redraw visible wires."""
         self.canvas.delete("wire")
-        for start_id, end_id in self.connections:
-            if start_id in self.nodes and end_id in self.nodes:
-                sx, sy = self.nodes[start_id].get_port_center("out")
-                ex, ey = self.nodes[end_id].get_port_center("in")
-                
-                # Bezier-ish curve
-                cx1 = sx + 50
-                cy1 = sy
-                cx2 = ex - 50
-                cy2 = ey
-                
-                self.canvas.create_line(sx, sy, ex, ey, fill=COLORS["wire"], width=2, tags="wire", smooth=True)
+        self.wire_items = {}
+        self.node_wires = {}
+        self.wire_index = SpatialIndex()
+        for conn in self.edges:
+            self._add_wire(conn)
 
     def show_properties(self, node_id):
-        # Clear sidebar
-        for widget in self.props_frame.winfo_children():
-            widget.destroy()
+        if node_id and node_id in self.nodes:
+            self.props_panel.show(self.store, node_id, self.nodes[node_id].node_type)
+        else:
+            self.props_panel.show(self.store, None)
 
-        if not node_id or node_id not in self.nodes:
-            tk.Label(self.props_frame, text="Select a node", bg=COLORS["bg"], fg="#99AAB5").pack()
-            # Unhighlight any previous selection
-            if self.selected_node_id:
-                try:
-                    self.unhighlight_node(self.selected_node_id)
-                except Exception:
-                    pass
+    def select(self, node_ids):
+        """Make node_ids the selection; a single selected node gets the properties panel."""
+        node_ids = set(node_ids)
+        for nid in self.selection - node_ids:
+            self.unhighlight_node(nid)
+        for nid in node_ids - self.selection:
+            self.highlight_node(nid)
+        self.selection = node_ids
+        self.selected_node_id = next(iter(node_ids)) if len(node_ids) == 1 else None
+        self.show_properties(self.selected_node_id)
+
+    def _typing(self, event):
+        # Root key bindings also fire for keys typed into the properties panel
+        return isinstance(getattr(event, "widget", None), tk.Entry)
+
+    def select_all(self, event=None):
+        if event is not None and self._typing(event):
             return
+        self.select(self.nodes)
 
-        # Highlight selection and clear previous highlight
-        if self.selected_node_id and self.selected_node_id != node_id:
-            self.unhighlight_node(self.selected_node_id)
-        self.highlight_node(node_id)
-        node = self.nodes[node_id]
-        tk.Label(self.props_frame, text=node.node_type, bg=COLORS["bg"], fg=COLORS["text"], font=("Arial", 10, "bold")).pack(pady=5)
+    def delete_selection(self, event=None):
+        if event is not None and self._typing(event):
+            return
+        if self.selection:
+            snapshot = self.snapshot_nodes(self.selection)
+            self.delete_nodes(self.selection)
+            self.history.record(DeleteNodes(snapshot))
+            self.select(())
 
-        for label, key, default in node.definition["props"]:
-            tk.Label(self.props_frame, text=label, bg=COLORS["bg"], fg=COLORS["text"]).pack(anchor="w")
-            var = tk.StringVar(value=node.properties.get(key, default))
-            entry = tk.Entry(self.props_frame, textvariable=var)
-            entry.pack(fill=tk.X, pady=(0, 10))
-            
-            # Callback to update node data
-            def update_prop(name=key, v=var):
-                node.properties[name] = v.get()
-            
-            var.trace("w", lambda *args, k=key, v=var: update_prop(k, v))
+    def copy_selection(self, event=None):
+        if event is not None and self._typing(event):
+            return
+        if self.selection:
+            self.clipboard = self.copy_nodes(self.selection)
+            self._pastes = 0
 
-    def delete_selection(self, event):
-        if self.selected_node_id:
-            # Remove node
-            nid = self.selected_node_id
-            # Clear highlight
-            try:
-                self.unhighlight_node(nid)
-            except Exception:
-                pass
-            for s in self.nodes[nid].shapes:
-                self.canvas.delete(s)
-            del self.nodes[nid]
-            
-            # Remove connections
-            self.connections = [c for c in self.connections if c[0] != nid and c[1] != nid]
-            self.redraw_wires()
-            self.selected_node_id = None
-            self.show_properties(None)
+    def paste(self, event=None):
+        if event is not None and self._typing(event):
+            return
+        if self.clipboard is not None:
+            self._pastes += 1
+            offset = PASTE_OFFSET * self._pastes
+            new_ids = self.paste_nodes(self.clipboard, offset, offset)
+            self.history.record(AddNodes(self.snapshot_nodes(new_ids, new=True)))
+            self.select(new_ids)
+
+    def duplicate_selection(self, event=None):
+        if event is not None and self._typing(event):
+            return
+        if self.selection:
+            new_ids = self.paste_nodes(self.copy_nodes(self.selection), PASTE_OFFSET, PASTE_OFFSET)
+            self.history.record(AddNodes(self.snapshot_nodes(new_ids, new=True)))
+            self.select(new_ids)
+
+    def undo(self, event=None):
+        # Typing not yet applied becomes the entry to undo
+        self.props_panel.flush()
+        if self.history.undo(self):
+            self._after_history()
+
+    def redo(self, event=None):
+        self.props_panel.flush()
+        if self.history.redo(self):
+            self._after_history()
+
+    def _after_history(self):
+        self.sync_view()
+        # Drop nodes the step removed; refills the panel with undone props
+        self.select(self.selection & self.nodes.keys())
+
+    # Batch operations. Each one touches only the given nodes and their
+    # wires (through node_wires), and draws what is in view once at the end.
+
+    def move_nodes(self, node_ids, dx, dy):
+        """Move node_ids by (dx, dy) world units, updating each wire once."""
+        conns = set()
+        for nid in node_ids:
+            node = self.nodes.get(nid)
+            if node is None:
+                continue
+            node.move(dx, dy)
+            self._index_node(node)
+            conns.update(self.node_wires.get(nid, ()))
+        for conn in conns:
+            self._update_wire(conn)
+
+    def delete_nodes(self, node_ids):
+        """Remove node_ids and every wire touching them."""
+        node_ids = [nid for nid in node_ids if nid in self.nodes]
+        conns = set()
+        for nid in node_ids:
+            conns.update(self.node_wires.get(nid, ()))
+        for conn in conns:
+            self.store.remove_edge(self.edges.pop(conn))
+            self._remove_wire(conn)
+        for nid in node_ids:
+            self.nodes.pop(nid).undraw()
+            self.drawn_nodes.discard(nid)
+            self._unindex_node(nid)
+            self.z_order.pop(nid, None)
+            self.store.remove_node(nid)
+
+    def copy_nodes(self, node_ids):
+        """Snapshot node_ids and the wires between them, for paste_nodes().
+
+        Returns (nodes, wires): (type, x, y, props) per node in stacking
+        order, and wires as (start, end) positions in that list.
+        """
+        self.finish_loading() # wires still loading would be missed
+        ids = sorted((nid for nid in node_ids if nid in self.nodes), key=lambda nid: self.z_order.get(nid, 0))
+        position = {nid: i for i, nid in enumerate(ids)}
+        store = self.store
+        nodes = []
+        wires = []
+        for nid in ids:
+            idx = store.index[nid]
+            props = store.props[idx]
+            nodes.append((store.type_of(idx), store.xs[idx], store.ys[idx], None if props is None else dict(props)))
+            for start_id, end_id in self.node_wires.get(nid, ()):
+                if start_id == nid and end_id in position:
+                    wires.append((position[nid], position[end_id]))
+        return nodes, wires
+
+    def snapshot_nodes(self, node_ids, new=False):
+        """What restore_nodes() needs to bring node_ids back.
+
+        Returns (nodes, wires): (id, type, x, y, props, z) per node and
+        every wire touching them. new=True is for nodes just added or
+        pasted: every wire they have already exists, so a progressive load
+        is left running instead of being finished first.
+        """
+        if not new:
+            self.finish_loading() # wires still loading would be missed
+        store = self.store
+        nodes = []
+        wires = set()
+        for nid in node_ids:
+            if nid not in self.nodes:
+                continue
+            idx = store.index[nid]
+            props = store.props[idx]
+            nodes.append((nid, store.type_of(idx), store.xs[idx], store.ys[idx],
+                          None if props is None else dict(props), self.z_order.get(nid, 0)))
+            wires.update(self.node_wires.get(nid, ()))
+        return tuple(nodes), tuple(wires)
+
+    def restore_nodes(self, nodes, wires):
+        """Re-add snapshot_nodes()'s nodes under their old ids, then their wires."""
+        for nid, node_type, x, y, props, z in nodes:
+            idx = self.store.add_node(nid, node_type, x, y, None if props is None else dict(props))
+            node = self.nodes[nid] = Node(self.canvas, self.store, idx, self.viewport)
+            self._index_node(node)
+            self.z_order[nid] = z
+        self.add_wires(wires)
+
+    def add_wires(self, conns):
+        for conn in conns:
+            if conn not in self.edges and conn[0] in self.nodes and conn[1] in self.nodes:
+                self.edges[conn] = self.store.add_edge(*conn)
+                self._add_wire(conn, draw=False)
+        self.sync_view()
+
+    def remove_wires(self, conns):
+        for conn in conns:
+            edge = self.edges.pop(conn, None)
+            if edge is not None:
+                self.store.remove_edge(edge)
+                self._remove_wire(conn)
+
+    def set_props(self, items):
+        """Apply (node_id, key, value) edits and publish them on changes."""
+        store = self.store
+        changes = []
+        for nid, key, value in items:
+            idx = store.index.get(nid)
+            if idx is None:
+                continue
+            changes.append(PropChange(nid, key, store.props_of(idx).get(key), value))
+            store.set_prop(idx, key, value)
+        self.changes.publish(changes)
+
+    def paste_nodes(self, clip, dx, dy):
+        """Add copy_nodes()'s snapshot shifted by (dx, dy); returns the new ids."""
+        nodes, wires = clip
+        new_ids = []
+        for node_type, x, y, props in nodes:
+            uid = f"node_{self.node_counter}"
+            self.node_counter += 1
+            idx = self.store.add_node(uid, node_type, x + dx, y + dy, None if props is None else dict(props))
+            node = self.nodes[uid] = Node(self.canvas, self.store, idx, self.viewport)
+            self._index_node(node)
+            self._bring_to_front(uid)
+            new_ids.append(uid)
+        for start, end in wires:
+            conn = (new_ids[start], new_ids[end])
+            self.edges[conn] = self.store.add_edge(*conn)
+            self._add_wire(conn, draw=False)
+        self.sync_view()
+        return new_ids
 
     def highlight_node(self, node_id):
         if not node_id or node_id not in self.nodes:
@@ -438,7 +980,130 @@ class BotBuilderApp:
             except Exception:
                 pass
 
+    def save_project(self):
+        f = filedialog.asksaveasfilename(
+            defaultextension=project.BINARY_SUFFIX,
+            filetypes=[("Bot Project", "*" + project.BINARY_SUFFIX), ("JSON Project", "*.json")]
+        )
+        if f:
+            self.props_panel.flush()
+            project.save(f, self.store)
+
+    def open_project(self):
+        f = filedialog.askopenfilename(filetypes=[("Bot Project", "*" + project.BINARY_SUFFIX + " *.json"), ("All Files", "*")])
+        if not f:
+            return
+        try:
+            store = project.load(f, DEFAULT_PROPS)
+        except (OSError, ValueError, KeyError) as e:
+            messagebox.showerror("Open Project", f"Could not open {f}:\n{e}")
+            return
+        self.load_store(store)
+
+    def load_store(self, store, progressive=None, done=None):
+        """Replace the current graph with store and redraw.
+
+        Projects over PROGRESSIVE_LOAD_NODES nodes (or any, with progressive)
+        open a time slice at a time through after(): nodes in view first, then
+        the rest, then the wires, so the window stays usable while they load.
+        done() runs once everything is in.
+        """
+        if self.loading is not None:
+            self.loading.cancel()
+            self.loading = None
+        for node in self.nodes.values():
+            node.undraw()
+        self.canvas.delete("wire")
+        self.show_properties(None)
+        self.selection = set()
+        self.selected_node_id = None
+        self.drag_data["item"] = None
+        self.wire_start = None
+        self.band_start = None
+        self.history.clear()
+
+        self.store = store
+        self.nodes = {}
+        self.node_wires = {}
+        self.wire_items = {}
+        self.drawn_nodes = set()
+        self.node_index = SpatialIndex()
+        self.port_index = SpatialIndex()
+        self.wire_index = SpatialIndex()
+        self.canvas.delete("wire")
+        self.node_counter = 0
+        # Ids, stacking order and edges are set up front, so edits made while
+        # a large project is still loading see the whole graph
+        order = list(store.nodes())
+        ids = store.ids
+        self.z_order = {ids[idx]: z for z, idx in enumerate(order, 1)}
+        self._z_counter = len(order)
+        for node_id in self.z_order:
+            # Keep new ids clear of loaded "node_<n>" ids; saved ids may be ints
+            suffix = str(node_id).rpartition("_")[2]
+            if suffix.isdigit():
+                self.node_counter = max(self.node_counter, int(suffix) + 1)
+        self.edges = {
+            (ids[s], ids[d]): e for e, (s, d) in enumerate(zip(store.src, store.dst)) if s != -1
+        }
+
+        if progressive is None:
+            progressive = len(order) > PROGRESSIVE_LOAD_NODES
+        if not progressive:
+            for idx in order:
+                self._load_node(idx)
+            for conn in list(self.edges):
+                self._load_wire(conn)
+            self.sync_view(rebuild=True)
+            if done is not None:
+                done()
+            return
+
+        x0, y0, x1, y1 = self.viewport.world_rect(VIEW_MARGIN)
+        xs, ys = store.xs, store.ys
+        order.sort(key=lambda idx: not (x0 - NODE_WIDTH <= xs[idx] <= x1 and y0 - NODE_HEIGHT <= ys[idx] <= y1))
+
+        def load_wires():
+            # Assigned before starting: a first slice that loads every wire
+            # calls loaded(), which must be what clears self.loading
+            self.loading = ChunkedJob(self.root, list(self.edges), self._load_wire, done=loaded)
+            self.loading.start()
+
+        def loaded():
+            self.loading = None
+            if done is not None:
+                done()
+
+        self.loading = ChunkedJob(self.root, order, self._load_node, after_slice=self.sync_view, done=load_wires)
+        self.loading.start()
+
+    def _load_node(self, idx):
+        node = Node(self.canvas, self.store, idx, self.viewport)
+        self.nodes[node.id] = node
+        self._index_node(node)
+
+    def _load_wire(self, conn):
+        edge = self.edges.get(conn)
+        if edge is None or conn in self.node_wires.get(conn[0], ()):
+            return # removed, or already wired up, while loading
+        if conn[0] not in self.nodes or conn[1] not in self.nodes:
+            # An end was deleted while loading
+            self.store.remove_edge(self.edges.pop(conn))
+            return
+        self._add_wire(conn)
+
+    def finish_loading(self):
+        """Load whatever a progressive load_store() has left, right now."""
+        while self.loading is not None:
+            if not self.loading.running:
+                # Finished already; nothing left that would clear it
+                self.loading = None
+                break
+            self.loading.finish()
+
     def export_bot(self):
+        self.finish_loading()
+        self.props_panel.flush()
         code_lines = [
             "import discord",
             "from discord.ext import commands",
@@ -449,37 +1114,52 @@ class BotBuilderApp:
             ""
         ]
 
+        graph = Graph.from_store(self.store)
+        ids = self.store.ids
+        try:
+            check_acyclic(graph.outgoing, ids.__getitem__)
+        except FlowError as e:
+            messagebox.showerror("Export Error", str(e))
+            return
+
+        def chain(root):
+            # Every node root's wires reach, in flow order (fan-out included)
+            for wave in waves(root.index, graph.outgoing):
+                for idx in wave:
+                    yield self.nodes[ids[idx]]
+
         # 1. Find Event/Command Nodes (Roots)
         roots = [n for n in self.nodes.values() if n.definition["type"] == "event"]
 
+        # Header props per root, then check every template before rendering
+        root_props = {}
+        try:
+            for root in roots:
+                props = root.properties.copy()
+                props["func_name"] = f"cmd_{str(root.id).replace('node_', '')}"
+                root_props[root.id] = props
+                check_props(TEMPLATES[root.node_type]["code_start"], props, root.id)
+                for node in chain(root):
+                    template = TEMPLATES[node.node_type].get("code")
+                    if template:
+                        check_props(template, node.properties, node.id)
+        except TemplateError as e:
+            messagebox.showerror("Export Error", str(e))
+            return
+
         for root in roots:
             # Generate header
-            func_name = f"cmd_{root.id.replace('node_', '')}"
-            props = root.properties.copy()
-            props["func_name"] = func_name
-            
-            code_lines.append(root.definition["code_start"].format(**props))
+            code_lines.append(TEMPLATES[root.node_type]["code_start"].render(root_props[root.id]))
             # Validation: Check for ctx usage in downstream nodes when root doesn't define ctx
             root_has_ctx = '(ctx)' in root.definition.get("code_start", "")
             if not root_has_ctx:
                 # Look through connections downstream for nodes that use 'ctx'
-                visited_tmp = set()
-                curr_tmp = root.id
                 ctx_issue = False
-                while True:
-                    next_conn_tmp = next((c for c in self.connections if c[0] == curr_tmp), None)
-                    if not next_conn_tmp:
-                        break
-                    target_tmp = next_conn_tmp[1]
-                    if target_tmp in visited_tmp:
-                        break
-                    visited_tmp.add(target_tmp)
-                    tnode = self.nodes[target_tmp]
+                for tnode in chain(root):
                     code_template = tnode.definition.get("code", "")
                     if 'ctx.' in code_template:
                         ctx_issue = True
                         break
-                    curr_tmp = target_tmp
                 if ctx_issue:
                     proceed = messagebox.askyesno(
                         "Export Warning",
@@ -489,26 +1169,11 @@ class BotBuilderApp:
                         continue
             
             # Traverse children
-            curr_id = root.id
-            visited = set()
-            
-            while True:
-                # Find connection starting from curr_id
-                next_conn = next((c for c in self.connections if c[0] == curr_id), None)
-                if not next_conn:
-                    break
-                    
-                target_id = next_conn[1]
-                if target_id in visited: break # Loop protection
-                visited.add(target_id)
-                
-                node = self.nodes[target_id]
-                if node.definition.get("code"):
+            for node in chain(root):
+                template = TEMPLATES[node.node_type].get("code")
+                if template:
                     # Format code with properties
-                    line = node.definition["code"].format(**node.properties)
-                    code_lines.append(line)
-                
-                curr_id = target_id
+                    code_lines.append(template.render(node.properties))
             
             code_lines.append("") # Spacer
 
@@ -521,7 +1186,48 @@ class BotBuilderApp:
                 file.write("\n".join(code_lines))
             messagebox.showinfo("Success", "Bot code exported successfully!\nDon't forget to replace YOUR_TOKEN_HERE.")
 
+def open_when_mapped(root, app, path):
+    """Open project path once the window is on screen and its size is known."""
+    def on_map(event):
+        if event.widget is root:
+            root.unbind("<Map>")
+            app.load_store(project.load(path, DEFAULT_PROPS))
+
+    root.bind("<Map>", on_map, add=True)
+
+def measure_startup(root, app, path=None):
+    """Print seconds from launch to the first interactive frame and to fully loaded, then quit.
+
+    "Interactive" is the first idle moment after the window is mapped: Tk
+    has drawn the canvas and, when opening a project, its first slice.
+    """
+    times = {}
+
+    def mark(name):
+        times[name] = time.perf_counter() - _STARTED
+        if len(times) == 2:
+            print(json.dumps(times))
+            root.after_idle(root.destroy)
+
+    def on_map(event):
+        if event.widget is not root:
+            return
+        root.unbind("<Map>")
+        if path:
+            app.load_store(project.load(path, DEFAULT_PROPS), done=lambda: mark("loaded_s"))
+        root.after_idle(mark, "interactive_s")
+        if not path:
+            mark("loaded_s")
+
+    root.bind("<Map>", on_map, add=True)
+
 if __name__ == "__main__":
+    # python test.py [PROJECT] [--measure-startup]
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
     root = tk.Tk()
     app = BotBuilderApp(root)
+    if "--measure-startup" in sys.argv:
+        measure_startup(root, app, args[0] if args else None)
+    elif args:
+        open_when_mapped(root, app, args[0])
     root.mainloop()
\ No newline at end of file
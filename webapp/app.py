@@ -1,28 +1,237 @@
-from flask import Flask, render_template, request, send_file, jsonify
+from flask import Flask, Response, g, render_template, request, send_file, jsonify
 from io import BytesIO
+import hashlib
+from itertools import chain
 import json
+import os
+from time import perf_counter
 import webapp.nodes as nodes_mod
+from webapp.incremental import diff_blocks
+from webapp import batch, metrics, project
+from webapp.export_cache import ExportCache
+from webapp.flow import FlowError
+from webapp.validate import MAX_BODY_BYTES, VALIDATOR, PayloadError
 
 app = Flask(__name__, static_folder='static', template_folder='templates')
+# Oversized bodies get 413 before any JSON is parsed
+app.config['MAX_CONTENT_LENGTH'] = MAX_BODY_BYTES
+
+# Repeated exports of an unchanged graph are served from here. Set
+# EXPORT_CACHE_DIR to keep entries on disk across restarts.
+export_cache = ExportCache(directory=os.environ.get('EXPORT_CACHE_DIR'))
+
+_index_page = None
+_node_types_json = None
+
+def _etag(text):
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+def node_types_json():
+    """Return the node definitions as JSON and its ETag."""
+    # Node definitions only change between deploys, so serialize them once;
+    # first use rather than import, since it reads every node pack
+    global _node_types_json
+    if _node_types_json is None:
+        text = json.dumps(dict(nodes_mod.NODE_TYPES))
+        _node_types_json = (text, _etag(text))
+    return _node_types_json
+
+def index_page():
+    """Return the rendered index page and its ETag."""
+    # Rendered on the first request (render_template needs an app context);
+    # debug mode re-renders so template edits show up.
+    global _index_page
+    if _index_page is None or app.debug:
+        html = render_template('index.html', node_types=node_types_json()[0])
+        _index_page = (html, _etag(html))
+    return _index_page
+
+def _conditional(body, etag, cache_control, mimetype):
+    # Answers 304 Not Modified when the client's If-None-Match matches
+    headers = {'ETag': f'"{etag}"', 'Cache-Control': cache_control}
+    if etag in request.if_none_match:
+        return Response(status=304, headers=headers)
+    return Response(body, mimetype=mimetype, headers=headers)
 
 @app.route('/')
 def index():
     # Provide node definitions to the template
-    return render_template('index.html', node_types=json.dumps(nodes_mod.NODE_TYPES))
+    html, etag = index_page()
+    return _conditional(html, etag, 'no-cache', 'text/html')
+
+@app.route('/node-types.json')
+def node_types():
+    text, etag = node_types_json()
+    return _conditional(text, etag, 'public, max-age=3600', 'application/json')
+
+@app.before_request
+def _start_timer():
+    if metrics.ENABLED:
+        g.request_start = perf_counter()
+
+@app.after_request
+def _record_request(response):
+    # Runs for error handler responses too; g.request_start is missing only
+    # if metrics were switched on mid-request
+    start = g.pop('request_start', None)
+    if start is not None:
+        endpoint = (request.endpoint or 'unknown',)
+        metrics.REQUEST_SECONDS.observe(perf_counter() - start, endpoint)
+        metrics.REQUESTS.inc(labels=(endpoint[0], str(response.status_code)))
+        if request.content_length:
+            metrics.REQUEST_BYTES.observe(request.content_length, endpoint)
+    return response
+
+@app.route('/metrics')
+def metrics_page():
+    # Prometheus text format; see webapp/metrics.py
+    return Response(metrics.REGISTRY.render(), content_type=metrics.CONTENT_TYPE)
+
+@app.errorhandler(PayloadError)
+def payload_error(e):
+    return jsonify({'error': str(e)}), e.status
+
+@app.errorhandler(FlowError)
+def flow_error(e):
+    return jsonify({'error': str(e)}), 400
+
+def _export_payload():
+    # Parse and validate an export body in one pass; raises PayloadError
+    with metrics.stage('parse'):
+        payload = request.get_json()
+    if not payload:
+        raise PayloadError('missing payload')
+    with metrics.stage('validate'):
+        nodes, connections = VALIDATOR.validate(payload)
+    metrics.NODES.inc(len(nodes))
+    metrics.EDGES.inc(len(connections))
+    return payload, nodes, connections
 
 @app.route('/export', methods=['POST'])
 def export():
+    _payload, nodes, connections = _export_payload()
+    # ?concurrent=1 runs independent fan-out actions through asyncio.gather;
+    # ?queued=1 sends through a paced, coalescing outbound queue
+    concurrent = bool(request.args.get('concurrent'))
+    queued = bool(request.args.get('queued'))
+    if request.args.get('stream'):
+        return _stream_export(nodes, connections, concurrent, queued)
+    code = export_cache.export(nodes, connections, concurrent, queued)
+    # Return as file
+    with metrics.stage('serialize'):
+        buf = BytesIO()
+        buf.write(code.encode('utf-8'))
+        buf.seek(0)
+        return send_file(buf, as_attachment=True, download_name='exported_bot.py', mimetype='text/x-python')
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+@app.route('/export/cache')
+def export_cache_stats():
+    return jsonify(export_cache.stats())
+
+@app.route('/export/diff', methods=['POST'])
+def export_diff():
+    # Body: {"nodes": [...], "connections": [...], "known": {root_id: key}}
+    # Returns only the root blocks whose key differs from "known".
+    payload, nodes, connections = _export_payload()
+    known = payload.get('known', {})
+    if not isinstance(known, dict):
+        return jsonify({'error': 'known must be an object'}), 400
+    return jsonify(diff_blocks(nodes, connections, known))
+
+@app.route('/export/batch', methods=['POST'])
+def export_batch():
+    # Body: {"bots": [{"name": ..., "nodes": [...], "connections": [...]}, ...]}
+    # Returns a streamed zip with one .py per bot and report.json (per-bot
+    # generation time and errors).
+    payload = request.get_json()
+    if not isinstance(payload, dict) or not isinstance(payload.get('bots'), list):
+        return jsonify({'error': 'missing bots'}), 400
+    # Checked before streaming: once the zip starts, the 200 is already sent
+    if not all(isinstance(spec, dict) for spec in payload['bots']):
+        return jsonify({'error': 'every bot must be an object'}), 400
+    return Response(
+        batch.iter_zip(payload['bots']),
+        mimetype='application/zip',
+        headers={'Content-Disposition': 'attachment; filename=exported_bots.zip'},
+    )
+
+DEFAULT_PROPS = nodes_mod.DEFAULT_PROPS
+
+@app.route('/project/save', methods=['POST'])
+def project_save():
+    # Body: the same {"nodes", "connections"} payload as /export.
+    # ?format=binary returns a .botproj file, otherwise JSON.
     payload = request.get_json()
     if not payload:
         return jsonify({'error': 'missing payload'}), 400
-    nodes = {n['id']: n for n in payload.get('nodes', [])}
-    connections = payload.get('connections', [])
-    code = nodes_mod.export_code(nodes, connections)
-    # Return as file
-    buf = BytesIO()
-    buf.write(code.encode('utf-8'))
-    buf.seek(0)
-    return send_file(buf, as_attachment=True, download_name='exported_bot.py', mimetype='text/x-python')
+    try:
+        store = project.from_payload(payload, DEFAULT_PROPS)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    # A project must open and export again; the binary writer also looks
+    # up every type to find the flows
+    unknown = sorted(set(store.type_names).difference(nodes_mod.NODE_TYPES))
+    if unknown:
+        return jsonify({'error': f'unknown node types {unknown}'}), 400
+    if request.args.get('format') == 'binary':
+        data = project.dumps_binary(store)
+        name, mimetype = 'project' + project.BINARY_SUFFIX, 'application/octet-stream'
+    else:
+        data = project.dumps_json(store).encode('utf-8')
+        name, mimetype = 'project.json', 'application/json'
+    return send_file(BytesIO(data), as_attachment=True, download_name=name, mimetype=mimetype)
+
+@app.route('/project/load', methods=['POST'])
+def project_load():
+    # Body: a project file, either as the "file" form field or the raw body.
+    # ?flow=<root_id> decodes only the blocks that flow touches.
+    upload = request.files.get('file')
+    data = upload.read() if upload else request.get_data()
+    flow = request.args.get('flow')
+    try:
+        if data.startswith(project.MAGIC):
+            pf = project.ProjectFile(data)
+            store = pf.load_flow(flow, DEFAULT_PROPS) if flow else pf.load(DEFAULT_PROPS)
+        else:
+            store = project.loads_json(data, DEFAULT_PROPS)
+    except KeyError:
+        return jsonify({'error': f'unknown flow {flow}'}), 404
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    result = project.to_payload(store)
+    for node in result['nodes']:
+        node.setdefault('props', dict(DEFAULT_PROPS.get(node['type'], {})))
+    return jsonify(result)
+
+def _batched(chunks, size=STREAM_CHUNK_SIZE):
+    # Root blocks are tiny; group them so each HTTP chunk carries ~size bytes
+    buf = []
+    buffered = 0
+    for chunk in chunks:
+        data = chunk.encode('utf-8')
+        buf.append(data)
+        buffered += len(data)
+        if buffered >= size:
+            yield b''.join(buf)
+            buf = []
+            buffered = 0
+    if buf:
+        yield b''.join(buf)
+
+def _stream_export(nodes, connections, concurrent=False, queued=False):
+    # No Content-Length, so the server sends the body with chunked transfer
+    # encoding.
+    chunks = nodes_mod.iter_export_code(nodes, connections, concurrent, queued)
+    # Pull the header now: the generator checks the whole graph first, so
+    # errors surface here instead of after the response has started.
+    first = next(chunks)
+    return Response(
+        _batched(chain([first], chunks)),
+        mimetype='text/x-python',
+        headers={'Content-Disposition': 'attachment; filename=exported_bot.py'},
+    )
 
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=8080, debug=True)
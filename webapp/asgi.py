@@ -0,0 +1,223 @@
+"""ASGI serving mode for the export service.
+
+Serves the same "/", "/node-types.json" and "POST /export" contract as
+webapp.app, but from async handlers: parsing and code generation run on a
+bounded process pool, so the event loop keeps accepting connections while
+exports are in flight. When MAX_PENDING exports are already queued or
+running, new ones get 503 with Retry-After instead of piling up.
+
+    uvicorn webapp.asgi:app --port 8080
+
+Settings come from the environment: EXPORT_WORKERS (pool size, default CPU
+count), EXPORT_MAX_PENDING (default 8 per worker) and EXPORT_CACHE_DIR.
+"""
+import asyncio
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qs
+
+from webapp.app import app as flask_app, index_page, node_types_json
+from webapp.batch import pool_context
+from webapp.codegen import TemplateError
+from webapp.export_cache import ExportCache
+from webapp.validate import MAX_BODY_BYTES, VALIDATOR, PayloadError
+
+WORKERS = int(os.environ.get("EXPORT_WORKERS", 0)) or os.cpu_count() or 1
+MAX_PENDING = int(os.environ.get("EXPORT_MAX_PENDING", 0)) or WORKERS * 8
+RETRY_AFTER = "1"
+
+# One per worker process; the directory tier, if set, is shared
+_worker_cache = None
+
+
+def export_job(body, concurrent=False, queued=False):
+    """Parse an /export body and generate its code; runs in a worker process.
+
+    Returns (status, content_type, payload bytes).
+    """
+    global _worker_cache
+    if _worker_cache is None:
+        _worker_cache = ExportCache(directory=os.environ.get("EXPORT_CACHE_DIR"))
+    try:
+        payload = json.loads(body) if body else None
+        if not payload:
+            raise PayloadError("missing payload")
+        nodes, connections = VALIDATOR.validate(payload)
+        code = _worker_cache.export(nodes, connections, concurrent, queued)
+    except ValueError as e:
+        # PayloadError, FlowError, bad JSON; TemplateError is a KeyError
+        return getattr(e, "status", 400), "application/json", _error(e)
+    except TemplateError as e:
+        return 400, "application/json", _error(e)
+    return 200, "text/x-python", code.encode("utf-8")
+
+
+def _error(e):
+    return json.dumps({"error": str(e)}).encode("utf-8")
+
+
+class ExportService:
+    """Runs export_job on a process pool with a cap on queued work.
+
+    pending counts /export requests holding a slot: reserve() takes one
+    before the request body is read, so uploads in progress count against
+    max_pending too, and release() gives it back. It is only touched from
+    the event loop, so it needs no lock.
+    """
+
+    def __init__(self, workers=WORKERS, max_pending=MAX_PENDING):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self.rejected = 0
+        self.executor = None
+
+    def start(self):
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=pool_context())
+
+    def stop(self):
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+            self.executor = None
+
+    @property
+    def full(self):
+        return self.pending >= self.max_pending
+
+    def reserve(self):
+        """Take a slot for one export; False (and counted as rejected) if full."""
+        if self.full:
+            self.rejected += 1
+            return False
+        self.pending += 1
+        return True
+
+    def release(self):
+        self.pending -= 1
+
+    async def export(self, body, concurrent=False, queued=False):
+        """Run one export on the pool; the caller holds a reserve()d slot."""
+        self.start()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, export_job, body, concurrent, queued)
+
+
+service = ExportService()
+_index = None
+
+
+async def _read_body(receive, limit=MAX_BODY_BYTES):
+    # None if the client went away, False if the body is over limit
+    chunks = []
+    size = 0
+    more = True
+    while more:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return None
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > limit:
+            return False
+        chunks.append(chunk)
+        more = message.get("more_body", False)
+    return b"".join(chunks)
+
+
+async def _respond(send, status, body=b"", content_type=None, headers=()):
+    raw = [(b"content-length", str(len(body)).encode("latin-1"))]
+    if content_type:
+        raw.append((b"content-type", content_type.encode("latin-1")))
+    raw.extend((k.encode("latin-1"), v.encode("latin-1")) for k, v in headers)
+    await send({"type": "http.response.start", "status": status, "headers": raw})
+    await send({"type": "http.response.body", "body": body})
+
+
+def _header(scope, name, default=""):
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return default
+
+
+async def _conditional(scope, send, body, etag, cache_control, content_type):
+    # Same caching headers and 304 handling as webapp.app._conditional
+    headers = [("etag", f'"{etag}"'), ("cache-control", cache_control)]
+    match = _header(scope, b"if-none-match")
+    if match.strip() == "*" or f'"{etag}"' in match:
+        await _respond(send, 304, headers=headers)
+    else:
+        await _respond(send, 200, body, content_type, headers)
+
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            service.start()
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            service.stop()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def _export(scope, receive, send):
+    if int(_header(scope, b"content-length", "0") or 0) > MAX_BODY_BYTES:
+        await _respond(send, 413, _error("payload too large"), "application/json")
+        return
+    body = await _read_body(receive)
+    if body is None:
+        return
+    if body is False:
+        await _respond(send, 413, _error("payload too large"), "application/json")
+        return
+    query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+    status, content_type, data = await service.export(
+        body, bool(query.get("concurrent", [""])[0]), bool(query.get("queued", [""])[0])
+    )
+    headers = []
+    if status == 200:
+        headers.append(("content-disposition", "attachment; filename=exported_bot.py"))
+    await _respond(send, status, data, content_type, headers)
+
+
+async def app(scope, receive, send):
+    global _index
+    if scope["type"] == "lifespan":
+        await _lifespan(receive, send)
+        return
+    if scope["type"] != "http":
+        return
+    method, path = scope["method"], scope["path"]
+
+    if path == "/" and method == "GET":
+        if _index is None:
+            with flask_app.app_context():
+                html, etag = index_page()
+            _index = (html.encode("utf-8"), etag)
+        await _conditional(scope, send, _index[0], _index[1], "no-cache", "text/html; charset=utf-8")
+    elif path == "/node-types.json" and method == "GET":
+        text, etag = node_types_json()
+        await _conditional(scope, send, text.encode("utf-8"), etag, "public, max-age=3600", "application/json")
+    elif path == "/export" and method == "POST":
+        # Shed load before reading the body; the slot is held from here on
+        if not service.reserve():
+            await _respond(send, 503, b'{"error": "busy"}', "application/json", [("retry-after", RETRY_AFTER)])
+            return
+        try:
+            await _export(scope, receive, send)
+        finally:
+            service.release()
+    elif path in ("/", "/node-types.json", "/export"):
+        await _respond(send, 405, b"method not allowed", "text/plain")
+    else:
+        await _respond(send, 404, b"not found", "text/plain")
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(app, host="0.0.0.0", port=8080)
@@ -0,0 +1,159 @@
+"""Export many bots at once, fanned out over a process pool.
+
+A batch is a list of bot specs: {"name": ..., "nodes": [...], "connections": [...]},
+the same payload /export takes plus an optional name, and "concurrent" /
+"queued" flags for the matching /export options. Results come back in input
+order and can be written straight into a streamed zip archive.
+"""
+import json
+import multiprocessing
+import os
+import re
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+from webapp.codegen import TemplateError
+from webapp.flow import FlowError
+from webapp.nodes import export_code
+from webapp.validate import VALIDATOR, PayloadError
+
+REPORT_NAME = "report.json"
+
+_pool = None
+
+
+def pool_context():
+    """Multiprocessing context for export pools.
+
+    Pools are started from inside servers, so plain fork would hand every
+    open client socket to the workers and keep those connections from
+    closing; forkserver (spawn where it is missing) starts workers clean.
+    """
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return multiprocessing.get_context(method)
+
+
+def shared_pool():
+    """Process pool reused across batches; sized to the machine."""
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 1, mp_context=pool_context())
+    return _pool
+
+
+def export_one(spec):
+    """Export one bot spec; runs in a worker process.
+
+    Returns (code, seconds, error). code is None when the graph is invalid.
+    """
+    start = time.perf_counter()
+    try:
+        nodes, connections = VALIDATOR.validate(spec)
+        code = export_code(nodes, connections, bool(spec.get("concurrent")), bool(spec.get("queued")))
+        error = None
+    except (PayloadError, FlowError, TemplateError) as e:
+        code, error = None, str(e)
+    return code, time.perf_counter() - start, error
+
+
+def export_batch(specs, workers=None, executor=None):
+    """Yield (spec, code, seconds, error) for every spec, in input order.
+
+    workers=1 exports in this process. Otherwise the work goes to executor,
+    or to a new pool of workers processes (shared_pool() when both are None).
+    """
+    specs = list(specs)
+    if workers == 1 and executor is None:
+        results = map(export_one, specs)
+    else:
+        own = executor is None and workers is not None
+        if own:
+            executor = ProcessPoolExecutor(max_workers=workers, mp_context=pool_context())
+        elif executor is None:
+            executor = shared_pool()
+        n = workers or os.cpu_count() or 1
+        # Bots are small; send several per round trip to keep IPC cheap
+        results = executor.map(export_one, specs, chunksize=max(1, len(specs) // (n * 4)))
+        if own:
+            results = _closing(results, executor)
+    for spec, (code, seconds, error) in zip(specs, results):
+        yield spec, code, seconds, error
+
+
+def _closing(results, executor):
+    try:
+        yield from results
+    finally:
+        executor.shutdown()
+
+
+def file_names(specs):
+    """One unique, filesystem-safe "<name>.py" per spec; specs must be dicts."""
+    seen = set()
+    names = []
+    for i, spec in enumerate(specs):
+        base = re.sub(r"[^A-Za-z0-9_.-]+", "_", str(spec.get("name") or f"bot_{i}")).strip("._") or f"bot_{i}"
+        name = base
+        n = 1
+        while name in seen:
+            n += 1
+            name = f"{base}_{n}"
+        seen.add(name)
+        names.append(name + ".py")
+    return names
+
+
+class _ChunkWriter:
+    # Write-only, unseekable file object; ZipFile falls back to data
+    # descriptors, so entries can be handed out as soon as they are written.
+    def __init__(self):
+        self._chunks = []
+        self._pos = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._pos
+
+    def flush(self):
+        pass
+
+    def take(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def iter_zip(specs, workers=None, executor=None):
+    """Yield a zip archive of the exported bots, chunk by chunk.
+
+    The archive holds one "<name>.py" per valid bot and a report.json with
+    every bot's file, generation time and error, plus batch totals.
+    """
+    specs = list(specs)
+    names = file_names(specs)
+    out = _ChunkWriter()
+    report = []
+    start = time.perf_counter()
+    with zipfile.ZipFile(out, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        results = export_batch(specs, workers=workers, executor=executor)
+        for name, (_spec, code, seconds, error) in zip(names, results):
+            entry = {"name": name[:-3], "file": name if code is not None else None, "seconds": round(seconds, 6)}
+            if error:
+                entry["error"] = error
+            report.append(entry)
+            if code is not None:
+                zf.writestr(name, code)
+                yield out.take()
+        elapsed = time.perf_counter() - start
+        zf.writestr(REPORT_NAME, json.dumps({
+            "bots": report,
+            "count": len(specs),
+            "failed": sum(1 for e in report if "error" in e),
+            "seconds": round(elapsed, 6),
+        }, indent=2))
+    yield out.take()
@@ -0,0 +1,201 @@
+"""Export saved projects to bot code from the command line.
+
+    python -m webapp.cli PROJECTS_DIR [OUT_DIR] [-j JOBS] [--force]
+
+Every *.json and *.botproj project in PROJECTS_DIR (see webapp/project.py)
+becomes OUT_DIR/<name>.py, exported across JOBS processes. OUT_DIR keeps a
+manifest of what each output was built from: inputs whose size and mtime
+are unchanged are skipped without being read, and inputs that were touched
+but hash the same are skipped after hashing. Outputs and the manifest are
+written to a temporary file and renamed into place, so a crash never
+leaves a half-written file.
+
+Only the exporter modules are imported; Flask and tkinter never are.
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+
+from webapp import project
+from webapp.codegen import TemplateError
+from webapp.export_cache import GENERATOR_MODULES as EXPORT_MODULES, generator_version as export_version
+from webapp.nodes import DEFAULT_PROPS, NODE_TYPES, export_store
+
+MANIFEST_NAME = ".export-manifest.json"
+SUFFIXES = (".json", project.BINARY_SUFFIX)
+# Modules whose source decides the generated code; editing any of them
+# invalidates every manifest entry
+GENERATOR_MODULES = EXPORT_MODULES + ("project",)
+
+
+def generator_version():
+    """Hash of the exporter's source and node types, so a changed exporter
+    or node pack re-exports everything."""
+    return export_version(GENERATOR_MODULES)
+
+
+def write_atomic(path, data):
+    """Write data (bytes) to path via a temporary file in the same directory."""
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def find_projects(directory):
+    """Return the project file names in directory, sorted."""
+    return sorted(
+        name for name in os.listdir(directory)
+        if name.endswith(SUFFIXES) and not name.startswith(".") and os.path.isfile(os.path.join(directory, name))
+    )
+
+
+def output_name(name):
+    return os.path.splitext(name)[0] + ".py"
+
+
+def load_manifest(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def export_file(job):
+    """Export one project; runs in a pool worker.
+
+    job is (source path, output path, hash of the last export or None,
+    concurrent, queued). Returns a dict with the input's hash and status
+    "exported", "unchanged" (same hash as last time) or "failed" plus error.
+    A malformed project fails on its own; it never stops the rest of the run.
+    """
+    src, dst, known_hash, concurrent, queued = job
+    start = time.perf_counter()
+    with open(src, "rb") as f:
+        data = f.read()
+    digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+    result = {"hash": digest}
+    if digest == known_hash and os.path.exists(dst):
+        result["status"] = "unchanged"
+        return result
+    try:
+        if data.startswith(project.MAGIC):
+            store = project.loads_binary(data, DEFAULT_PROPS)
+        else:
+            store = project.loads_json(data, DEFAULT_PROPS)
+        unknown = sorted(set(store.type_names).difference(NODE_TYPES))
+        if unknown:
+            raise ValueError(f"unknown node types {unknown}")
+        code = export_store(store, concurrent, queued)
+    except (project.ProjectFormatError, ValueError, TemplateError) as e:
+        # The loaders report any malformed file as ProjectFormatError
+        result.update(status="failed", error=str(e))
+        return result
+    except (KeyError, TypeError, AttributeError) as e:
+        result.update(status="failed", error=f"malformed project: {e!r}")
+        return result
+    write_atomic(dst, code.encode("utf-8"))
+    result.update(status="exported", seconds=time.perf_counter() - start)
+    return result
+
+
+def _run(jobs, workers):
+    if workers <= 1 or len(jobs) <= 1:
+        return list(map(export_file, jobs))
+    # Imported here so single-file runs don't pay for the pool machinery
+    from concurrent.futures import ProcessPoolExecutor
+    from webapp.batch import pool_context
+
+    with ProcessPoolExecutor(min(workers, len(jobs)), mp_context=pool_context()) as pool:
+        return list(pool.map(export_file, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+
+
+def export_directory(src_dir, out_dir=None, workers=None, force=False, concurrent=False, queued=False):
+    """Export every project in src_dir into out_dir; return {name: result}.
+
+    Each result is export_file's dict; inputs skipped on size and mtime
+    alone get status "unchanged" without a hash being computed. Of several
+    projects with the same output name only the first is exported; the
+    others fail.
+    """
+    out_dir = out_dir or src_dir
+    workers = workers or os.cpu_count() or 1
+    os.makedirs(out_dir, exist_ok=True)
+    manifest_path = os.path.join(out_dir, MANIFEST_NAME)
+    manifest = {} if force else load_manifest(manifest_path)
+    options = {"generator": generator_version(), "concurrent": concurrent, "queued": queued}
+    entries = manifest.get("files", {}) if manifest.get("options") == options else {}
+
+    results = {}
+    jobs = []
+    names = []
+    stats = {}
+    writers = {} # output path -> the project exported to it
+    for name in find_projects(src_dir):
+        src = os.path.join(src_dir, name)
+        dst = os.path.join(out_dir, output_name(name))
+        # "bot.json" and "bot.botproj" both export to bot.py; the first
+        # name in sorted order keeps it
+        key = os.path.normcase(dst)
+        if key in writers:
+            results[name] = {"status": "failed", "error": f"{writers[key]} is also exported to {output_name(name)}"}
+            continue
+        writers[key] = name
+        st = os.stat(src)
+        stats[name] = (st.st_size, st.st_mtime_ns)
+        entry = entries.get(name)
+        if entry and (entry["size"], entry["mtime_ns"]) == stats[name] and os.path.exists(dst):
+            results[name] = {"hash": entry["hash"], "status": "unchanged"}
+            continue
+        names.append(name)
+        jobs.append((src, dst, entry and entry["hash"], concurrent, queued))
+
+    for name, result in zip(names, _run(jobs, workers)):
+        results[name] = result
+
+    files = {}
+    for name in sorted(results):
+        result = results[name]
+        if result["status"] != "failed":
+            size, mtime_ns = stats[name]
+            files[name] = {"size": size, "mtime_ns": mtime_ns, "hash": result["hash"]}
+    write_atomic(manifest_path, json.dumps({"options": options, "files": files}, indent=1).encode("utf-8"))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m webapp.cli", description="Export saved projects to bot code.")
+    parser.add_argument("projects", help="directory of .json / .botproj project files")
+    parser.add_argument("out", nargs="?", help="output directory (default: the projects directory)")
+    parser.add_argument("-j", "--jobs", type=int, help="worker processes (default: one per core)")
+    parser.add_argument("--force", action="store_true", help="export every project, even unchanged ones")
+    parser.add_argument("--concurrent", action="store_true", help="same as /export?concurrent=1")
+    parser.add_argument("--queued", action="store_true", help="same as /export?queued=1")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    results = export_directory(args.projects, args.out, args.jobs, args.force, args.concurrent, args.queued)
+    counts = {"exported": 0, "unchanged": 0, "failed": 0}
+    for name, result in results.items():
+        counts[result["status"]] += 1
+        if result["status"] == "failed":
+            print(f"{name}: {result['error']}", file=sys.stderr)
+    print(f"{counts['exported']} exported, {counts['unchanged']} unchanged, {counts['failed']} failed "
+          f"in {time.perf_counter() - start:.2f}s")
+    return 1 if counts["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+import warnings
+from string import Formatter
+
+_FORMATTER = Formatter()
+# Compiled templates keyed by their source string. Every NODE_TYPES table
+# that compiles the same template text shares one entry.
+_CACHE = {}
+
+
+class TemplateError(KeyError):
+    """Raised when a node's props do not cover the fields its template needs."""
+
+    def __str__(self):
+        # KeyError quotes its argument; show the message as written.
+        return str(self.args[0]) if self.args else ""
+
+
+class ExtraPropsWarning(UserWarning):
+    """Issued when a node has props its template never reads.
+
+    Rendering ignores them, so export still succeeds; the warning names the
+    props and the template so a misspelled prop does not go unnoticed.
+    """
+
+
+class CompiledTemplate:
+    """A ``str.format`` template parsed once into a renderer.
+
+    ``fields`` records the prop names the template reads, so props can be
+    checked before any code is generated. ``render(props)`` returns exactly
+    what ``source.format(**props)`` would.
+    """
+
+    def __init__(self, source):
+        self.source = source
+        parts = []
+        fields = set()
+        simple = True
+        for literal, field_name, format_spec, conversion in _FORMATTER.parse(source):
+            if literal:
+                parts.append(repr(literal))
+            if field_name is None:
+                continue
+            if not field_name.isidentifier() or format_spec or conversion:
+                # Attribute/index access, specs and conversions keep the
+                # str.format path; only the root name is tracked.
+                simple = False
+                root = field_name.replace("[", ".").split(".", 1)[0]
+                if root and not root.isdigit():
+                    fields.add(root)
+                continue
+            fields.add(field_name)
+            parts.append(f"format(p[{field_name!r}])")
+        self.fields = frozenset(fields)
+        if simple:
+            # Parts are repr() literals and quoted keys, so the generated
+            # expression cannot run anything beyond dict lookups.
+            self._render = eval("lambda p: " + (" + ".join(parts) or "''"))
+        else:
+            self._render = lambda p: source.format(**p)
+
+    def check(self, props):
+        """Return (missing, extra) prop names for this template."""
+        missing = self.fields.difference(props)
+        extra = set(props).difference(self.fields)
+        return missing, extra
+
+    def render(self, props):
+        return self._render(props)
+
+
+def compile_template(source):
+    """Return the shared CompiledTemplate for source, compiling it once."""
+    template = _CACHE.get(source)
+    if template is None:
+        template = _CACHE[source] = CompiledTemplate(source)
+    return template
+
+
+def compile_node_type(definition):
+    """Compile one node type's ``code``/``code_start`` templates.
+
+    Returns {"code": ..., "code_start": ...}; a key is present only if the
+    node type defines that template.
+    """
+    return {
+        key: compile_template(definition[key])
+        for key in ("code", "code_start")
+        if definition.get(key)
+    }
+
+
+def compile_node_types(node_types):
+    """Compile the templates of every node type; see compile_node_type."""
+    return {name: compile_node_type(definition) for name, definition in node_types.items()}
+
+
+def check_props(template, props, node_id):
+    """Raise TemplateError if props lack a field the template needs.
+
+    Extra props are allowed (rendering ignores them) but reported with an
+    ExtraPropsWarning. The message leaves out node_id, so the default
+    warning filter shows each (props, template) pair once, not once per node.
+    """
+    fields = template.fields
+    if fields <= props.keys():
+        # Same size as a subset means no extras, without building a set
+        if len(props) > len(fields):
+            _missing, extra = template.check(props)
+            warnings.warn(
+                f"props {sorted(extra)} are not read by template {template.source!r}",
+                ExtraPropsWarning, stacklevel=2,
+            )
+        return
+    missing, _extra = template.check(props)
+    raise TemplateError(
+        f"node {node_id!r} is missing props {sorted(missing)} "
+        f"required by template {template.source!r}"
+    )
@@ -0,0 +1,286 @@
+"""Cache of generated bot code keyed by a canonical hash of the graph.
+
+The key covers only what export_code's output depends on: the order of the
+roots and, for each root, the types and template props of the nodes in its
+flow, wave by wave. Node positions, nodes no flow reaches and the order of
+the connection list (beyond the order of each node's own outgoing wires) do
+not change it. Node ids do not either: the only place they show up in the
+code is each command's function name, so cached code is stored with those
+names cut out and the current graph's names are spliced back in on a hit.
+
+Every key also includes generator_version(), so cached code (on disk in
+particular) is not served after a template, a node pack or the exporter
+itself changes.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from itertools import chain
+
+from webapp import metrics
+from webapp.flow import find_cycle, waves
+from webapp.graph import Graph
+from webapp.nodes import (
+    ASYNC_HEADER, DEFAULT_PROPS, FOOTER, HEADER, NODE_TYPES, QUEUED_HEADER, TEMPLATES, check_flows, export_code, export_header, find_roots, render_block, root_steps,
+)
+from webapp.registry import REGISTRY, LazyTable
+from webapp.store import GraphStore
+
+# Stands in for each command's function name in the cached code
+_MARKER = "\x00"
+# Modules whose source decides the generated code
+GENERATOR_MODULES = ("codegen", "flow", "graph", "nodes", "outbound", "registry", "store")
+
+
+@lru_cache(maxsize=None)
+def generator_version(modules=GENERATOR_MODULES):
+    """Hash of what export_code's output depends on besides the graph.
+
+    Covers every node type definition (templates included), the fixed
+    header, runtime and footer text, and the source of modules. Computed
+    once per process.
+    """
+    digest = hashlib.blake2b(REGISTRY.fingerprint().encode("ascii"), digest_size=16)
+    for text in (HEADER, ASYNC_HEADER, QUEUED_HEADER, FOOTER):
+        digest.update(text.encode("utf-8"))
+    here = os.path.dirname(os.path.abspath(__file__))
+    for name in modules:
+        with open(os.path.join(here, name + ".py"), "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+def _field_getter(fields):
+    # Ellipsis never comes out of JSON, so it marks a missing prop
+    if not fields:
+        return lambda props: ()
+    if len(fields) == 1:
+        (field,) = fields
+        return lambda props: props.get(field, ...)
+    return lambda props: tuple([props.get(f, ...) for f in fields])
+
+
+def _type_info(name):
+    if NODE_TYPES[name]["type"] == "event":
+        template = TEMPLATES[name]["code_start"]
+        return True, _field_getter(sorted(template.fields - {"func_name"})), "func_name" in template.fields
+    template = TEMPLATES[name].get("code")
+    return False, _field_getter(sorted(template.fields) if template else ()), False
+
+
+# Per type: (is a root, reads the hashed props, uses func_name). Event nodes
+# inside a flow render nothing, so only their type is hashed there.
+_TYPE_INFO = LazyTable(_type_info, NODE_TYPES)
+
+
+def graph_key(nodes, connections, concurrent=False, queued=False):
+    """Return (key, func_ids) for a graph, or None if it cannot be cached.
+
+    nodes, connections, concurrent and queued are export_code's arguments.
+    func_ids are the ids of the roots whose function names go into the code, in
+    output order. Graphs export_code would reject (unknown types, missing
+    props, wires to unknown nodes, cycles) get None so they always take the
+    uncached path.
+    """
+    if not nodes.keys() >= set(chain.from_iterable(connections)):
+        return None
+    outgoing = {}
+    for start_id, end_id in connections:
+        targets = outgoing.get(start_id)
+        if targets is None:
+            outgoing[start_id] = [end_id]
+        else:
+            targets.append(end_id)
+    if find_cycle(outgoing):
+        return None
+
+    # Flat list of type names, each followed by its hashed props; every type
+    # has a fixed shape, so the sequence decodes unambiguously. 0 ends a
+    # wave and None ends a root's flow.
+    items = [generator_version(), concurrent, queued]
+    append = items.append
+    func_ids = []
+    type_info = _TYPE_INFO
+    for root_id, root in nodes.items():
+        try:
+            info = type_info[root["type"]]
+        except KeyError:
+            return None
+        if not info[0]:
+            continue
+        props = root.get("props")
+        if props is None:
+            props = DEFAULT_PROPS[root["type"]]
+        append(root["type"])
+        append(info[1](props))
+        if info[2]:
+            func_ids.append(root_id)
+        for wave in waves(root_id, outgoing):
+            for target_id in wave:
+                target = nodes[target_id]
+                try:
+                    info = type_info[target["type"]]
+                except KeyError:
+                    return None
+                props = target.get("props")
+                if props is None:
+                    props = DEFAULT_PROPS[target["type"]]
+                append(target["type"])
+                if not info[0]:
+                    append(info[1](props))
+            append(0)
+        append(None)
+    key = hashlib.blake2b(repr(items).encode("utf-8"), digest_size=20).hexdigest()
+    return key, func_ids
+
+
+def _render_parts(nodes, connections, concurrent=False, queued=False):
+    # export_code with every function name replaced by _MARKER, split on it
+    with metrics.stage("build"):
+        store = GraphStore.from_payload(nodes, connections, DEFAULT_PROPS)
+        graph = Graph.from_store(store, incoming=False)
+        check_flows(store, graph)
+    with metrics.stage("generate"):
+        blocks = [root_steps(store, graph, root, concurrent, queued) for root in find_roots(store)]
+        for steps in blocks:
+            # root_steps hands back a copy of the root's props
+            steps[0][1]["func_name"] = _MARKER
+        return "".join([export_header(concurrent, queued), *map(render_block, blocks), FOOTER]).split(_MARKER)
+
+
+def splice(parts, func_ids):
+    """Rebuild bot code from cached parts and the graph's root ids."""
+    out = [parts[0]]
+    for root_id, part in zip(func_ids, parts[1:]):
+        out.append(f"cmd_{root_id}")
+        out.append(part)
+    return "".join(out)
+
+
+class ExportCache:
+    """Bounded LRU of generated code, with an optional directory behind it.
+
+    maxsize and max_chars bound the in-memory tier; least recently used
+    entries are evicted first. directory, when given, keeps every entry as a
+    JSON file so the cache survives restarts. Safe to share between threads.
+    """
+
+    def __init__(self, maxsize=256, max_chars=64 * 1024 * 1024, directory=None):
+        self.maxsize = maxsize
+        self.max_chars = max_chars
+        self.directory = directory
+        self._entries = OrderedDict()  # key -> parts
+        self._chars = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.uncacheable = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def export(self, nodes, connections, concurrent=False, queued=False):
+        """export_code(nodes, connections, ...), served from the cache when possible."""
+        with metrics.stage("key"):
+            found = graph_key(nodes, connections, concurrent, queued)
+        if found is None:
+            with self._lock:
+                self.uncacheable += 1
+            return export_code(nodes, connections, concurrent, queued)
+        key, func_ids = found
+        parts = self._get(key)
+        if parts is None:
+            parts = _render_parts(nodes, connections, concurrent, queued)
+            if len(parts) != len(func_ids) + 1:
+                # A prop contains _MARKER, so the split is ambiguous
+                with self._lock:
+                    self.uncacheable += 1
+                return export_code(nodes, connections, concurrent, queued)
+            self._put(key, parts)
+            self._write(key, parts)
+        return splice(parts, func_ids)
+
+    def _get(self, key):
+        with self._lock:
+            parts = self._entries.get(key)
+            if parts is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return parts
+        parts = self._read(key)
+        with self._lock:
+            if parts is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+        self._put(key, parts)
+        return parts
+
+    def _put(self, key, parts):
+        size = sum(map(len, parts))
+        if size > self.max_chars:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._chars -= sum(map(len, old))
+            self._entries[key] = parts
+            self._chars += size
+            while len(self._entries) > self.maxsize or self._chars > self.max_chars:
+                _key, evicted = self._entries.popitem(last=False)
+                self._chars -= sum(map(len, evicted))
+                self.evictions += 1
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + ".json")
+
+    def _read(self, key):
+        if not self.directory:
+            return None
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, key, parts):
+        if not self.directory:
+            return
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename, so readers never see half a file
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(parts, f)
+            os.replace(tmp, path)
+        except OSError:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+
+    def clear(self):
+        """Empty the in-memory tier (the directory is left alone)."""
+        with self._lock:
+            self._entries.clear()
+            self._chars = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "uncacheable": self.uncacheable,
+                "entries": len(self._entries),
+                "chars": self._chars,
+                "maxsize": self.maxsize,
+                "max_chars": self.max_chars,
+                "directory": self.directory,
+            }
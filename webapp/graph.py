@@ -0,0 +1,31 @@
+class Graph:
+    """Adjacency view over a node map and a connection list.
+
+    The outgoing and incoming maps are built once, so walking a flow costs
+    O(1) per hop instead of a scan of every connection; see webapp.flow for
+    the walks themselves.
+
+    nodes: dict mapping node_id to node (dict or Node object), or a GraphStore
+    connections: iterable of (start_id, end_id); node indexes for a GraphStore
+    incoming: False skips the incoming map (left None); export only walks
+        wires forwards and the map is as large as outgoing
+    """
+
+    def __init__(self, nodes, connections, incoming=True):
+        self.nodes = nodes
+        self.outgoing = {}
+        if incoming:
+            self.incoming = {}
+            for conn in connections:
+                start_id, end_id = conn[0], conn[1]
+                self.outgoing.setdefault(start_id, []).append(end_id)
+                self.incoming.setdefault(end_id, []).append(start_id)
+        else:
+            self.incoming = None
+            for conn in connections:
+                self.outgoing.setdefault(conn[0], []).append(conn[1])
+
+    @classmethod
+    def from_store(cls, store, incoming=True):
+        """Adjacency over a GraphStore's integer node indexes."""
+        return cls(store, store.edge_pairs(), incoming)
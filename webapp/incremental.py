@@ -0,0 +1,141 @@
+import hashlib
+
+from webapp.graph import Graph
+from webapp.nodes import DEFAULT_PROPS, FOOTER, HEADER, check_flows, find_roots, render_block, root_steps
+from webapp.store import GraphStore
+
+
+def block_key(steps):
+    """Content hash of one root's chain.
+
+    Covers each step's template and the props it reads, so node positions,
+    ids and unused props do not invalidate a cached block.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    for template, props, _node_id in steps:
+        fields = [(name, props[name]) for name in sorted(template.fields)]
+        h.update(repr((template.source, fields)).encode("utf-8"))
+    return h.hexdigest()
+
+
+def diff_blocks(nodes, connections, known):
+    """Return the root blocks whose content differs from known.
+
+    known maps root_id to the key the caller already holds. The result has
+    "order" (all root ids in export order), "blocks" (root_id -> {"key",
+    "code"} for new or changed roots only) and "removed" (known roots that
+    no longer exist). Unchanged roots are hashed but not rendered.
+
+    Root ids are strings throughout, str() of integer ids: known usually
+    comes back as a JSON object, whose keys are always strings.
+    """
+    store = GraphStore.from_payload(nodes, connections, DEFAULT_PROPS)
+    graph = Graph.from_store(store, incoming=False)
+    check_flows(store, graph)
+    order = []
+    blocks = {}
+    for root in find_roots(store):
+        steps = root_steps(store, graph, root)
+        key = block_key(steps)
+        root_id = str(store.ids[root])
+        order.append(root_id)
+        if known.get(root_id) != key:
+            blocks[root_id] = {"key": key, "code": render_block(steps)}
+    current = set(order)
+    removed = [rid for rid in map(str, known) if rid not in current]
+    return {"order": order, "blocks": blocks, "removed": removed, "header": HEADER, "footer": FOOTER}
+
+
+class IncrementalExporter:
+    """Stateful exporter that caches the generated block of every root.
+
+    Edits go through update_node/remove_node/set_connections. Only roots that
+    can reach an edited node are rehashed, and a root's block is rendered
+    again only when its content hash changes.
+
+    nodes: dict mapping node_id to node dict, as for export_code
+    connections: list of (start_id, end_id)
+    """
+
+    def __init__(self, nodes, connections):
+        self.store = GraphStore.from_payload(dict(nodes), connections, DEFAULT_PROPS)
+        self.graph = Graph.from_store(self.store)
+        self._entries = {}  # root_id -> (key, block)
+        self._dirty = None  # node indexes to recheck; None means every root
+        self.regenerated = 0  # blocks rendered so far
+
+    def update_node(self, node):
+        """Add or replace a node."""
+        store = self.store
+        idx = store.index.get(node["id"])
+        if idx is None:
+            idx = store.add_node(node["id"], node["type"], node.get("x", 0), node.get("y", 0), node.get("props"))
+        else:
+            store.types[idx] = store.intern_type(node["type"])
+            store.props[idx] = node.get("props")
+        self._mark(idx)
+
+    def remove_node(self, node_id):
+        """Remove a node and every connection touching it."""
+        store = self.store
+        idx = store.index[node_id]
+        self._mark(idx)
+        for edge in store.edges_of(idx):
+            store.remove_edge(edge)
+        store.remove_node(node_id)
+        self._rebuild_graph()
+
+    def set_connections(self, connections):
+        """Replace the connection list; every root is rehashed on next use."""
+        self.store.set_connections(connections)
+        self._rebuild_graph()
+
+    def _rebuild_graph(self):
+        self.graph = Graph.from_store(self.store)
+        self._dirty = None
+
+    def _mark(self, idx):
+        # Walk wires backwards: any root upstream of idx may change.
+        if self._dirty is None:
+            return
+        stack = [idx]
+        while stack:
+            curr = stack.pop()
+            if curr in self._dirty:
+                continue
+            self._dirty.add(curr)
+            stack.extend(self.graph.incoming.get(curr, ()))
+
+    def refresh(self):
+        """Bring the block cache up to date.
+
+        Returns (changed, removed): root_id -> block for roots whose block is
+        new or different since the previous refresh, and the ids of roots
+        that disappeared. Raises FlowError if the wiring has a cycle.
+        """
+        store = self.store
+        if self._dirty is None:
+            # Wiring changed since the last refresh
+            check_flows(store, self.graph)
+        entries = {}
+        changed = {}
+        for root in find_roots(store):
+            root_id = store.ids[root]
+            entry = self._entries.get(root_id)
+            if entry is None or self._dirty is None or root in self._dirty:
+                steps = root_steps(store, self.graph, root)
+                key = block_key(steps)
+                if entry is None or entry[0] != key:
+                    entry = (key, render_block(steps))
+                    self.regenerated += 1
+                    changed[root_id] = entry[1]
+            entries[root_id] = entry
+        removed = [root_id for root_id in self._entries if root_id not in entries]
+        self._entries = entries
+        self._dirty = set()
+        return changed, removed
+
+    def export(self):
+        """Return the full bot code, regenerating only stale blocks."""
+        self.refresh()
+        return "".join([HEADER, *(block for _key, block in self._entries.values()), FOOTER])
@@ -0,0 +1,175 @@
+"""In-process metrics for the export service, in Prometheus text format.
+
+The export path records how long each stage takes (export_stage_seconds,
+labelled parse / validate / key / build / generate / serialize), and the
+Flask app adds per-endpoint request latency, request body sizes and counts
+of the nodes and edges it was sent. GET /metrics renders everything.
+
+Set EXPORT_METRICS=0 (or metrics.ENABLED = False) to turn recording off;
+every recording call then returns after one flag check. Values are per
+process, so run one Flask process per scrape target.
+"""
+import os
+import threading
+from bisect import bisect_left
+from time import perf_counter
+
+ENABLED = os.environ.get("EXPORT_METRICS", "1") != "0"
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Bucket upper bounds; values above the last one land in +Inf
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = tuple(256 * 4 ** i for i in range(10))  # 256 B .. 64 MiB
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values, extra=""):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic count, optionally split by label values."""
+
+    kind = "counter"
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, labels=()):
+        if not ENABLED:
+            return
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = sorted(self._values.items())
+        for labels, value in values:
+            yield f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}"
+
+
+class Histogram:
+    """Bucketed distribution of observed values, optionally split by label values."""
+
+    kind = "histogram"
+
+    def __init__(self, name, help, buckets, labelnames=()):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self.labelnames = tuple(labelnames)
+        # label values -> [per-bucket counts (last is +Inf), sum]
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, labels=()):
+        if not ENABLED:
+            return
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0]
+            series[0][i] += 1
+            series[1] += value
+
+    def samples(self):
+        with self._lock:
+            series = sorted((labels, counts[:], total) for labels, (counts, total) in self._series.items())
+        for labels, counts, total in series:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                le = f'le="{bound}"'
+                yield f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}"
+            plain = _labels(self.labelnames, labels)
+            yield f"{self.name}_sum{plain} {_number(total)}"
+            yield f"{self.name}_count{plain} {cumulative}"
+
+
+class Registry:
+    """The metrics rendered together on one /metrics page."""
+
+    def __init__(self):
+        self.metrics = []
+
+    def counter(self, name, help, labelnames=()):
+        metric = Counter(name, help, labelnames)
+        self.metrics.append(metric)
+        return metric
+
+    def histogram(self, name, help, buckets, labelnames=()):
+        metric = Histogram(name, help, buckets, labelnames)
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        """Return every metric in Prometheus text exposition format."""
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "export_stage_seconds", "Time spent in each stage of an export.", LATENCY_BUCKETS, ("stage",))
+REQUEST_SECONDS = REGISTRY.histogram(
+    "export_request_seconds", "Request latency by endpoint.", LATENCY_BUCKETS, ("endpoint",))
+REQUEST_BYTES = REGISTRY.histogram(
+    "export_request_bytes", "Request body size by endpoint.", SIZE_BUCKETS, ("endpoint",))
+REQUESTS = REGISTRY.counter(
+    "export_requests_total", "Requests by endpoint and status code.", ("endpoint", "status"))
+NODES = REGISTRY.counter("export_nodes_total", "Nodes received in export payloads.")
+EDGES = REGISTRY.counter("export_edges_total", "Connections received in export payloads.")
+
+
+class _Stage:
+    __slots__ = ("label", "start")
+
+    def __init__(self, name):
+        self.label = (name,)
+
+    def __enter__(self):
+        self.start = perf_counter()
+
+    def __exit__(self, *exc):
+        STAGE_SECONDS.observe(perf_counter() - self.start, self.label)
+
+
+class _NoStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc):
+        pass
+
+
+_NO_STAGE = _NoStage()
+
+
+def stage(name):
+    """Context manager recording its block's duration as export stage name."""
+    if not ENABLED:
+        return _NO_STAGE
+    return _Stage(name)
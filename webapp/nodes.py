@@ -1,85 +1,203 @@
-NODE_TYPES = {
-    "Event: On Ready": {
-        "type": "event",
-        "code_start": "@bot.event\nasync def on_ready():",
-        "inputs": [],
-        "outputs": ["Flow"],
-        "props": []
-    },
-    "Command": {
-        "type": "event",
-        "code_start": "@bot.command(name='{trigger}')\nasync def {func_name}(ctx):",
-        "inputs": [],
-        "outputs": ["Flow"],
-        "props": [("Trigger (!name)", "trigger", "hello")]
-    },
-    "Send Message": {
-        "type": "action",
-        "code": "    await ctx.send('{text}')",
-        "inputs": ["Flow"],
-        "outputs": ["Flow"],
-        "props": [("Message Text", "text", "Hello World!")]
-    },
-    "Reply to User": {
-        "type": "action",
-        "code": "    await ctx.reply('{text}')",
-        "inputs": ["Flow"],
-        "outputs": ["Flow"],
-        "props": [("Reply Text", "text", "I hear you!")]
-    },
-    "Print Console": {
-        "type": "action",
-        "code": "    print('{text}')",
-        "inputs": ["Flow"],
-        "outputs": ["Flow"],
-        "props": [("Log Text", "text", "Debug message")]
+from webapp.codegen import check_props, compile_template
+from webapp.flow import check_acyclic, waves
+from webapp import metrics
+from webapp.graph import Graph
+from webapp.outbound import COALESCE_TYPE, QUEUED_CODE, RUNTIME, RUNTIME_IMPORTS
+from webapp.registry import REGISTRY
+from webapp.store import GraphStore
+
+# Node type name -> definition: the built-in types plus any node packs
+# (see webapp/registry.py). Templates and default props are built per type
+# on first lookup.
+NODE_TYPES = REGISTRY
+TEMPLATES = REGISTRY.templates
+DEFAULT_PROPS = REGISTRY.default_props
+
+HEADER = "\n".join([
+    "import discord",
+    "from discord.ext import commands",
+    "",
+    "intents = discord.Intents.default()",
+    "intents.message_content = True",
+    "bot = commands.Bot(command_prefix='!', intents=intents)",
+    "",
+]) + "\n"
+FOOTER = "bot.run('YOUR_TOKEN_HERE')"
+
+# Concurrent exports run a wave's awaitable actions together through this
+GATHER = compile_template("    await asyncio.gather({calls})")
+ASYNC_HEADER = "import asyncio\n" + HEADER
+# Queued exports send through webapp.outbound's OutboundQueue
+QUEUED_TEMPLATES = {TEMPLATES[name]["code"]: compile_template(source) for name, source in QUEUED_CODE.items()}
+QUEUED_HEADER = RUNTIME_IMPORTS + HEADER + RUNTIME
+# Discord's message length limit, for messages merged at export time
+MAX_MESSAGE_CHARS = 2000
+
+
+def export_header(concurrent=False, queued=False):
+    """Return the header for an export with these options."""
+    if queued:
+        return QUEUED_HEADER
+    return ASYNC_HEADER if concurrent else HEADER
+
+
+def find_roots(store):
+    """Return the indexes of the event/command nodes that start a flow."""
+    event_types = {
+        type_id for type_id, name in enumerate(store.type_names) if NODE_TYPES[name]["type"] == "event"
     }
-}
+    types = store.types
+    return [idx for idx in store.nodes() if types[idx] in event_types]
 
 
-def export_code(nodes, connections):
-    """Generate a Python bot code string from nodes and connections.
+def root_steps(store, graph, root, concurrent=False, queued=False):
+    """Return the (template, props, node_id) steps for one root's block.
 
-    nodes: dict mapping node_id to node dict: {"id": id, "type": node_type, "props": {...}}
-    connections: list of (start_id, end_id)
+    root is a node index in store and graph is Graph.from_store(store), which
+    must be acyclic. Every node the root's wires reach gets a step, in flow
+    order (see webapp.flow.waves). With concurrent, awaitable actions in the
+    same wave are merged into one asyncio.gather step; queued sends through
+    the outbound queue instead (see queued_steps) and ignores concurrent.
+    Props are checked against each template here, before any rendering.
+    """
+    root_id = store.ids[root]
+    props = dict(store.props_of(root))
+    props["func_name"] = f"cmd_{root_id}"
+    steps = [(TEMPLATES[store.type_of(root)]["code_start"], props, root_id)]
+    check_props(*steps[0])
+
+    # Iterate downstream
+    types, type_names, ids = store.types, store.type_names, store.ids
+    for wave in waves(root, graph.outgoing):
+        wave_steps = []
+        for target in wave:
+            template = TEMPLATES[type_names[types[target]]].get("code")
+            if template:
+                step = (template, store.props_of(target), ids[target])
+                check_props(*step)
+                wave_steps.append(step)
+        if concurrent and not queued and len(wave_steps) > 1:
+            wave_steps = gather_steps(wave_steps)
+        steps.extend(wave_steps)
+    return queued_steps(steps) if queued else steps
+
+
+def queued_steps(steps):
+    """Rewrite checked steps to use the outbound queue.
+
+    Sends and replies switch to their QUEUED_TEMPLATES form, and consecutive
+    Send Message steps become one message with the texts on separate lines.
     """
-    code_lines = [
-        "import discord",
-        "from discord.ext import commands",
-        "",
-        "intents = discord.Intents.default()",
-        "intents.message_content = True",
-        "bot = commands.Bot(command_prefix='!', intents=intents)",
-        ""
-    ]
-
-    # Find event/command nodes
-    roots = [n for n in nodes.values() if NODE_TYPES[n["type"]]["type"] == "event"]
+    coalesce = TEMPLATES[COALESCE_TYPE]["code"]
+    merged = []
+    prev = None
+    for template, props, node_id in steps:
+        if template is coalesce and prev is coalesce:
+            last_template, last_props, last_id = merged[-1]
+            text = f"{last_props['text']}\\n{props['text']}"
+            if len(text) <= MAX_MESSAGE_CHARS:
+                merged[-1] = (last_template, {"text": text}, last_id)
+                continue
+        merged.append((QUEUED_TEMPLATES.get(template, template), props, node_id))
+        prev = template
+    return merged
+
+
+def gather_steps(steps):
+    """Merge the awaitable steps of one wave into a single GATHER step.
+
+    A step is awaitable when its code is a single "await ..." line; longer
+    code (a node pack action with several statements) stays a step of its
+    own. The gather takes the place of the first awaitable step; other steps
+    keep their order. Returns steps unchanged if fewer than two are awaitable.
+    """
+    merged = []
+    calls = []
+    at = None
+    for step in steps:
+        line = step[0].render(step[1]).strip()
+        if line.startswith("await ") and "\n" not in line:
+            if at is None:
+                at = len(merged)
+                merged.append(None)
+            calls.append(line[len("await "):])
+        else:
+            merged.append(step)
+    if len(calls) < 2:
+        return steps
+    merged[at] = (GATHER, {"calls": ", ".join(calls)}, None)
+    return merged
+
+
+def check_flows(store, graph):
+    """Raise FlowError if the graph's wires form a cycle anywhere."""
+    check_acyclic(graph.outgoing, store.ids.__getitem__)
+
+
+def render_block(steps):
+    """Render one root's checked steps into its code block.
 
+    The block ends with the blank spacer line and a trailing newline, so
+    blocks concatenate directly between HEADER and FOOTER.
+    """
+    return "".join([template.render(props) + "\n" for template, props, _node_id in steps]) + "\n"
+
+
+def iter_export_store(store, concurrent=False, queued=False):
+    """Yield the bot code in chunks: the header, one block per root, the footer.
+
+    Every root is checked before the first chunk is yielded, so a bad graph
+    fails before any output is produced. Only one block is held in memory at
+    a time; "".join() of the chunks equals export_store(store).
+    """
+    with metrics.stage("build"):
+        graph = Graph.from_store(store, incoming=False)
+        check_flows(store, graph)
+    roots = find_roots(store)
     for root in roots:
-        func_name = f"cmd_{root['id']}"
-        props = root.get("props", {}).copy()
-        props["func_name"] = func_name
-        code_lines.append(NODE_TYPES[root["type"]]["code_start"].format(**props))
-
-        # Iterate downstream
-        curr_id = root["id"]
-        visited = set()
-        while True:
-            next_conn = next((c for c in connections if c[0] == curr_id), None)
-            if not next_conn:
-                break
-            target_id = next_conn[1]
-            if target_id in visited:
-                break
-            visited.add(target_id)
-            node = nodes[target_id]
-            nt_def = NODE_TYPES[node["type"]]
-            if nt_def.get("code"):
-                code_lines.append(nt_def["code"].format(**node.get("props", {})))
-            curr_id = target_id
-
-        code_lines.append("")
-
-    code_lines.append("bot.run('YOUR_TOKEN_HERE')")
-    return "\n".join(code_lines)
+        root_steps(store, graph, root, concurrent, queued)
+
+    yield export_header(concurrent, queued)
+    for root in roots:
+        yield render_block(root_steps(store, graph, root, concurrent, queued))
+    yield FOOTER
+
+
+def export_store(store, concurrent=False, queued=False):
+    """Generate a Python bot code string from a GraphStore.
+
+    Raises FlowError for cyclic wiring and TemplateError for missing props.
+    With concurrent, independent awaitable actions run via asyncio.gather;
+    with queued, messages go through a paced, coalescing outbound queue.
+    """
+    with metrics.stage("build"):
+        graph = Graph.from_store(store, incoming=False)
+        check_flows(store, graph)
+    with metrics.stage("generate"):
+        return _render_store(store, graph, concurrent, queued)
+
+
+def _render_store(store, graph, concurrent, queued):
+    # Check every root before rendering any of them
+    blocks = [root_steps(store, graph, root, concurrent, queued) for root in find_roots(store)]
+    return "".join([export_header(concurrent, queued), *map(render_block, blocks), FOOTER])
+
+
+def iter_export_code(nodes, connections, concurrent=False, queued=False):
+    """Streaming export_code; see iter_export_store."""
+    return iter_export_store(GraphStore.from_payload(nodes, connections, DEFAULT_PROPS), concurrent, queued)
+
+
+def export_code(nodes, connections, concurrent=False, queued=False):
+    """Generate a Python bot code string from nodes and connections.
+
+    nodes: dict mapping node_id to node dict: {"id": id, "type": node_type, "props": {...}};
+        a node without props renders its type's DEFAULT_PROPS
+    connections: list of (start_id, end_id)
+    """
+    with metrics.stage("build"):
+        store = GraphStore.from_payload(nodes, connections, DEFAULT_PROPS)
+        graph = Graph.from_store(store, incoming=False)
+        check_flows(store, graph)
+    with metrics.stage("generate"):
+        return _render_store(store, graph, concurrent, queued)
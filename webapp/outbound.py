@@ -0,0 +1,98 @@
+"""Rate-limit-aware sending for exported bots (export option "queued").
+
+In queued mode the generated bot gets an OutboundQueue (RUNTIME below) and
+its Send Message / Reply to User actions hand their text to it instead of
+awaiting ctx.send/ctx.reply one by one. The queue keeps one FIFO per
+channel, so order within a channel is preserved, and:
+
+- coalesces consecutive sends to a channel into one message (up to
+  Discord's 2000 character limit), both at export time for consecutive
+  Send Message nodes and at run time for sends queued while waiting;
+- paces each channel with a token bucket (default 5 messages per 5 s, the
+  per-channel limit) instead of running into 429 responses.
+"""
+
+# Queued-mode code templates, by node type. Types not listed keep "code".
+QUEUED_CODE = {
+    "Send Message": "    outbox.send(ctx, '{text}')",
+    "Reply to User": "    outbox.reply(ctx, '{text}')",
+}
+
+# Node type whose consecutive steps are merged into one message at export
+COALESCE_TYPE = "Send Message"
+
+# Imports the runtime needs, placed above the usual header
+RUNTIME_IMPORTS = "import asyncio\nimport collections\n"
+
+# Emitted after the header; defines the queue and the bot's outbox
+RUNTIME = '''class OutboundQueue:
+    """Per-channel outbound message queue with coalescing and pacing."""
+
+    def __init__(self, rate=5, per=5.0, max_chars=2000):
+        self.rate = rate
+        self.per = per
+        self.max_chars = max_chars
+        self.api_calls = 0
+        self._channels = {}
+
+    def send(self, ctx, text):
+        self._put(ctx, "send", str(text))
+
+    def reply(self, ctx, text):
+        self._put(ctx, "reply", str(text))
+
+    def _put(self, ctx, kind, text):
+        key = getattr(ctx.channel, "id", None) or id(ctx.channel)
+        state = self._channels.get(key)
+        if state is None:
+            state = self._channels[key] = {"pending": collections.deque(), "task": None,
+                                           "tokens": float(self.rate), "stamp": None}
+        state["pending"].append((kind, ctx, text))
+        if state["task"] is None:
+            state["task"] = asyncio.get_running_loop().create_task(self._drain(state))
+
+    async def _take_token(self, state):
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        if state["stamp"] is not None:
+            state["tokens"] = min(self.rate, state["tokens"] + (now - state["stamp"]) * self.rate / self.per)
+        state["stamp"] = now
+        if state["tokens"] < 1:
+            await asyncio.sleep((1 - state["tokens"]) * self.per / self.rate)
+            state["tokens"] = 1.0
+            state["stamp"] = loop.time()
+        state["tokens"] -= 1
+
+    async def _drain(self, state):
+        pending = state["pending"]
+        try:
+            while pending:
+                await self._take_token(state)
+                kind, ctx, text = pending.popleft()
+                if kind == "send":
+                    # Everything queued behind it for this channel goes along
+                    while pending and pending[0][0] == "send" and len(text) + 1 + len(pending[0][2]) <= self.max_chars:
+                        text += "\\n" + pending.popleft()[2]
+                try:
+                    self.api_calls += 1
+                    if kind == "send":
+                        await ctx.send(text)
+                    else:
+                        await ctx.reply(text)
+                except Exception as e:
+                    print(f"outbound {kind} failed: {e}")
+        finally:
+            state["task"] = None
+
+    async def flush(self):
+        """Wait until every queued message has been sent."""
+        while True:
+            tasks = [s["task"] for s in self._channels.values() if s["task"] is not None]
+            if not tasks:
+                return
+            await asyncio.gather(*tasks)
+
+
+outbox = OutboundQueue()
+
+'''
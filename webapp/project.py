@@ -0,0 +1,351 @@
+"""Project files: a plain JSON format and a compact binary format.
+
+The binary format groups nodes into blocks, one per flow (everything
+reachable from a root event) plus one for nodes no root reaches. A JSON
+header lists the node types, the blocks and, for each root, the blocks
+its flow needs, so ProjectFile.load_flow() reads only those blocks.
+
+Layout: MAGIC, u32 header length, header JSON, then the zlib-compressed
+blocks. A block holds u32 node and edge counts, then the columns: type ids
+(u16), x and y (f64; f32 in version 1 files, which rounds positions), edge
+endpoints as file-wide node numbers (i32), and finally a JSON array
+[ids, props]. Numbers are little-endian.
+
+Malformed input, JSON or binary, raises ProjectFormatError.
+"""
+import json
+import struct
+import sys
+import zlib
+from array import array
+from bisect import bisect_right
+
+from webapp.graph import Graph
+from webapp.nodes import find_roots
+from webapp.store import GraphStore
+
+MAGIC = b"BOTPRJ1\n"
+VERSION = 2
+# Type code of the x/y columns per binary format version
+_COORD_CODES = {1: "f", 2: "d"}
+BINARY_SUFFIX = ".botproj"
+
+_COUNTS = struct.Struct("<II")
+_U32 = struct.Struct("<I")
+
+
+class ProjectFormatError(ValueError):
+    """Raised when a project file is not in a format this module reads."""
+
+
+def _le(arr):
+    # Column arrays are stored little-endian
+    if sys.byteorder == "big":
+        arr.byteswap()
+    return arr
+
+
+def _live_ids(store):
+    return [store.ids[idx] for idx in store.nodes()]
+
+
+# --- JSON ---
+
+def to_payload(store):
+    """Return {"nodes": [...], "connections": [...]} for store.
+
+    Nodes that still use their type's default props are written without
+    "props".
+    """
+    nodes = []
+    for idx in store.nodes():
+        node = {"id": store.ids[idx], "type": store.type_of(idx), "x": store.xs[idx], "y": store.ys[idx]}
+        if store.props[idx] is not None:
+            node["props"] = store.props[idx]
+        nodes.append(node)
+    return {"version": VERSION, "nodes": nodes, "connections": [list(c) for c in store.connections()]}
+
+
+def from_payload(payload, defaults=None):
+    """Build a GraphStore from a to_payload()/saveLayout-style dict."""
+    if not isinstance(payload, dict):
+        raise ProjectFormatError("project must be a JSON object")
+    node_list = payload.get("nodes", [])
+    connections = payload.get("connections", [])
+    if not isinstance(node_list, list) or not isinstance(connections, list):
+        raise ProjectFormatError("project nodes and connections must be lists")
+    try:
+        nodes = {n["id"]: n for n in node_list}
+        return GraphStore.from_payload(nodes, connections, defaults)
+    except (KeyError, TypeError, IndexError, AttributeError) as e:
+        # Nodes without an id or type, unhashable ids, wires to unknown
+        # nodes, non-numeric positions
+        raise ProjectFormatError(f"malformed project ({type(e).__name__}: {e})") from None
+
+
+def dumps_json(store):
+    return json.dumps(to_payload(store), separators=(",", ":"))
+
+
+def loads_json(text, defaults=None):
+    try:
+        payload = json.loads(text)
+    except ValueError as e:
+        raise ProjectFormatError(f"not a JSON project: {e}") from None
+    return from_payload(payload, defaults)
+
+
+# --- Binary ---
+
+def _flow_blocks(store):
+    """Assign every live node to a block; return (blocks, flows).
+
+    blocks is a list of node index lists; flows maps root id to the sorted
+    block numbers its flow touches.
+    """
+    graph = Graph.from_store(store)
+    block_of = {}
+    blocks = []
+    flows = {}
+    for root in find_roots(store):
+        block = len(blocks)
+        members = []
+        touched = set()
+        seen = {root}
+        stack = [root]
+        while stack:
+            idx = stack.pop()
+            if idx not in block_of:
+                block_of[idx] = block
+                members.append(idx)
+            touched.add(block_of[idx])
+            for target in graph.outgoing.get(idx, ()):
+                if target not in seen:
+                    seen.add(target)
+                    stack.append(target)
+        if members:
+            members.sort()
+            blocks.append(members)
+        flows[store.ids[root]] = sorted(touched)
+    rest = [idx for idx in store.nodes() if idx not in block_of]
+    if rest:
+        blocks.append(rest)
+    return blocks, flows
+
+
+def dumps_binary(store, level=6):
+    """Serialize store to the binary project format."""
+    blocks, flows = _flow_blocks(store)
+    # File-wide node numbers follow block order
+    number = {}
+    for members in blocks:
+        for idx in members:
+            number[idx] = len(number)
+    edges_by_block = [[] for _ in blocks]
+    block_of = {}
+    for b, members in enumerate(blocks):
+        for idx in members:
+            block_of[idx] = b
+    for s, d in store.edge_pairs():
+        edges_by_block[block_of[s]].append((number[s], number[d]))
+
+    # File type ids are the store's, restricted to types in use
+    type_names = store.type_names
+    coord = _COORD_CODES[VERSION]
+    body = []
+    table = []
+    offset = 0
+    base = 0
+    for members, edges in zip(blocks, edges_by_block):
+        strings = json.dumps([[store.ids[i] for i in members], [store.props[i] for i in members]], separators=(",", ":"))
+        raw = b"".join([
+            _COUNTS.pack(len(members), len(edges)),
+            _le(array("H", [store.types[i] for i in members])).tobytes(),
+            _le(array(coord, [store.xs[i] for i in members])).tobytes(),
+            _le(array(coord, [store.ys[i] for i in members])).tobytes(),
+            _le(array("i", [e[0] for e in edges])).tobytes(),
+            _le(array("i", [e[1] for e in edges])).tobytes(),
+            strings.encode("utf-8"),
+        ])
+        data = zlib.compress(raw, level)
+        table.append([offset, len(data), base, len(members)])
+        body.append(data)
+        offset += len(data)
+        base += len(members)
+
+    header = json.dumps({
+        "version": VERSION,
+        "types": type_names,
+        "blocks": table,
+        "flows": [[root_id, used] for root_id, used in flows.items()],
+        "nodes": len(number),
+        "edges": store.edge_count,
+    }, separators=(",", ":")).encode("utf-8")
+    return b"".join([MAGIC, _U32.pack(len(header)), header, *body])
+
+
+def _is_count(value):
+    return type(value) is int and value >= 0
+
+
+def _header_ok(header):
+    # Shapes of the header entries ProjectFile reads: type names, block
+    # table rows [offset, length, base, count], flows [root_id, [block, ...]]
+    types, table, flows = header.get("types"), header.get("blocks"), header.get("flows")
+    if not (isinstance(types, list) and isinstance(table, list) and isinstance(flows, list)):
+        return False
+    if not all(type(name) is str for name in types):
+        return False
+    if not all(type(row) is list and len(row) == 4 and all(map(_is_count, row)) for row in table):
+        return False
+    return all(
+        type(flow) is list and len(flow) == 2 and type(flow[0]) in (str, int) and type(flow[1]) is list
+        and all(_is_count(b) and b < len(table) for b in flow[1])
+        for flow in flows
+    )
+
+
+class ProjectFile:
+    """A binary project opened for lazy loading.
+
+    Only the header is parsed on open; blocks are decompressed on demand.
+
+    data: the file contents (bytes), see ProjectFile.open for paths
+    """
+
+    def __init__(self, data):
+        if not data.startswith(MAGIC):
+            raise ProjectFormatError("not a binary bot project")
+        start = len(MAGIC) + _U32.size
+        if len(data) < start:
+            raise ProjectFormatError("project header is truncated")
+        (header_len,) = _U32.unpack_from(data, len(MAGIC))
+        if len(data) < start + header_len:
+            raise ProjectFormatError("project header is truncated")
+        try:
+            self.header = json.loads(data[start:start + header_len])
+            version = self.header.get("version")
+        except (ValueError, AttributeError):
+            raise ProjectFormatError("project header is corrupt") from None
+        self._coord_code = _COORD_CODES.get(version) if type(version) is int else None
+        if self._coord_code is None:
+            raise ProjectFormatError(f"unsupported project version {version!r}")
+        if not _header_ok(self.header):
+            raise ProjectFormatError("project header is corrupt")
+        self.flows = {root_id: used for root_id, used in self.header["flows"]}
+        self._data = data
+        self._body = start + header_len
+
+    @classmethod
+    def open(cls, path):
+        with open(path, "rb") as f:
+            return cls(f.read())
+
+    def _read_block(self, b):
+        try:
+            offset, length, _base, _count = self.header["blocks"][b]
+            raw = zlib.decompress(self._data[self._body + offset:self._body + offset + length])
+            n, m = _COUNTS.unpack_from(raw)
+            pos = _COUNTS.size
+            columns = []
+            coord = self._coord_code
+            for code, count in (("H", n), (coord, n), (coord, n), ("i", m), ("i", m)):
+                col = array(code)
+                size = col.itemsize * count
+                if len(raw) < pos + size:
+                    raise ValueError("column is truncated")
+                col.frombytes(raw[pos:pos + size])
+                columns.append(_le(col))
+                pos += size
+            ids, props = json.loads(raw[pos:])
+            if not (len(ids) == len(props) == n and all(type(i) in (str, int) for i in ids)
+                    and all(p is None or type(p) is dict for p in props)):
+                raise ValueError("ids and props do not match the columns")
+        except (zlib.error, struct.error, ValueError, TypeError) as e:
+            raise ProjectFormatError(f"block {b} is corrupt: {e}") from None
+        return columns, ids, props
+
+    def load(self, defaults=None):
+        """Load the whole project into a GraphStore."""
+        return self._load_blocks(range(len(self.header["blocks"])), defaults)
+
+    def load_flow(self, root_id, defaults=None):
+        """Load only the nodes and edges of the flow starting at root_id.
+
+        root_id may also be the text of an integer id, as it comes in a URL.
+        """
+        used = self.flows.get(root_id)
+        if used is None and isinstance(root_id, str):
+            used = next((u for node_id, u in self.flows.items() if type(node_id) is int and str(node_id) == root_id), None)
+        if used is None:
+            raise KeyError(f"no flow starts at node {root_id!r}")
+        return self._load_blocks(used, defaults)
+
+    def _load_blocks(self, block_numbers, defaults):
+        store = GraphStore(defaults)
+        for name in self.header["types"]:
+            store.intern_type(name)
+        table = self.header["blocks"]
+        block_numbers = sorted(block_numbers)
+        contiguous = block_numbers == list(range(len(block_numbers)))
+        bases = [] # file-wide number of each loaded block's first node
+        new_bases = [] # store index of the same node
+        for b in block_numbers:
+            (types, xs, ys, src, dst), ids, props = self._read_block(b)
+            bases.append(table[b][2])
+            new_bases.append(len(store.ids))
+            for node_id in ids:
+                store.index[node_id] = len(store.ids)
+                store.ids.append(node_id)
+            store.types.extend(types)
+            store.xs.fromlist(xs.tolist())
+            store.ys.fromlist(ys.tolist())
+            store.props.extend(props)
+            if contiguous:
+                # Loading from the first block on: file numbers are store indexes
+                store.src.fromlist(src.tolist())
+                store.dst.fromlist(dst.tolist())
+            else:
+                for s, d in zip(src, dst):
+                    store.src.append(s)
+                    store.dst.append(d)
+
+        if not contiguous:
+            def remap(num):
+                i = bisect_right(bases, num) - 1
+                if i < 0 or num - bases[i] >= table[block_numbers[i]][3]:
+                    return -1
+                return num - bases[i] + new_bases[i]
+
+            pairs = [(remap(s), remap(d)) for s, d in zip(store.src, store.dst)]
+            # Edges into blocks that were not loaded are dropped
+            pairs = [p for p in pairs if p[0] != -1 and p[1] != -1]
+            store.src = array("l", [p[0] for p in pairs])
+            store.dst = array("l", [p[1] for p in pairs])
+        store.edge_count = len(store.src)
+        return store
+
+
+def loads_binary(data, defaults=None):
+    return ProjectFile(data).load(defaults)
+
+
+# --- Files ---
+
+def save(path, store):
+    """Write store to path; ".botproj" files are binary, anything else JSON."""
+    if str(path).endswith(BINARY_SUFFIX):
+        with open(path, "wb") as f:
+            f.write(dumps_binary(store))
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(dumps_json(store))
+
+
+def load(path, defaults=None):
+    """Read a project written by save(), detecting the format from its content."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if data.startswith(MAGIC):
+        return loads_binary(data, defaults)
+    return loads_json(data, defaults)
@@ -0,0 +1,269 @@
+"""Node type registry shared by the web and desktop apps.
+
+REGISTRY maps node type name to its definition: the built-in types below
+plus any node packs found in
+
+- the "botbuilder.node_types" entry point group: each entry point loads to
+  a {name: definition} dict, or a callable returning one;
+- the directories listed in BOTBUILDER_NODE_PACKS (os.pathsep-separated):
+  every *.json file there holds a {name: definition} object.
+
+Packs are only listed when the registry is built. They are read the first
+time a lookup misses the types already loaded, or when every type is
+needed (iteration, len). Per-type data is built on first lookup and then
+cached: the checked definition, its compiled templates (REGISTRY.templates)
+and its default props (REGISTRY.default_props).
+
+A definition looks like the built-in ones: "type" is "event" (with a
+"code_start" template) or "action" (with an optional "code" template), and
+"props" lists (label, key, default) triples. Pack types may not reuse a
+name that is already registered.
+"""
+import hashlib
+import json
+import os
+import threading
+from collections.abc import Mapping
+
+from webapp.codegen import compile_node_type
+
+ENTRY_POINT_GROUP = "botbuilder.node_types"
+PACK_DIRS_ENV = "BOTBUILDER_NODE_PACKS"
+
+BUILTIN_TYPES = {
+    "Event: On Ready": {
+        "type": "event",
+        "code_start": "@bot.event\nasync def on_ready():",
+        "inputs": [],
+        "outputs": ["Flow"],
+        "props": []
+    },
+    "Command": {
+        "type": "event",
+        "code_start": "@bot.command(name='{trigger}')\nasync def {func_name}(ctx):",
+        "inputs": [],
+        "outputs": ["Flow"],
+        "props": [("Trigger (!name)", "trigger", "hello")]
+    },
+    "Send Message": {
+        "type": "action",
+        "code": "    await ctx.send('{text}')",
+        "inputs": ["Flow"],
+        "outputs": ["Flow"],
+        "props": [("Message Text", "text", "Hello World!")]
+    },
+    "Reply to User": {
+        "type": "action",
+        "code": "    await ctx.reply('{text}')",
+        "inputs": ["Flow"],
+        "outputs": ["Flow"],
+        "props": [("Reply Text", "text", "I hear you!")]
+    },
+    "Print Console": {
+        "type": "action",
+        "code": "    print('{text}')",
+        "inputs": ["Flow"],
+        "outputs": ["Flow"],
+        "props": [("Log Text", "text", "Debug message")]
+    }
+}
+
+
+class NodeTypeError(ValueError):
+    """Raised for a node pack that cannot be loaded or a malformed definition."""
+
+
+class LazyTable(dict):
+    """dict of per-type data, each entry built by build(name) on first lookup.
+
+    Subscription of a built entry is a plain dict lookup. Iteration, len,
+    keys/values/items and get() cover every name in names (a mapping or
+    set of type names), building what is missing first.
+    """
+
+    def __init__(self, build, names):
+        super().__init__()
+        self._build = build
+        self._names = names
+
+    def __missing__(self, name):
+        value = self[name] = self._build(name)
+        return value
+
+    def get(self, name, default=None):
+        try:
+            return self[name]
+        except KeyError:
+            return default
+
+    def __contains__(self, name):
+        return dict.__contains__(self, name) or name in self._names
+
+    def _fill(self):
+        for name in self._names:
+            if not dict.__contains__(self, name):
+                self[name]
+        return self
+
+    def __iter__(self):
+        return dict.__iter__(self._fill())
+
+    def __len__(self):
+        return dict.__len__(self._fill())
+
+    def keys(self):
+        return dict.keys(self._fill())
+
+    def values(self):
+        return dict.values(self._fill())
+
+    def items(self):
+        return dict.items(self._fill())
+
+
+def check_definition(name, definition):
+    """Return a checked copy of definition, props as (label, key, default) tuples."""
+    if not isinstance(definition, dict):
+        raise NodeTypeError(f"node type {name!r}: definition must be an object")
+    kind = definition.get("type")
+    if kind not in ("event", "action"):
+        raise NodeTypeError(f"node type {name!r}: type must be 'event' or 'action', not {kind!r}")
+    if kind == "event" and not isinstance(definition.get("code_start"), str):
+        raise NodeTypeError(f"node type {name!r}: events need a code_start template")
+    if not isinstance(definition.get("code", ""), str):
+        raise NodeTypeError(f"node type {name!r}: code must be a string")
+    try:
+        props = [(label, key, default) for label, key, default in definition.get("props", [])]
+    except (TypeError, ValueError):
+        raise NodeTypeError(f"node type {name!r}: props must be [label, key, default] triples") from None
+    checked = dict(definition)
+    checked["props"] = props
+    checked.setdefault("inputs", [])
+    checked.setdefault("outputs", [])
+    return checked
+
+
+def read_pack_directory(path):
+    """Return the {name: definition} types of every *.json pack in path."""
+    types = {}
+    for filename in sorted(os.listdir(path)):
+        if not filename.endswith(".json"):
+            continue
+        file_path = os.path.join(path, filename)
+        try:
+            with open(file_path, encoding="utf-8") as f:
+                pack = json.load(f)
+        except (OSError, ValueError) as e:
+            raise NodeTypeError(f"cannot read node pack {file_path}: {e}") from None
+        if not isinstance(pack, dict):
+            raise NodeTypeError(f"node pack {file_path} must be a JSON object")
+        for name in pack:
+            if name in types:
+                raise NodeTypeError(f"node type {name!r} is defined twice in {path}")
+        types.update(pack)
+    return types
+
+
+def read_entry_points(group=ENTRY_POINT_GROUP):
+    """Return the {name: definition} types of every installed entry point in group."""
+    from importlib.metadata import entry_points
+
+    types = {}
+    for entry_point in entry_points(group=group):
+        pack = entry_point.load()
+        if callable(pack):
+            pack = pack()
+        for name in pack:
+            if name in types:
+                raise NodeTypeError(f"node type {name!r} is defined twice in entry point group {group}")
+        types.update(pack)
+    return types
+
+
+class NodeTypeRegistry(Mapping):
+    """Read-only mapping of node type name to checked definition."""
+
+    def __init__(self):
+        self._raw = {}  # name -> definition as registered
+        self._sources = {}  # name -> where it was registered from
+        self._checked = {}
+        self._pending = []  # (source, loader) of packs not read yet
+        self._lock = threading.Lock()
+        # name -> {"code"/"code_start": CompiledTemplate}
+        self.templates = LazyTable(lambda name: compile_node_type(self[name]), self)
+        # name -> {prop key: default}
+        self.default_props = LazyTable(lambda name: {p[1]: p[2] for p in self[name]["props"]}, self)
+
+    def register(self, name, definition, source="register()"):
+        """Add one node type now."""
+        if name in self._raw:
+            raise NodeTypeError(f"node type {name!r} from {source} is already defined by {self._sources[name]}")
+        self._raw[name] = definition
+        self._sources[name] = source
+
+    def add_pack(self, source, loader):
+        """Queue a pack; loader() returns its {name: definition} types when first needed."""
+        self._pending.append((source, loader))
+
+    def add_directory(self, path):
+        self.add_pack(path, lambda: read_pack_directory(path))
+
+    def add_entry_points(self, group=ENTRY_POINT_GROUP):
+        self.add_pack(f"entry points {group}", lambda: read_entry_points(group))
+
+    def load_all(self):
+        """Read every queued pack."""
+        with self._lock:
+            while self._pending:
+                source, loader = self._pending.pop(0)
+                for name, definition in loader().items():
+                    self.register(name, definition, source)
+
+    def __getitem__(self, name):
+        try:
+            return self._checked[name]
+        except KeyError:
+            pass
+        definition = self._raw.get(name)
+        if definition is None and self._pending:
+            self.load_all()
+            definition = self._raw.get(name)
+        if definition is None:
+            raise KeyError(name)
+        checked = self._checked[name] = check_definition(name, definition)
+        return checked
+
+    def __iter__(self):
+        self.load_all()
+        return iter(list(self._raw))
+
+    def __len__(self):
+        self.load_all()
+        return len(self._raw)
+
+    def __contains__(self, name):
+        try:
+            self[name]
+        except KeyError:
+            return False
+        return True
+
+    def fingerprint(self):
+        """Hash of every definition; changes whenever a type is added or edited."""
+        text = json.dumps([[name, self[name]] for name in sorted(self)], sort_keys=True)
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def default_registry():
+    """Registry of the built-in types plus the packs configured for this process."""
+    registry = NodeTypeRegistry()
+    for name, definition in BUILTIN_TYPES.items():
+        registry.register(name, definition, "built-in types")
+    registry.add_entry_points()
+    for path in os.environ.get(PACK_DIRS_ENV, "").split(os.pathsep):
+        if path:
+            registry.add_directory(path)
+    return registry
+
+
+REGISTRY = default_registry()
@@ -0,0 +1,156 @@
+from array import array
+
+_EMPTY = {}
+
+
+class GraphStore:
+    """Compact storage for a bot graph, shared by the desktop and web exporters.
+
+    Nodes get dense integer indexes. Node type names are interned to small
+    ints, and types and positions live in parallel arrays. Props stay
+    dicts, but a node still on its type's defaults stores None. Edges are
+    two parallel int arrays; removed nodes and edges leave tombstones
+    (None id, -1 endpoints) so existing indexes stay valid.
+
+    defaults: optional dict mapping node type name to its default props
+    """
+
+    def __init__(self, defaults=None):
+        self.defaults = defaults or {}
+        self.type_names = [] # type id -> node type name
+        self._type_ids = {} # node type name -> type id
+        self.ids = [] # index -> node id, None once removed
+        self.index = {} # node id -> index
+        self.types = array("H") # index -> type id
+        self.xs = array("d")
+        self.ys = array("d")
+        self.props = [] # index -> props dict, or None for the type's defaults
+        self.src = array("l") # edge -> source node index, -1 once removed
+        self.dst = array("l") # edge -> target node index, -1 once removed
+        self.edge_count = 0
+
+    @classmethod
+    def from_payload(cls, nodes, connections, defaults=None):
+        """Build a store from export_code's arguments.
+
+        nodes: dict mapping node_id to {"id", "type", "props", optional "x"/"y"}
+        connections: iterable of (start_id, end_id)
+        The props dicts are shared, not copied.
+        """
+        store = cls(defaults)
+        # Bulk-fill the columns; this is the hot path of every web export
+        store.ids = list(nodes)
+        store.index = {node_id: idx for idx, node_id in enumerate(store.ids)}
+        values = nodes.values()
+        type_list = [node["type"] for node in values]
+        for node_type in dict.fromkeys(type_list):
+            store.intern_type(node_type)
+        store.types = array("H", map(store._type_ids.__getitem__, type_list))
+        store.xs = array("d", [node.get("x", 0) for node in values])
+        store.ys = array("d", [node.get("y", 0) for node in values])
+        store.props = [node.get("props") for node in values]
+        store.set_connections(connections)
+        return store
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, node_id):
+        return node_id in self.index
+
+    def intern_type(self, node_type):
+        type_id = self._type_ids.get(node_type)
+        if type_id is None:
+            type_id = self._type_ids[node_type] = len(self.type_names)
+            self.type_names.append(node_type)
+        return type_id
+
+    def add_node(self, node_id, node_type, x=0.0, y=0.0, props=None):
+        """Append a node and return its index."""
+        if node_id in self.index:
+            raise ValueError(f"duplicate node id {node_id!r}")
+        idx = len(self.ids)
+        self.ids.append(node_id)
+        self.index[node_id] = idx
+        self.types.append(self.intern_type(node_type))
+        self.xs.append(x)
+        self.ys.append(y)
+        self.props.append(props)
+        return idx
+
+    def remove_node(self, node_id):
+        """Drop a node; the caller removes its edges (see remove_edge)."""
+        idx = self.index.pop(node_id)
+        self.ids[idx] = None
+        self.props[idx] = None
+        return idx
+
+    def type_of(self, idx):
+        return self.type_names[self.types[idx]]
+
+    def props_of(self, idx):
+        """Props of node idx; the type's shared defaults if never edited."""
+        props = self.props[idx]
+        if props is None:
+            # Subscription rather than get(): defaults may be a lazily filled table
+            try:
+                return self.defaults[self.type_names[self.types[idx]]]
+            except KeyError:
+                return _EMPTY
+        return props
+
+    def set_prop(self, idx, key, value):
+        props = self.props[idx]
+        if props is None:
+            props = self.props[idx] = dict(self.props_of(idx))
+        props[key] = value
+
+    def move(self, idx, dx, dy):
+        self.xs[idx] += dx
+        self.ys[idx] += dy
+
+    def nodes(self):
+        """Yield the index of every live node in insertion order."""
+        return iter(self.index.values())
+
+    def add_edge(self, start_id, end_id):
+        """Append an edge between two node ids and return its index."""
+        self.src.append(self.index[start_id])
+        self.dst.append(self.index[end_id])
+        self.edge_count += 1
+        return len(self.src) - 1
+
+    def remove_edge(self, edge):
+        if self.src[edge] != -1:
+            self.src[edge] = -1
+            self.dst[edge] = -1
+            self.edge_count -= 1
+
+    def set_connections(self, connections):
+        """Replace every edge with connections, a list of (start_id, end_id)."""
+        index = self.index
+        pairs = [(index[conn[0]], index[conn[1]]) for conn in connections]
+        self.src = array("l", [pair[0] for pair in pairs])
+        self.dst = array("l", [pair[1] for pair in pairs])
+        self.edge_count = len(pairs)
+
+    def edges_of(self, idx):
+        """Return the indexes of live edges touching node idx (scans every edge)."""
+        return [e for e, (s, d) in enumerate(zip(self.src, self.dst)) if s == idx or d == idx]
+
+    def edge_pairs(self):
+        """Yield (start_index, end_index) for every live edge."""
+        if self.edge_count == len(self.src):
+            # No tombstones
+            return zip(self.src, self.dst)
+        return self._live_edge_pairs()
+
+    def _live_edge_pairs(self):
+        for s, d in zip(self.src, self.dst):
+            if s != -1:
+                yield (s, d)
+
+    def connections(self):
+        """Return live edges as (start_id, end_id) tuples."""
+        ids = self.ids
+        return [(ids[s], ids[d]) for s, d in self.edge_pairs()]
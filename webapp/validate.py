@@ -0,0 +1,161 @@
+"""One-pass validation of /export payloads.
+
+A PayloadValidator is built once per NODE_TYPES table. validate() walks the
+payload a single time, checking shape, node types, required props, wires
+and size caps, and returns the (nodes, connections) pair export_code takes,
+so a bad payload is rejected before any graph is built or code generated.
+"""
+from itertools import chain
+
+from webapp.codegen import compile_node_type
+from webapp.nodes import NODE_TYPES
+from webapp.registry import LazyTable
+
+# Defaults for the caps; callers can pass their own
+MAX_NODES = 100_000
+MAX_CONNECTIONS = 200_000
+MAX_ID_CHARS = 200
+MAX_PROP_CHARS = 10_000
+# Request body cap for the servers, checked before the JSON is parsed
+MAX_BODY_BYTES = 32 * 1024 * 1024
+
+_SCALAR_TYPES = {str, int, float, bool}
+_ID_TYPES = {str, int}
+_NUMBER_TYPES = {int, float}
+_PAIR_TYPES = {list, tuple}
+
+
+class PayloadError(ValueError):
+    """Raised for a payload that export_code must not be given.
+
+    status is the HTTP status to answer with: 413 for size caps, else 400.
+    """
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+class PayloadValidator:
+    """Validator compiled from a NODE_TYPES table.
+
+    For every node type it works out the props its templates read (minus
+    func_name, which export fills in) on the type's first appearance, so the
+    per-node check is a dict lookup and a subset test. A node without props
+    (or with null props) is on its type's defaults, as in project.to_payload,
+    and only fails if the templates need a prop the type has no default for.
+
+    Node ids are strings or integers, as export has always taken them.
+    """
+
+    def __init__(self, node_types, max_nodes=MAX_NODES, max_connections=MAX_CONNECTIONS,
+                 max_id_chars=MAX_ID_CHARS, max_prop_chars=MAX_PROP_CHARS):
+        self.max_nodes = max_nodes
+        self.max_connections = max_connections
+        self.max_id_chars = max_id_chars
+        self.max_prop_chars = max_prop_chars
+        self.node_types = node_types
+        self.required = LazyTable(self._required_fields, node_types)
+        self.default_keys = LazyTable(lambda name: frozenset(p[1] for p in node_types[name]["props"]), node_types)
+
+    def _required_fields(self, name):
+        fields = set()
+        for template in compile_node_type(self.node_types[name]).values():
+            fields |= template.fields
+        fields.discard("func_name")
+        return frozenset(fields)
+
+    def validate(self, payload):
+        """Return (nodes, connections) for export_code, or raise PayloadError.
+
+        nodes maps id to the payload's node dicts (not copied); connections
+        is the payload's list.
+        """
+        if not isinstance(payload, dict):
+            raise PayloadError("payload must be a JSON object")
+        node_list = payload.get("nodes", [])
+        connections = payload.get("connections", [])
+        if not isinstance(node_list, list):
+            raise PayloadError("nodes must be a list")
+        if not isinstance(connections, list):
+            raise PayloadError("connections must be a list")
+        if len(node_list) > self.max_nodes:
+            raise PayloadError(f"too many nodes: {len(node_list)} > {self.max_nodes}", 413)
+        if len(connections) > self.max_connections:
+            raise PayloadError(f"too many connections: {len(connections)} > {self.max_connections}", 413)
+
+        required = self.required
+        max_id_chars = self.max_id_chars
+        max_prop_chars = self.max_prop_chars
+        scalar_types = _SCALAR_TYPES
+        number_types = _NUMBER_TYPES
+        nodes = {}
+        for node in node_list:
+            # Exact type checks: JSON only produces these types, and bool
+            # must not pass as a number
+            if type(node) is not dict:
+                self._node_error(nodes, "must be an object")
+            node_id = node.get("id")
+            id_type = type(node_id)
+            if id_type not in _ID_TYPES or (id_type is str and not 0 < len(node_id) <= max_id_chars):
+                self._node_error(nodes, f"id must be an integer or a string of 1-{max_id_chars} characters")
+            try:
+                fields = required[node.get("type")]
+            except (KeyError, TypeError):
+                fields = None
+            if fields is None:
+                self._node_error(nodes, f"unknown node type {node.get('type')!r}")
+            props = node.get("props")
+            if props is None:
+                # Export renders the type's defaults
+                keys = self.default_keys[node["type"]]
+            elif type(props) is not dict:
+                self._node_error(nodes, "props must be an object")
+            else:
+                keys = props.keys()
+                for key, value in props.items():
+                    value_type = type(value)
+                    if value_type not in scalar_types:
+                        self._node_error(nodes, f"props.{key} must be a string or number")
+                    if value_type is str and len(value) > max_prop_chars:
+                        self._node_error(nodes, f"props.{key} is longer than {max_prop_chars} characters", 413)
+            if not fields <= keys:
+                missing = sorted(fields.difference(keys))
+                self._node_error(nodes, f"node {node_id!r} is missing props {missing}")
+            if type(node.get("x", 0)) not in number_types or type(node.get("y", 0)) not in number_types:
+                self._node_error(nodes, "x and y must be numbers")
+            if node_id in nodes:
+                self._node_error(nodes, f"duplicate id {node_id!r}")
+            nodes[node_id] = node
+
+        # Whole-list checks run in C; the slow scan only runs to report an error
+        try:
+            ok = (
+                set(map(type, connections)) <= _PAIR_TYPES
+                and set(map(len, connections)) <= {2}
+                and nodes.keys() >= set(chain.from_iterable(connections))
+            )
+        except TypeError:
+            ok = False
+        if not ok:
+            self._connection_error(connections, nodes)
+        return nodes, connections
+
+    @staticmethod
+    def _node_error(nodes, message, status=400):
+        # The failing node is the first one not yet accepted
+        raise PayloadError(f"nodes[{len(nodes)}]: {message}", status)
+
+    @staticmethod
+    def _connection_error(connections, nodes):
+        for i, conn in enumerate(connections):
+            if type(conn) not in _PAIR_TYPES or len(conn) != 2:
+                raise PayloadError(f"connections[{i}] must be a [start_id, end_id] pair")
+            for end in conn:
+                if not (type(end) in _ID_TYPES and end in nodes):
+                    raise PayloadError(f"connections[{i}]: unknown node {end!r}")
+        raise PayloadError("invalid connections")
+
+
+# Validator for the built-in node types
+VALIDATOR = PayloadValidator(NODE_TYPES)